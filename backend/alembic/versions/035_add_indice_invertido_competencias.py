@@ -0,0 +1,35 @@
+"""Add inverted competency index on autoavaliacao_competencias
+
+Revision ID: 035_add_indice_invertido_competencias
+Revises: 034_add_contratos_plataforma
+Create Date: 2026-10-16
+
+Cria índice composto (competencia_id, nivel_declarado, candidate_id) para que o
+matching de vagas leia apenas os candidatos que atendem a cada requisito,
+sem varrer toda a tabela de autoavaliações.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '035_add_indice_invertido_competencias'
+down_revision = '034_add_contratos_plataforma'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_autoavaliacao_competencias_competencia_nivel',
+        'autoavaliacao_competencias',
+        ['competencia_id', 'nivel_declarado', 'candidate_id'],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_autoavaliacao_competencias_competencia_nivel',
+        table_name='autoavaliacao_competencias',
+        if_exists=True
+    )
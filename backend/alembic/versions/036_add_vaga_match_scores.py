@@ -0,0 +1,52 @@
+"""Add vaga_match_scores table
+
+Revision ID: 036_add_vaga_match_scores
+Revises: 035_add_indice_invertido_competencias
+Create Date: 2026-10-16
+
+Tabela com o score de matching materializado por (vaga, candidato), usada
+pelas telas de matching da empresa no lugar do recálculo a cada GET.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '036_add_vaga_match_scores'
+down_revision = '035_add_indice_invertido_competencias'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vaga_match_scores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('vaga_id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('atende_minimo', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('tipo_match', sa.String(50), nullable=True),
+        sa.Column('score_total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_certificacao', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_autoavaliacao', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('competencias_certificadas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('competencias_autoavaliadas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('testes_realizados', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['vaga_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('vaga_id', 'candidate_id', name='uq_vaga_match_score')
+    )
+    op.create_index(
+        'ix_vaga_match_scores_ranking',
+        'vaga_match_scores',
+        ['vaga_id', 'atende_minimo', 'tipo_match', 'score_total']
+    )
+    op.create_index('ix_vaga_match_scores_candidate_id', 'vaga_match_scores', ['candidate_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vaga_match_scores_candidate_id', table_name='vaga_match_scores')
+    op.drop_index('ix_vaga_match_scores_ranking', table_name='vaga_match_scores')
+    op.drop_table('vaga_match_scores')
@@ -0,0 +1,44 @@
+"""Garantir unique constraint (vaga_id, candidate_id) em vaga_candidatos
+
+Revision ID: 037_garantir_uq_vaga_candidato
+Revises: 036_add_vaga_match_scores
+Create Date: 2026-10-16
+
+A materialização do matching usa INSERT ... ON CONFLICT (vaga_id, candidate_id)
+DO NOTHING, que exige a constraint. Ela foi criada na 011, mas bancos cuja
+tabela veio de outro caminho podem não tê-la: nesse caso remove duplicatas
+(mantém o vínculo mais antigo) e cria a constraint.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '037_garantir_uq_vaga_candidato'
+down_revision = '036_add_vaga_match_scores'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_vaga_candidato'
+            ) THEN
+                DELETE FROM vaga_candidatos a
+                USING vaga_candidatos b
+                WHERE a.vaga_id = b.vaga_id
+                  AND a.candidate_id = b.candidate_id
+                  AND a.id > b.id;
+
+                ALTER TABLE vaga_candidatos
+                    ADD CONSTRAINT uq_vaga_candidato UNIQUE (vaga_id, candidate_id);
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    # A constraint faz parte do schema desde a 011: nada a desfazer
+    pass
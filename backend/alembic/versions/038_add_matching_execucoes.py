@@ -0,0 +1,45 @@
+"""Add matching_execucoes table
+
+Revision ID: 038_add_matching_execucoes
+Revises: 037_garantir_uq_vaga_candidato
+Create Date: 2026-10-16
+
+Registro das execuções em segundo plano do matching de uma vaga (publicação
+ou mudança de requisitos), consultado pelo endpoint de status.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '038_add_matching_execucoes'
+down_revision = '037_garantir_uq_vaga_candidato'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'matching_execucoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('vaga_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), server_default='pendente', nullable=False),
+        sa.Column('motivo', sa.String(50), nullable=True),
+        sa.Column('total_candidatos', sa.Integer(), nullable=True),
+        sa.Column('candidatos_processados', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('candidatos_compativeis', sa.Integer(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['vaga_id'], ['jobs.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_matching_execucoes_id', 'matching_execucoes', ['id'])
+    op.create_index('ix_matching_execucoes_vaga_id', 'matching_execucoes', ['vaga_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matching_execucoes_vaga_id', table_name='matching_execucoes')
+    op.drop_index('ix_matching_execucoes_id', table_name='matching_execucoes')
+    op.drop_table('matching_execucoes')
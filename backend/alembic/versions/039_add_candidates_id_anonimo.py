@@ -0,0 +1,38 @@
+"""Add candidates.id_anonimo (busca indexada por ID anônimo)
+
+Revision ID: 039_add_candidates_id_anonimo
+Revises: 038_add_matching_execucoes
+Create Date: 2026-10-16
+
+Persiste o ID anônimo (CAND- + 8 primeiros hex do SHA-256 de "{id}-{cpf}",
+mesmo cálculo de app.utils.anonimizacao.gerar_id_anonimo) para que a busca
+por ID anônimo seja uma consulta indexada em vez de hashear todos os candidatos.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '039_add_candidates_id_anonimo'
+down_revision = '038_add_matching_execucoes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('candidates', sa.Column('id_anonimo', sa.String(20), nullable=True))
+    
+    # Backfill com o mesmo hash gerado pela aplicação
+    op.execute("""
+        UPDATE candidates
+        SET id_anonimo = 'CAND-' || upper(substr(
+            encode(sha256(convert_to(id::text || '-' || cpf, 'UTF8')), 'hex'), 1, 8
+        ))
+    """)
+    
+    op.create_index('ix_candidates_id_anonimo', 'candidates', ['id_anonimo'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_candidates_id_anonimo', table_name='candidates')
+    op.drop_column('candidates', 'id_anonimo')
@@ -0,0 +1,73 @@
+"""Add busca textual (tsvector + pg_trgm) em candidatos e vagas
+
+Revision ID: 040_add_busca_textual
+Revises: 039_add_candidates_id_anonimo
+Create Date: 2026-10-16
+
+Substitui os ILIKE '%termo%' sem índice das listagens do admin e da
+recomendação por habilidade:
+- f_unaccent: wrapper IMMUTABLE de unaccent() (exigido em índices de expressão)
+- busca_vetor: coluna tsvector gerada ('portuguese', sem acentos) + índice GIN
+- índices GIN pg_trgm para buscas por trecho (nome, habilidades, email, requisitos)
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '040_add_busca_textual'
+down_revision = '039_add_candidates_id_anonimo'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    """)
+    
+    # Vetores de busca (pesos: A > B > C)
+    op.execute("""
+        ALTER TABLE candidates ADD COLUMN busca_vetor tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(full_name, ''))), 'A') ||
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(habilidades, ''))), 'B') ||
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(area_atuacao, ''))), 'C')
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE jobs ADD COLUMN busca_vetor tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(title, ''))), 'A') ||
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(requirements, ''))), 'B') ||
+            setweight(to_tsvector('portuguese', f_unaccent(coalesce(description, ''))), 'C')
+        ) STORED
+    """)
+    
+    op.execute("CREATE INDEX ix_candidates_busca_vetor ON candidates USING gin (busca_vetor)")
+    op.execute("CREATE INDEX ix_jobs_busca_vetor ON jobs USING gin (busca_vetor)")
+    
+    # Trigram para buscas por trecho (ILIKE '%termo%')
+    op.execute("CREATE INDEX ix_candidates_full_name_trgm ON candidates USING gin (f_unaccent(full_name) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_candidates_habilidades_trgm ON candidates USING gin (f_unaccent(habilidades) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_users_email_trgm ON users USING gin (email gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_jobs_title_trgm ON jobs USING gin (f_unaccent(title) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_jobs_requirements_trgm ON jobs USING gin (f_unaccent(requirements) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_jobs_requirements_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_jobs_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_candidates_habilidades_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_candidates_full_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_jobs_busca_vetor")
+    op.execute("DROP INDEX IF EXISTS ix_candidates_busca_vetor")
+    op.drop_column('jobs', 'busca_vetor')
+    op.drop_column('candidates', 'busca_vetor')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
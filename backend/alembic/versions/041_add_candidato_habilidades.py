@@ -0,0 +1,97 @@
+"""Add candidato_habilidades (habilidades normalizadas do candidato)
+
+Revision ID: 041_add_candidato_habilidades
+Revises: 040_add_busca_textual
+Create Date: 2026-10-16
+
+Normaliza o JSON de candidates.habilidades em uma linha por habilidade, com
+índice btree (igualdade) e trigram (trecho) sobre o nome normalizado. O campo
+texto continua sendo gravado por compatibilidade; formações e experiências já
+possuem tabelas próprias (formacoes_academicas / experiencias_profissionais).
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '041_add_candidato_habilidades'
+down_revision = '040_add_busca_textual'
+branch_labels = None
+depends_on = None
+
+
+def _nivel_valido(valor):
+    """Nível inteiro entre 1 e 5 (mesma regra do schema HabilidadeAutoAvaliacao)"""
+    try:
+        nivel = int(valor)
+    except (TypeError, ValueError):
+        return None
+    return nivel if 1 <= nivel <= 5 else None
+
+
+def upgrade() -> None:
+    tabela = op.create_table(
+        'candidato_habilidades',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('candidate_id', sa.Integer(), sa.ForeignKey('candidates.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('habilidade', sa.String(255), nullable=False),
+        sa.Column('habilidade_normalizada', sa.String(255), nullable=False),
+        sa.Column('nivel', sa.Integer(), nullable=False),
+        sa.Column('anos_experiencia', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_candidato_habilidades_id', 'candidato_habilidades', ['id'])
+    op.create_index('ix_candidato_habilidades_candidate_id', 'candidato_habilidades', ['candidate_id'])
+    op.create_index(
+        'ix_candidato_habilidades_normalizada', 'candidato_habilidades',
+        ['habilidade_normalizada', 'candidate_id']
+    )
+    op.execute(
+        "CREATE INDEX ix_candidato_habilidades_normalizada_trgm "
+        "ON candidato_habilidades USING gin (habilidade_normalizada gin_trgm_ops)"
+    )
+    
+    # Backfill: JSON inválido ou itens fora do schema são ignorados (a leitura antiga também os descartava)
+    conn = op.get_bind()
+    linhas = []
+    for candidate_id, habilidades in conn.execute(
+        sa.text("SELECT id, habilidades FROM candidates WHERE habilidades IS NOT NULL AND habilidades <> ''")
+    ):
+        try:
+            itens = json.loads(habilidades)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(itens, list):
+            continue
+        
+        for item in itens:
+            if not isinstance(item, dict):
+                continue
+            nome = str(item.get('habilidade') or '').strip()
+            nivel = _nivel_valido(item.get('nivel'))
+            if not nome or nivel is None:
+                continue
+            anos = item.get('anos_experiencia')
+            linhas.append({
+                'candidate_id': candidate_id,
+                'habilidade': nome[:255],
+                'habilidade_normalizada': nome.lower()[:255],
+                'nivel': nivel,
+                'anos_experiencia': anos if isinstance(anos, int) else None,
+            })
+    
+    if linhas:
+        op.bulk_insert(tabela, linhas)
+    
+    # O filtro de habilidade do admin passa a usar candidato_habilidades
+    op.execute("DROP INDEX IF EXISTS ix_candidates_habilidades_trgm")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX ix_candidates_habilidades_trgm ON candidates USING gin (f_unaccent(habilidades) gin_trgm_ops)")
+    op.execute("DROP INDEX IF EXISTS ix_candidato_habilidades_normalizada_trgm")
+    op.drop_index('ix_candidato_habilidades_normalizada', table_name='candidato_habilidades')
+    op.drop_index('ix_candidato_habilidades_candidate_id', table_name='candidato_habilidades')
+    op.drop_index('ix_candidato_habilidades_id', table_name='candidato_habilidades')
+    op.drop_table('candidato_habilidades')
@@ -0,0 +1,75 @@
+"""Add jobs.habilidades_extraidas (tecnologias extraídas dos requisitos)
+
+Revision ID: 042_add_jobs_habilidades_extraidas
+Revises: 041_add_candidato_habilidades
+Create Date: 2026-10-16
+
+A recomendação de vagas passa a intersectar conjuntos pré-calculados em vez de
+procurar cada palavra-chave nos requisitos a cada requisição. O backfill usa uma
+cópia congelada do extrator de app.utils.extracao_habilidades nesta revisão: mudanças
+futuras no extrator da aplicação não alteram o resultado desta migration.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '042_add_jobs_habilidades_extraidas'
+down_revision = '041_add_candidato_habilidades'
+branch_labels = None
+depends_on = None
+
+
+# Cópia congelada de app.utils.extracao_habilidades (não importar código da aplicação)
+TECNOLOGIAS_COMUNS = {
+    "python": ["python", "django", "flask", "fastapi"],
+    "javascript": ["javascript", "js", "node", "nodejs"],
+    "react": ["react", "reactjs"],
+    "typescript": ["typescript", "ts"],
+    "java": ["java"],
+    "c#": ["c#", "csharp", "dotnet"],
+    "sql": ["sql", "postgres", "postgresql", "mysql", "oracle"],
+    "nosql": ["nosql", "mongodb", "redis"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "aws": ["aws", "amazon"],
+    "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"],
+    "git": ["git", "github", "gitlab"],
+    "rest": ["rest", "api"],
+    "graphql": ["graphql"],
+}
+
+TECNOLOGIA_POR_PALAVRA = {
+    palavra: tecnologia
+    for tecnologia, palavras in TECNOLOGIAS_COMUNS.items()
+    for palavra in palavras
+}
+
+PADRAO_TECNOLOGIAS = re.compile(
+    r"(?<![\w#+])(" +
+    "|".join(re.escape(p) for p in sorted(TECNOLOGIA_POR_PALAVRA, key=len, reverse=True)) +
+    r")(?![\w#+])"
+)
+
+
+def extrair_habilidades(requisitos):
+    if not requisitos:
+        return set()
+    return {TECNOLOGIA_POR_PALAVRA[palavra] for palavra in PADRAO_TECNOLOGIAS.findall(requisitos.lower())}
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('habilidades_extraidas', postgresql.ARRAY(sa.String(50)), nullable=True))
+    
+    conn = op.get_bind()
+    atualizar = sa.text("UPDATE jobs SET habilidades_extraidas = :habilidades WHERE id = :id")
+    for job_id, requisitos in conn.execute(sa.text("SELECT id, requirements FROM jobs")):
+        conn.execute(atualizar, {"id": job_id, "habilidades": sorted(extrair_habilidades(requisitos))})
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'habilidades_extraidas')
@@ -0,0 +1,49 @@
+"""Add recomendacoes_vagas table
+
+Revision ID: 043_add_recomendacoes_vagas
+Revises: 042_add_jobs_habilidades_extraidas
+Create Date: 2026-10-16
+
+Top-N de vagas recomendadas por candidato, calculado em lote
+(python -m app.services.recomendacao_lote) e lido pelos endpoints de recomendação.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '043_add_recomendacoes_vagas'
+down_revision = '042_add_jobs_habilidades_extraidas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recomendacoes_vagas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('posicao', sa.Integer(), nullable=False),
+        sa.Column('compatibilidade_score', sa.Float(), nullable=False),
+        sa.Column('score_habilidades', sa.Float(), nullable=False),
+        sa.Column('score_localizacao', sa.Float(), nullable=False),
+        sa.Column('score_experiencia', sa.Float(), nullable=False),
+        sa.Column('motivo_localizacao', sa.String(255), nullable=True),
+        sa.Column('habilidades_matches', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('habilidades_faltando', postgresql.ARRAY(sa.String(50)), nullable=True),
+        sa.Column('calculado_em', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('candidate_id', 'job_id', name='uq_recomendacao_vaga')
+    )
+    op.create_index('ix_recomendacoes_vagas_id', 'recomendacoes_vagas', ['id'])
+    op.create_index('ix_recomendacoes_vagas_candidato_posicao', 'recomendacoes_vagas', ['candidate_id', 'posicao'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recomendacoes_vagas_candidato_posicao', table_name='recomendacoes_vagas')
+    op.drop_index('ix_recomendacoes_vagas_id', table_name='recomendacoes_vagas')
+    op.drop_table('recomendacoes_vagas')
@@ -0,0 +1,34 @@
+"""Add assinaturas_vagas table
+
+Revision ID: 044_add_assinaturas_vagas
+Revises: 043_add_recomendacoes_vagas
+Create Date: 2026-10-16
+
+Assinaturas MinHash das vagas para o índice de vagas semelhantes.
+Vagas já abertas recebem a assinatura com python -m app.services.vagas_similares
+(calcular_assinaturas_faltantes); a leitura do índice não grava assinaturas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '044_add_assinaturas_vagas'
+down_revision = '043_add_recomendacoes_vagas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'assinaturas_vagas',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('assinatura', sa.LargeBinary(), nullable=False),
+        sa.Column('calculado_em', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('job_id'),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('assinaturas_vagas')
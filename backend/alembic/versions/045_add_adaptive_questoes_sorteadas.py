@@ -0,0 +1,26 @@
+"""Add questoes_sorteadas to adaptive_test_sessions
+
+Revision ID: 045_add_adaptive_questoes_sorteadas
+Revises: 044_add_assinaturas_vagas
+Create Date: 2026-10-16
+
+Sequência de questões sorteada no início de cada nível do teste adaptativo,
+persistida na sessão ({nivel: [question_id, ...]}).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '045_add_adaptive_questoes_sorteadas'
+down_revision = '044_add_assinaturas_vagas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('adaptive_test_sessions', sa.Column('questoes_sorteadas', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('adaptive_test_sessions', 'questoes_sorteadas')
@@ -0,0 +1,34 @@
+"""Add versoes_cache table
+
+Revision ID: 046_add_versoes_cache
+Revises: 045_add_adaptive_questoes_sorteadas
+Create Date: 2026-10-17
+
+Contador de versão por cache em memória (banco de questões/gabarito), incrementado
+no commit que altera tests/questions/alternatives e conferido por todos os workers
+antes de corrigir respostas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '046_add_versoes_cache'
+down_revision = '045_add_adaptive_questoes_sorteadas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    versoes_cache = op.create_table(
+        'versoes_cache',
+        sa.Column('chave', sa.String(length=50), nullable=False),
+        sa.Column('versao', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('chave')
+    )
+    op.bulk_insert(versoes_cache, [{'chave': 'banco_questoes', 'versao': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('versoes_cache')
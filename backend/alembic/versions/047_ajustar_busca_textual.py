@@ -0,0 +1,72 @@
+"""Ajusta a busca textual: requisitos das vagas e habilidades dos candidatos
+
+Revision ID: 047_ajustar_busca_textual
+Revises: 046_add_versoes_cache
+Create Date: 2026-10-17
+
+- ix_jobs_requirements_busca: índice GIN de expressão com o tsvector só dos
+  requisitos, para a busca de vagas por requisito (jobs.busca_vetor inclui
+  também título e descrição)
+- candidates.busca_vetor passa a indexar só os valores textuais do JSON de
+  habilidades (f_habilidades_tsvector), não as chaves ("habilidade", "nivel",
+  "anos_experiencia"). Coluna gerada não aceita ALTER da expressão: é recriada.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '047_ajustar_busca_textual'
+down_revision = '046_add_versoes_cache'
+branch_labels = None
+depends_on = None
+
+
+VETOR_CANDIDATO_ANTERIOR = """
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(full_name, ''))), 'A') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(habilidades, ''))), 'B') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(area_atuacao, ''))), 'C')
+"""
+
+VETOR_CANDIDATO = """
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(full_name, ''))), 'A') ||
+    setweight(f_habilidades_tsvector(habilidades), 'B') ||
+    setweight(to_tsvector('portuguese', f_unaccent(coalesce(area_atuacao, ''))), 'C')
+"""
+
+
+def _recriar_vetor_candidato(expressao: str) -> None:
+    op.execute("DROP INDEX IF EXISTS ix_candidates_busca_vetor")
+    op.execute("ALTER TABLE candidates DROP COLUMN busca_vetor")
+    op.execute(f"ALTER TABLE candidates ADD COLUMN busca_vetor tsvector GENERATED ALWAYS AS ({expressao}) STORED")
+    op.execute("CREATE INDEX ix_candidates_busca_vetor ON candidates USING gin (busca_vetor)")
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX ix_jobs_requirements_busca ON jobs
+        USING gin (to_tsvector('portuguese', f_unaccent(coalesce(requirements, ''))))
+    """)
+
+    # Valores string do JSON (nomes das habilidades); texto que não é JSON é indexado como está
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_habilidades_tsvector(text)
+        RETURNS tsvector
+        LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE
+        AS $$
+        BEGIN
+            IF $1 IS NULL THEN
+                RETURN ''::tsvector;
+            END IF;
+            RETURN jsonb_to_tsvector('portuguese', f_unaccent($1)::jsonb, '["string"]');
+        EXCEPTION WHEN others THEN
+            RETURN to_tsvector('portuguese', f_unaccent(coalesce($1, '')));
+        END
+        $$
+    """)
+    _recriar_vetor_candidato(VETOR_CANDIDATO)
+
+
+def downgrade() -> None:
+    _recriar_vetor_candidato(VETOR_CANDIDATO_ANTERIOR)
+    op.execute("DROP FUNCTION IF EXISTS f_habilidades_tsvector(text)")
+    op.execute("DROP INDEX IF EXISTS ix_jobs_requirements_busca")
@@ -1,7 +1,7 @@
 """
 Rotas para endpoints da empresa (vagas, matching, kanban)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -10,6 +10,7 @@ from app.models import User, Company, Job, VagaCandidato, Candidate, Competencia
 from app.schemas.vaga import VagaCreate, VagaResponse, ListaVagas, VagaUpdate
 from app.schemas.competencia import CompetenciaResponse, CompetenciaSelectResponse
 from app.services.empresa_service import EmpresaService
+from app.services.matching_service import MatchingService
 from app.services.email_service import EmailService
 from app.models.competencia import AreaAtuacao
 from pydantic import BaseModel
@@ -83,6 +84,7 @@ async def criar_vaga(
 @router.post("/vagas/{vaga_id}/publicar")
 async def publicar_vaga(
     vaga_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -107,7 +109,14 @@ async def publicar_vaga(
     vaga.published_at = datetime.utcnow()
     db.commit()
     
-    return {"mensagem": "Vaga publicada com sucesso"}
+    # Matching da vaga publicada calculado em segundo plano
+    execucao = MatchingService.agendar_recalculo(db, vaga.id, "publicacao")
+    background_tasks.add_task(MatchingService.executar_recalculo, execucao.id, vaga.id)
+    
+    return {
+        "mensagem": "Vaga publicada com sucesso",
+        "matching_execucao_id": execucao.id
+    }
 
 
 @router.get("/vagas")
@@ -275,6 +284,48 @@ async def obter_matching_detalhado(
     }
 
 
+@router.get("/vagas/{vaga_id}/matching/status")
+async def obter_status_matching(
+    vaga_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Obtém o progresso do cálculo de matching da vaga (executado em segundo plano)"""
+    if current_user.user_type.value != "empresa":
+        raise HTTPException(status_code=403, detail="Acesso permitido apenas para empresas")
+    
+    company = db.query(Company).filter(Company.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    
+    vaga = db.query(Job).filter(
+        Job.id == vaga_id,
+        Job.company_id == company.id
+    ).first()
+    
+    if not vaga:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
+    
+    execucao = MatchingService.obter_ultima_execucao(db, vaga_id)
+    if not execucao:
+        raise HTTPException(status_code=404, detail="Nenhum cálculo de matching registrado para esta vaga")
+    
+    return {
+        "vaga_id": vaga_id,
+        "execucao_id": execucao.id,
+        "status": execucao.status,
+        "motivo": execucao.motivo,
+        "progresso": execucao.progresso,
+        "total_candidatos": execucao.total_candidatos,
+        "candidatos_processados": execucao.candidatos_processados,
+        "candidatos_compativeis": execucao.candidatos_compativeis,
+        "erro": execucao.erro,
+        "criado_em": execucao.created_at,
+        "iniciado_em": execucao.iniciado_em,
+        "concluido_em": execucao.concluido_em
+    }
+
+
 @router.get("/vagas/{vaga_id}/kanban")
 async def obter_kanban_vaga(
     vaga_id: int,
@@ -387,24 +438,12 @@ async def obter_dados_candidato(
     try:
         candidate_id_int = int(candidate_id)
     except ValueError:
-        # É um ID anônimo (CAND-XXXXX), precisa buscar na tabela VagaCandidato
-        from app.models.candidato_teste import VagaCandidato
-        from app.services.candidato_service import anonimizar_candidato
-        
-        # Buscar VagaCandidato com esse candidate_id anônimo
-        # Primeiro, buscar todos os candidatos e encontrar o que gera esse ID anônimo
-        vaga_candidato = db.query(VagaCandidato).filter(
-            VagaCandidato.vaga_id == vaga_id
-        ).all()
+        # É um ID anônimo (CAND-XXXXX): busca indexada em candidates.id_anonimo
+        from app.utils.anonimizacao import buscar_candidato_por_id_anonimo
         
-        for vc in vaga_candidato:
-            candidate = vc.candidate
-            if candidate:
-                # Gerar ID anônimo desse candidato
-                id_anonimo = anonimizar_candidato(candidate).get("id_anonimo")
-                if id_anonimo == candidate_id:
-                    candidate_id_int = candidate.id
-                    break
+        candidate = buscar_candidato_por_id_anonimo(db, candidate_id)
+        if candidate:
+            candidate_id_int = candidate.id
         
         if not candidate_id_int:
             raise HTTPException(status_code=404, detail="Candidato não encontrado")
@@ -420,6 +459,87 @@ async def obter_dados_candidato(
     
     return dados
 
+
+@router.get("/vagas/{vaga_id}/candidatos/{candidate_id}/similares")
+async def obter_candidatos_similares(
+    vaga_id: int,
+    candidate_id: str = Path(..., description="ID anônimo do candidato (formato CAND-XXXXX)"),
+    k: int = Query(10, ge=1, le=50, description="Quantidade de candidatos semelhantes"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Candidatos com perfil de competências mais parecido com o de um candidato
+    (ex.: o contratado da vaga). Busca aproximada (LSH) sobre os níveis 0-4 de
+    cada competência; retorna apenas dados anônimos.
+    
+    O candidato de referência é informado pelo ID anônimo e precisa estar
+    vinculado à vaga (VagaCandidato), como em obter_dados_candidato.
+    """
+    if current_user.user_type.value != "empresa":
+        raise HTTPException(status_code=403, detail="Acesso permitido apenas para empresas")
+    
+    company = db.query(Company).filter(Company.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    
+    vaga = db.query(Job).filter(
+        Job.id == vaga_id,
+        Job.company_id == company.id
+    ).first()
+    
+    if not vaga:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
+    
+    from app.utils.anonimizacao import buscar_candidato_por_id_anonimo
+    
+    # Apenas o ID anônimo: aceitar o ID inteiro permitiria montar o mapa ID real -> ID anônimo
+    candidato = buscar_candidato_por_id_anonimo(db, candidate_id)
+    vinculado = candidato and db.query(VagaCandidato.id).filter(
+        VagaCandidato.vaga_id == vaga_id,
+        VagaCandidato.candidate_id == candidato.id
+    ).first()
+    
+    if not vinculado:
+        raise HTTPException(status_code=404, detail="Candidato não encontrado")
+    
+    from app.services.candidatos_similares import obter_indice_similares
+    
+    similares = obter_indice_similares(db).similares(candidato.id, k)
+    if similares is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Candidato ainda não possui competências avaliadas"
+        )
+    
+    ids = [similar_id for similar_id, _ in similares]
+    perfis = {
+        perfil.id: perfil
+        for perfil in db.query(Candidate.id, Candidate.id_anonimo, Candidate.area_atuacao)
+        .filter(Candidate.id.in_(ids)).all()
+    } if ids else {}
+    status_na_vaga = dict(
+        db.query(VagaCandidato.candidate_id, VagaCandidato.status_kanban).filter(
+            VagaCandidato.vaga_id == vaga_id,
+            VagaCandidato.candidate_id.in_(ids)
+        ).all()
+    ) if ids else {}
+    
+    return {
+        "total": len(similares),
+        "similares": [
+            {
+                "id_anonimo": perfis[similar_id].id_anonimo,
+                "area_atuacao": perfis[similar_id].area_atuacao,
+                "similaridade": round(similaridade * 100, 1),
+                "status_na_vaga": status_na_vaga[similar_id].value if status_na_vaga.get(similar_id) else None
+            }
+            for similar_id, similaridade in similares
+            if similar_id in perfis
+        ]
+    }
+
+
 @router.get("/convites/{vaga_id}")
 async def obter_convites_vaga(
     vaga_id: int,
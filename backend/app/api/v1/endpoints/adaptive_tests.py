@@ -4,7 +4,6 @@ Implementa o sistema de classificação por níveis (Básico, Intermediário, Av
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional, Dict
 from datetime import datetime
 from pydantic import BaseModel, Field
@@ -13,8 +12,10 @@ import logging
 from app.core.database import get_db
 from app.core.dependencies import get_current_candidate
 from app.models.candidate import Candidate
-from app.models.test import Test, Question, Alternative, TestLevel, AdaptiveTestSession, CandidateTestResult
+from app.models.test import TestLevel, AdaptiveTestSession, CandidateTestResult
 from app.models.competencia import AutoavaliacaoCompetencia
+from app.services.banco_questoes import banco_questoes
+from app.services.correcao_testes import CorrecaoTestes
 
 logger = logging.getLogger(__name__)
 
@@ -169,10 +170,7 @@ async def iniciar_teste_adaptativo(
     nivel_teste = mapa_nivel_teste[nivel_autoavaliacao]
     
     # Buscar questões do nível de autoavaliação
-    questoes = db.query(Question).join(Test).filter(
-        Test.habilidade.ilike(f"%{habilidade}%"),
-        Test.nivel == nivel_teste
-    ).order_by(func.random()).limit(5).all()
+    questoes = banco_questoes.sortear(db, habilidade, nivel_teste, 5)
     
     if not questoes or len(questoes) < 5:
         raise HTTPException(
@@ -190,15 +188,13 @@ async def iniciar_teste_adaptativo(
         total_basico=5 if nivel_autoavaliacao == 1 else 0,
         total_intermediario=5 if nivel_autoavaliacao == 2 else 0,
         total_avancado=5 if nivel_autoavaliacao == 3 else 0,
+        questoes_sorteadas={str(nivel_teste.value): [q.id for q in questoes]},
     )
     
     db.add(sessao)
     db.commit()
     db.refresh(sessao)
     
-    # Armazenar questões na sessão
-    sessao.questoes_atuais = questoes
-    
     # Retornar primeira questão
     primeira_questao = questoes[0]
     
@@ -247,23 +243,15 @@ async def responder_questao(
             detail="Sessão não encontrada ou já foi concluída"
         )
     
-    # Buscar questão
-    questao = db.query(Question).filter(Question.id == resposta.question_id).first()
-    if not questao:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Questão não encontrada"
-        )
-    
-    # Buscar alternativa e verificar se está correta
-    alternativa = db.query(Alternative).filter(Alternative.id == resposta.alternative_id).first()
-    if not alternativa:
+    # Buscar questão e alternativa e verificar se está correta (gabarito em memória)
+    corrigida, erro = CorrecaoTestes.corrigir_resposta(db, resposta.question_id, resposta.alternative_id)
+    if erro:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Alternativa não encontrada"
+            detail=erro
         )
     
-    acertou = alternativa.is_correct
+    acertou = corrigida.acertou
     
     # Atualizar histórico
     if not sessao.historico_respostas:
@@ -288,10 +276,7 @@ async def responder_questao(
     # Incrementar índice
     sessao.questao_atual_index += 1
     
-    resposta_correta = db.query(Alternative).filter(
-        Alternative.question_id == resposta.question_id,
-        Alternative.is_correct == True
-    ).first()
+    resposta_correta = corrigida.alternativa_correta
     
     # Verificar se tem mais questões neste nível
     tem_mais_questoes = sessao.questao_atual_index < 5
@@ -301,14 +286,13 @@ async def responder_questao(
     resultado_final = None
     
     if tem_mais_questoes:
-        # Buscar próxima questão do mesmo nível
-        questoes = db.query(Question).join(Test).filter(
-            Test.habilidade.ilike(f"%{sessao.habilidade}%"),
-            Test.nivel == sessao.nivel_atual
-        ).order_by(func.random()).limit(5).offset(sessao.questao_atual_index).all()
+        # Próxima questão da sequência sorteada no início do nível
+        sorteadas = (sessao.questoes_sorteadas or {}).get(sessao.nivel_atual, [])
+        proxima_q = None
+        if sessao.questao_atual_index < len(sorteadas):
+            proxima_q = banco_questoes.questao(db, sorteadas[sessao.questao_atual_index])
         
-        if questoes:
-            proxima_q = questoes[0]
+        if proxima_q:
             proxima_questao_data = {
                 "id": proxima_q.id,
                 "texto_questao": proxima_q.texto_questao,
@@ -1,7 +1,7 @@
 """
 Endpoints de administração
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from io import BytesIO
 from app.core.database import get_db
@@ -18,6 +18,8 @@ from app.schemas.test import TestCreate, TestUpdate, TestResponse, TestListRespo
 from app.schemas.competencia import CompetenciaCreate, CompetenciaResponse
 from app.schemas.job import JobCreate
 from app.services.test_import_service import TestImportService
+from app.services.matching_service import MatchingService
+from app.services.search_service import SearchService
 from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 import logging
@@ -259,6 +261,46 @@ async def get_admin_dashboard_stats(
     }
 
 
+@router.get("/cache/recomendacoes")
+async def get_recommendation_cache_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Métricas do cache de recomendações de vagas deste processo
+    (itens, acertos, falhas, taxa de acerto, descartes LRU e invalidações)
+    """
+    from app.services.recommendation_service import cache_recomendacoes
+    
+    return cache_recomendacoes.estatisticas()
+
+
+@router.get("/cache/banco-questoes")
+async def get_question_bank_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Estado do banco de questões em memória deste processo
+    (versão atual, versão carregada, questões, grupos habilidade x nível e recargas)
+    """
+    from app.services.banco_questoes import banco_questoes
+    
+    return banco_questoes.estatisticas()
+
+
+@router.post("/indices/candidatos-similares/reconstruir")
+async def rebuild_similar_candidates_index(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Reconstrói o índice de candidatos semelhantes deste processo
+    (as atualizações normais são incrementais, após cada commit)
+    """
+    from app.services.candidatos_similares import reconstruir_indice
+    
+    return {"candidatos_indexados": reconstruir_indice(db)}
+
+
 @router.get("/usuarios")
 async def get_all_users(
     skip: int = Query(0, ge=0, description="Número de registros a pular"),
@@ -321,6 +363,7 @@ async def get_all_users(
 async def get_all_jobs(
     skip: int = Query(0, ge=0, description="Número de registros a pular"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de registros a retornar (máximo 100)"),
+    busca: Optional[str] = Query(None, description="Buscar por título, requisitos ou descrição"),
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -332,9 +375,14 @@ async def get_all_jobs(
     Query Parameters:
     - skip: Número de registros a pular (default: 0)
     - limit: Número máximo de registros por página (default: 10, máximo: 100)
+    - busca: Título, requisitos ou descrição (ordenado por relevância)
     """
-    total = db.query(Job).count()
-    jobs = db.query(Job).offset(skip).limit(limit).all()
+    query = db.query(Job)
+    if busca:
+        query = SearchService.filtrar_vagas(query, busca)
+    
+    total = query.count()
+    jobs = query.offset(skip).limit(limit).all()
     
     # Formatar resposta com informações relevantes
     jobs_list = []
@@ -561,6 +609,7 @@ async def delete_job_admin(
 @router.post("/vagas/{job_id}/publish")
 async def publish_job_admin(
     job_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -586,11 +635,16 @@ async def publish_job_admin(
         db.commit()
         db.refresh(job)
         
+        # Matching da vaga publicada calculado em segundo plano
+        execucao = MatchingService.agendar_recalculo(db, job.id, "publicacao")
+        background_tasks.add_task(MatchingService.executar_recalculo, execucao.id, job.id)
+        
         return {
             "id": job.id,
             "title": job.title,
             "status": job.status.value,
             "published_at": job.published_at,
+            "matching_execucao_id": execucao.id,
             "message": "Vaga publicada com sucesso"
         }
     except Exception as e:
@@ -961,12 +1015,9 @@ async def get_all_candidates(
     """
     query = db.query(Candidate)
     
-    # Filtro de busca (nome ou email)
+    # Filtro de busca (nome, habilidades, área ou email) ordenado por relevância
     if busca:
-        query = query.filter(
-            (Candidate.full_name.ilike(f"%{busca}%")) |
-            (Candidate.user.has(User.email.ilike(f"%{busca}%")))
-        )
+        query = SearchService.filtrar_candidatos(query, busca)
     
     # Filtro de localização
     if localizacao:
@@ -974,7 +1025,7 @@ async def get_all_candidates(
     
     # Filtro de habilidade
     if habilidade:
-        query = query.filter(Candidate.habilidades.ilike(f"%{habilidade}%"))
+        query = SearchService.filtrar_candidatos_por_habilidade(query, habilidade)
     
     # Contar total antes de aplicar paginação
     total = query.count()
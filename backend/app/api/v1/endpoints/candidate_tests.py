@@ -16,9 +16,12 @@ from app.models.test import Test, Question, Alternative, TestLevel, AdaptiveTest
 from app.schemas.test import (
     TestResponse, QuestionResponse, AlternativeResponse,
     AdaptiveTestSessionStart, NextQuestionResponse, QuestionWithAlternatives,
-    AnswerQuestionRequest, AdaptiveTestResult
+    AnswerQuestionRequest, AdaptiveTestResult,
+    AnswerSheetResponse, AnswerSheetSubmit, AnswerSheetResult
 )
 from app.services.adaptive_test_service import AdaptiveTestService
+from app.services.banco_questoes import banco_questoes
+from app.services.correcao_testes import CorrecaoTestes
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
@@ -385,18 +388,13 @@ async def obter_questoes_com_filtros(
             niveis = [TestLevel.basico, TestLevel.intermediario, TestLevel.avancado]
             
             for nivel_enum in niveis:
-                query = db.query(Question).join(Test)
+                questoes_nivel = banco_questoes.questoes(db, habilidade, nivel_enum)
                 
-                if habilidade:
-                    query = query.filter(Test.habilidade.ilike(f"%{habilidade}%"))
-                
-                query = query.filter(Test.nivel == nivel_enum)
-                
-                total_nivel = query.count()
+                total_nivel = len(questoes_nivel)
                 total_geral += total_nivel
                 
                 # Pega 'limit' questões deste nível
-                questoes = query.order_by(Question.id).limit(limit).all()
+                questoes = questoes_nivel[:limit]
                 
                 for questao in questoes:
                     alternativas = [
@@ -431,16 +429,11 @@ async def obter_questoes_com_filtros(
                     detail=f"Nível inválido: '{nivel}'. Use um de: Iniciante, Básico, Intermediário, Avançado, Expert"
                 )
             
-            query = db.query(Question).join(Test)
-            
-            if habilidade:
-                query = query.filter(Test.habilidade.ilike(f"%{habilidade}%"))
+            questoes_nivel = banco_questoes.questoes(db, habilidade, nivel_enum)
             
-            query = query.filter(Test.nivel == nivel_enum)
+            total_geral = len(questoes_nivel)
             
-            total_geral = query.count()
-            
-            questoes = query.order_by(Question.id).offset(skip).limit(limit).all()
+            questoes = questoes_nivel[skip:skip + limit]
             
             for questao in questoes:
                 alternativas = [
@@ -576,7 +569,7 @@ def submeter_teste(
             )
         
         # Validar que o candidato enviou respostas para todas as questões
-        total_questoes = len(teste.questions)
+        total_questoes = len(banco_questoes.questoes_do_teste(db, teste.id))
         total_respostas = len(submissao.respostas)
         
         if total_respostas != total_questoes:
@@ -586,56 +579,37 @@ def submeter_teste(
                        f"Respondidas: {total_respostas}"
             )
         
-        # Processar respostas
+        # Corrigir todas as respostas pelo gabarito em memória
+        respostas_map = {r.question_id: r.alternative_id for r in submissao.respostas}
+        corrigidas, erro = CorrecaoTestes.corrigir_teste(db, teste.id, respostas_map)
+        
+        if erro:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=erro
+            )
+        
         total_acertos = 0
         resultados_questoes = []
         
-        respostas_map = {r.question_id: r.alternative_id for r in submissao.respostas}
-        
-        for questao in teste.questions:
-            if questao.id not in respostas_map:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail=f"Falta resposta para a questão {questao.ordem}"
-                )
-            
-            alternative_id_escolhida = respostas_map[questao.id]
-            
-            # Encontrar alternativa correta
-            alternativa_correta = db.query(Alternative).filter(
-                Alternative.question_id == questao.id,
-                Alternative.is_correct == True
-            ).first()
-            
-            # Encontrar alternativa escolhida
-            alternativa_escolhida = db.query(Alternative).filter(
-                Alternative.id == alternative_id_escolhida,
-                Alternative.question_id == questao.id
-            ).first()
-            
-            if not alternativa_escolhida:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail=f"Alternativa inválida para a questão {questao.ordem}"
-                )
-            
-            if not alternativa_correta:
+        for corrigida in corrigidas:
+            if not corrigida.alternativa_correta:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Nenhuma alternativa correta configurada para a questão {questao.ordem}"
+                    detail=f"Nenhuma alternativa correta configurada para a questão {corrigida.questao.ordem}"
                 )
             
-            acertou = alternativa_escolhida.id == alternativa_correta.id
+            acertou = corrigida.alternativa.id == corrigida.alternativa_correta.id
             if acertou:
                 total_acertos += 1
             
             resultados_questoes.append(ResultadoQuestao(
-                question_id=questao.id,
-                texto_questao=questao.texto_questao,
-                resposta_candidato_id=alternativa_escolhida.id,
-                resposta_candidato=alternativa_escolhida.texto,
-                resposta_correta_id=alternativa_correta.id,
-                resposta_correta=alternativa_correta.texto,
+                question_id=corrigida.questao.id,
+                texto_questao=corrigida.questao.texto_questao,
+                resposta_candidato_id=corrigida.alternativa.id,
+                resposta_candidato=corrigida.alternativa.texto,
+                resposta_correta_id=corrigida.alternativa_correta.id,
+                resposta_correta=corrigida.alternativa_correta.texto,
                 acertou=acertou
             ))
         
@@ -1265,6 +1239,200 @@ async def responder_teste_adaptativo(
         )
 
 
+def _progresso_adaptativo(sessao: AdaptiveTestSession) -> dict:
+    return {
+        "basico": {"acertos": sessao.acertos_basico, "total": sessao.total_basico},
+        "intermediario": {"acertos": sessao.acertos_intermediario, "total": sessao.total_intermediario},
+        "avancado": {"acertos": sessao.acertos_avancado, "total": sessao.total_avancado}
+    }
+
+
+def _folha_response(sessao: AdaptiveTestSession, questoes: list, token: str) -> AnswerSheetResponse:
+    return AnswerSheetResponse(
+        session_id=sessao.id,
+        nivel_atual=sessao.nivel_atual,
+        questoes=[
+            QuestionWithAlternatives(
+                id=questao.id,
+                texto_questao=questao.texto_questao,
+                pergunta=questao.texto_questao,
+                nivel=sessao.nivel_atual,
+                opcoes=[{"id": alt.id, "texto": alt.texto, "ordem": alt.ordem} for alt in questao.alternatives],
+                numero_questao=sessao.questao_atual_index + numero
+            )
+            for numero, questao in enumerate(questoes, 1)
+        ],
+        token=token,
+        progresso=_progresso_adaptativo(sessao)
+    )
+
+
+@router.get("/adaptativo/sessao/{session_id}/folha", response_model=AnswerSheetResponse)
+async def obter_folha_nivel_adaptativo(
+    session_id: int,
+    candidate: Candidate = Depends(get_current_candidate),
+    db: Session = Depends(get_db)
+):
+    """
+    Modo folha: entrega de uma vez as questões restantes do nível atual.
+    
+    O token assinado deve ser devolvido em /adaptativo/sessao/{session_id}/folha/responder
+    com todas as respostas; a correção e a decisão de nível acontecem em uma única chamada.
+    """
+    sessao = db.query(AdaptiveTestSession).filter(
+        AdaptiveTestSession.id == session_id,
+        AdaptiveTestSession.candidate_id == candidate.id
+    ).first()
+    
+    if not sessao:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sessão de teste não encontrada"
+        )
+    
+    if sessao.is_completed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Esta sessão de teste já foi finalizada"
+        )
+    
+    questoes, token = AdaptiveTestService(db).emitir_folha_nivel(sessao)
+    if not questoes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Nenhuma questão disponível para o nível {sessao.nivel_atual}"
+        )
+    
+    return _folha_response(sessao, questoes, token)
+
+
+@router.post("/adaptativo/sessao/{session_id}/folha/responder", response_model=AnswerSheetResult)
+async def responder_folha_nivel_adaptativo(
+    session_id: int,
+    submissao: AnswerSheetSubmit,
+    candidate: Candidate = Depends(get_current_candidate),
+    db: Session = Depends(get_db)
+):
+    """
+    Responde todas as questões de uma folha de uma vez.
+    
+    Corrige o nível inteiro em uma transação, decide o próximo nível pelas mesmas
+    regras do fluxo questão a questão e já devolve a folha do próximo nível
+    (ou o teste finalizado).
+    """
+    try:
+        service = AdaptiveTestService(db)
+        
+        # Bloqueia a sessão: duas submissões simultâneas da mesma folha não contam em dobro
+        sessao = db.query(AdaptiveTestSession).filter(
+            AdaptiveTestSession.id == session_id,
+            AdaptiveTestSession.candidate_id == candidate.id
+        ).with_for_update().first()
+        
+        if not sessao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sessão de teste não encontrada"
+            )
+        
+        if sessao.is_completed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Esta sessão de teste já foi finalizada"
+            )
+        
+        corrigidas, erro = service.registrar_folha(
+            sessao,
+            submissao.token,
+            {r.question_id: r.alternative_id for r in submissao.respostas}
+        )
+        
+        if erro:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=erro
+            )
+        
+        acertos = sum(1 for corrigida in corrigidas if corrigida.acertou)
+        resultados = [
+            {"question_id": corrigida.questao.id, "acertou": corrigida.acertou}
+            for corrigida in corrigidas
+        ]
+        
+        proximo_nivel, mensagem_finalizacao = service.decidir_proximo_nivel(sessao)
+        
+        if proximo_nivel:
+            sessao.nivel_atual = proximo_nivel
+            sessao.questao_atual_index = 0
+            
+            questoes, token = service.emitir_folha_nivel(sessao)
+            db.commit()
+            
+            if questoes:
+                return AnswerSheetResult(
+                    session_id=sessao.id,
+                    is_completed=False,
+                    acertos=acertos,
+                    total=len(corrigidas),
+                    resultados=resultados,
+                    proxima_folha=_folha_response(sessao, questoes, token),
+                    progresso=_progresso_adaptativo(sessao),
+                    mensagem=mensagem_finalizacao
+                )
+        
+        # Não avança: finalizar teste (commit da correção junto com a finalização)
+        sessao = service.finalizar_sessao(sessao)
+        
+        try:
+            total_acertos = sessao.acertos_basico + sessao.acertos_intermediario + sessao.acertos_avancado
+            total_questoes = sessao.total_basico + sessao.total_intermediario + sessao.total_avancado
+            
+            teste_habilidade = db.query(Test).filter(
+                Test.habilidade == sessao.habilidade
+            ).first()
+            
+            if teste_habilidade:
+                db.add(CandidateTestResult(
+                    candidate_id=candidate.id,
+                    test_id=teste_habilidade.id,
+                    total_questoes=total_questoes,
+                    total_acertos=total_acertos,
+                    percentual_acerto=round((total_acertos / total_questoes * 100) if total_questoes > 0 else 0, 2),
+                    tempo_decorrido=None,
+                    detalhes_questoes=json.dumps({
+                        "nivel_final": sessao.nivel_final_atingido,
+                        "habilidade": sessao.habilidade,
+                        "historico_respostas": sessao.historico_respostas or []
+                    })
+                ))
+                db.commit()
+        except Exception as e:
+            logger.error(f"[TESTE] Erro ao salvar resultado: {str(e)}", exc_info=True)
+            db.rollback()
+        
+        return AnswerSheetResult(
+            session_id=sessao.id,
+            is_completed=True,
+            acertos=acertos,
+            total=len(corrigidas),
+            resultados=resultados,
+            proxima_folha=None,
+            progresso=_progresso_adaptativo(sessao),
+            mensagem=f"{mensagem_finalizacao} Teste finalizado! Nível atingido: {sessao.nivel_final_atingido}"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[TESTE] Erro ao responder folha adaptativa: {str(e)}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao processar folha de respostas"
+        )
+
+
 @router.get("/adaptativo/sessao/{session_id}/resultado", response_model=AdaptiveTestResult)
 async def obter_resultado_teste_adaptativo(
     session_id: int,
@@ -1425,11 +1593,17 @@ async def obter_testes_disponiveis(
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidato não encontrado")
     
-    # Buscar autoavaliações do candidato
-    from app.models.competencia import AutoavaliacaoCompetencia
-    autoavaliacoes = db.query(AutoavaliacaoCompetencia).filter(
+    # Buscar autoavaliações do candidato (com o nome da competência, em uma consulta)
+    from app.models.competencia import AutoavaliacaoCompetencia, Competencia
+    autoavaliacoes = db.query(
+        AutoavaliacaoCompetencia.competencia_id,
+        AutoavaliacaoCompetencia.nivel_declarado,
+        Competencia.nome
+    ).outerjoin(
+        Competencia, Competencia.id == AutoavaliacaoCompetencia.competencia_id
+    ).filter(
         AutoavaliacaoCompetencia.candidate_id == candidate.id
-    ).all()
+    ).order_by(AutoavaliacaoCompetencia.id).all()
     
     if not autoavaliacoes:
         raise HTTPException(
@@ -1439,94 +1613,60 @@ async def obter_testes_disponiveis(
     
     # Mapear níveis de competências
     competencia_niveis = {}  # {competencia_id: nivel_declarado (1-4)}
-    for autoav in autoavaliacoes:
+    competencia_nomes = {}  # {competencia_id: nome}
+    for competencia_id, nivel_declarado, nome in autoavaliacoes:
         try:
-            nivel = int(autoav.nivel_declarado)
-            competencia_niveis[autoav.competencia_id] = nivel
+            competencia_niveis[competencia_id] = int(nivel_declarado)
+            competencia_nomes[competencia_id] = nome
         except (ValueError, TypeError):
             continue
     
-    # Buscar testes relacionados às competências avaliadas
-    testes_por_competencia = {}
+    # Nível de teste aplicado para cada nível da matriz (N4 usa as questões avançadas)
+    nivel_teste_map = {
+        "N1": TestLevel.basico,
+        "N2": TestLevel.intermediario,
+        "N3": TestLevel.avancado,
+        "N4": TestLevel.avancado
+    }
     
-    for competencia_id in competencia_niveis.keys():
-        # Buscar testes que tenham questões relacionadas a esta competência
-        testes = db.query(Test).filter(
-            Test.id.in_(
-                db.query(Question.test_id).filter(
-                    # Aqui você pode adicionar uma relação entre Question e Competencia
-                    # Por enquanto, vamos buscar testes cujo nome inclua a competência
-                ).all()
-            ) if db.query(Question.test_id).filter().all() else []
-        ).all()
-        
-        if not testes:
-            # Fallback: buscar testes sem filtro de competência se necessário
-            testes = db.query(Test).limit(3).all()
-        
-        testes_por_competencia[competencia_id] = testes
-    
-    # Algoritmo de seleção de testes baseado na matriz
-    testes_selecionados = []
-    questoes_coletadas = []
+    # Selecionar testes no catálogo em memória (competência x nível), até 15 questões
+    testes_response = []
+    total_questoes = 0
+    ids_selecionados = set()
     
     for competencia_id, nivel_auto in competencia_niveis.items():
-        # Determinar qual nível de teste aplicar
         nivel_teste = _determinar_nivel_teste(nivel_auto)
+        nome = competencia_nomes.get(competencia_id)
         
-        if nivel_teste == "N0":
+        if nivel_teste == "N0" or not nome:
             continue  # Não aplica teste
         
-        # Buscar testes do nível apropriado
-        testes_competencia = testes_por_competencia.get(competencia_id, [])
+        # Testes do nível apropriado; sem eles, qualquer nível da competência
+        testes = (
+            banco_questoes.testes_catalogo(db, nome, nivel_teste_map[nivel_teste])
+            or banco_questoes.testes_catalogo(db, nome)
+        )
         
-        for teste in testes_competencia:
-            if teste.id not in [t.id for t in testes_selecionados]:
-                testes_selecionados.append(teste)
-                
-                # Coletar questões do teste
-                questoes = db.query(Question).filter(
-                    Question.test_id == teste.id
-                ).order_by(Question.ordem).all()
-                
-                for questao in questoes:
-                    if len(questoes_coletadas) < 15:  # Máximo 15 questões
-                        # Buscar alternativas
-                        alternativas = db.query(Alternative).filter(
-                            Alternative.question_id == questao.id
-                        ).order_by(Alternative.ordem).all()
-                        
-                        questao_dict = {
-                            "id": questao.id,
-                            "texto_questao": questao.texto_questao,
-                            "ordem": questao.ordem,
-                            "alternatives": [
-                                AlternativaSimples(
-                                    id=alt.id,
-                                    texto=alt.texto,
-                                    ordem=alt.ordem
-                                ).model_dump()
-                                for alt in alternativas
-                            ]
-                        }
-                        questoes_coletadas.append(questao_dict)
+        for teste in testes:
+            if teste.id in ids_selecionados:
+                continue
+            ids_selecionados.add(teste.id)
             
-            if len(questoes_coletadas) >= 15:
-                break
-        
-        if len(questoes_coletadas) >= 15:
-            break
-    
-    # Organizar resposta com testes e questões
-    testes_response = []
-    
-    for teste in testes_selecionados:
-        questoes_teste = [q for q in questoes_coletadas if db.query(Question).filter(
-            Question.id == q['id']
-        ).first().test_id == teste.id]
-        
-        if questoes_teste:
-            teste_dict = {
+            questoes_teste = [
+                {
+                    "id": questao.id,
+                    "texto_questao": questao.texto_questao,
+                    "ordem": questao.ordem,
+                    "alternatives": [
+                        {"id": alt.id, "texto": alt.texto, "ordem": alt.ordem}
+                        for alt in questao.alternatives
+                    ]
+                }
+                for questao in teste.questoes[:15 - total_questoes]  # Máximo 15 questões
+            ]
+            total_questoes += len(questoes_teste)
+            
+            testes_response.append({
                 "id": teste.id,
                 "nome": teste.nome,
                 "habilidade": teste.habilidade,
@@ -1534,11 +1674,16 @@ async def obter_testes_disponiveis(
                 "descricao": teste.descricao,
                 "questoes": questoes_teste,
                 "total_questoes": len(questoes_teste)
-            }
-            testes_response.append(teste_dict)
+            })
+            
+            if total_questoes >= 15:
+                break
+        
+        if total_questoes >= 15:
+            break
     
     # Se não houver questões coletadas, retornar mensagem informativa
-    if not questoes_coletadas:
+    if not total_questoes:
         return ListaTestesDisponiveisResponse(
             total_testes=0,
             testes=[],
@@ -1550,7 +1695,7 @@ async def obter_testes_disponiveis(
         total_testes=len(testes_response),
         testes=testes_response,
         autoavaliacao_nivel=competencia_niveis,
-        mensagem=f"{len(questoes_coletadas)} questões disponíveis em {len(testes_response)} teste(s)"
+        mensagem=f"{total_questoes} questões disponíveis em {len(testes_response)} teste(s)"
     )
 
 
@@ -16,7 +16,12 @@ from app.schemas.candidato_anonimo import (
     CandidatoAnonimoListResponse,
     CandidatoAnonimoDetalhesResponse
 )
-from app.utils.anonimizacao import gerar_id_anonimo, anonimizar_candidato
+from app.utils.anonimizacao import (
+    buscar_candidato_por_id_anonimo,
+    anonimizar_candidato,
+    anonimizar_candidatos,
+    opcoes_carregamento_anonimizacao
+)
 from app.models.candidato_teste import CandidatoTeste
 from app.models.competencia import AutoavaliacaoCompetencia
 
@@ -349,14 +354,16 @@ async def listar_candidatos_anonimos(
     # Contar total
     total = query.count()
     
-    # Aplicar paginação
-    candidates = query.order_by(Candidate.created_at.desc()).offset(skip).limit(limit).all()
+    # Aplicar paginação (relacionamentos da anonimização carregados em lote)
+    candidates = query.options(
+        *opcoes_carregamento_anonimizacao()
+    ).order_by(Candidate.created_at.desc()).offset(skip).limit(limit).all()
     
     # Converter para resposta anônima
-    candidatos_anonimos = []
-    for candidate in candidates:
-        dados_anonimos = anonimizar_candidato(candidate)
-        candidatos_anonimos.append(CandidatoAnonimoResponse(**dados_anonimos))
+    candidatos_anonimos = [
+        CandidatoAnonimoResponse(**dados_anonimos)
+        for dados_anonimos in anonimizar_candidatos(db, candidates)
+    ]
     
     return CandidatoAnonimoListResponse(
         total=total,
@@ -392,15 +399,8 @@ async def obter_detalhes_candidato_anonimo(
     - ✅ Histórico de testes
     """
     
-    # Buscar todos os candidatos para encontrar aquele com o ID anônimo correspondente
-    # (O ID anônimo é um hash do ID real + CPF)
-    candidates = db.query(Candidate).all()
-    
-    candidate_found = None
-    for candidate in candidates:
-        if gerar_id_anonimo(candidate.id, candidate.cpf) == id_anonimo:
-            candidate_found = candidate
-            break
+    # Busca indexada pelo ID anônimo (hash do ID real + CPF persistido em candidates.id_anonimo)
+    candidate_found = buscar_candidato_por_id_anonimo(db, id_anonimo)
     
     if not candidate_found:
         raise HTTPException(
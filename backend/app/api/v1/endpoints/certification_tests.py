@@ -19,9 +19,12 @@ import logging
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_candidate, get_current_company
+from app.services.matching_service import MatchingService
+from app.services.banco_questoes import banco_questoes, QuestaoBanco
+from app.services.correcao_testes import CorrecaoTestes
 from app.models.candidate import Candidate
 from app.models.company import Company
-from app.models.test import Test, Question, Alternative, TestLevel
+from app.models.test import TestLevel
 from app.models.competencia import (
     CertificacaoSessao, 
     CertificacaoCompetencia, 
@@ -174,20 +177,11 @@ class MapaCompetenciasResponse(BaseModel):
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
-def _obter_questoes_nivel(db: Session, competencia: str, nivel: str, questoes_usadas: List[int], quantidade: int = 5) -> List[Question]:
+def _obter_questoes_nivel(db: Session, competencia: str, nivel: str, questoes_usadas: List[int], quantidade: int = 5) -> List[QuestaoBanco]:
     """Obtém questões para um nível específico, excluindo já usadas"""
     test_level = NIVEL_PARA_TEST_LEVEL.get(nivel)
     
-    query = db.query(Question).join(Test).filter(
-        Test.habilidade.ilike(f"%{competencia}%"),
-        Test.nivel == test_level
-    )
-    
-    if questoes_usadas:
-        query = query.filter(~Question.id.in_(questoes_usadas))
-    
-    questoes = query.order_by(func.random()).limit(quantidade).all()
-    return questoes
+    return banco_questoes.sortear(db, competencia, test_level, quantidade, excluir=set(questoes_usadas))
 
 
 def _calcular_nivel_final(sessao: CertificacaoSessao) -> int:
@@ -238,7 +232,7 @@ def _calcular_nivel_final(sessao: CertificacaoSessao) -> int:
         return 4  # N4 - Especialista (perfeito)
 
 
-def _questao_para_response(questao: Question) -> Dict:
+def _questao_para_response(questao: QuestaoBanco) -> Dict:
     """Converte questão para response"""
     return {
         "id": questao.id,
@@ -380,28 +374,16 @@ async def responder_questao(
             detail="Sessão não encontrada ou já finalizada"
         )
     
-    # Validar questão
-    questao = db.query(Question).filter(Question.id == request.question_id).first()
-    if not questao:
-        raise HTTPException(status_code=404, detail="Questão não encontrada")
-    
-    # Validar alternativa
-    alternativa = db.query(Alternative).filter(
-        Alternative.id == request.alternative_id,
-        Alternative.question_id == request.question_id
-    ).first()
-    
-    if not alternativa:
-        raise HTTPException(status_code=404, detail="Alternativa não encontrada")
+    # Validar questão e alternativa e corrigir pelo gabarito em memória
+    corrigida, erro = CorrecaoTestes.corrigir_resposta(db, request.question_id, request.alternative_id)
+    if erro:
+        raise HTTPException(status_code=404, detail=erro)
     
     # Verificar se acertou
-    acertou = alternativa.is_correct
+    acertou = corrigida.acertou
     
-    # Buscar resposta correta
-    resposta_correta = db.query(Alternative).filter(
-        Alternative.question_id == request.question_id,
-        Alternative.is_correct == True
-    ).first()
+    # Resposta correta
+    resposta_correta = corrigida.alternativa_correta
     
     # Registrar no histórico
     if not sessao.historico_respostas:
@@ -504,11 +486,11 @@ async def responder_questao(
     
     # Se não progrediu e não finalizou, buscar próxima questão do nível atual
     elif not teste_finalizado:
-        questoes_nivel = db.query(Question).filter(
-            Question.id.in_(sessao.questoes_usadas or [])
-        ).join(Test).filter(
-            Test.nivel == NIVEL_PARA_TEST_LEVEL.get(sessao.nivel_atual)
-        ).all()
+        nivel_enum = NIVEL_PARA_TEST_LEVEL.get(sessao.nivel_atual)
+        questoes_nivel = [
+            q for q in banco_questoes.questoes_por_ids(db, sessao.questoes_usadas or [])
+            if q.nivel == nivel_enum
+        ]
         
         # Filtrar questões já respondidas
         questoes_respondidas_ids = [r["question_id"] for r in sessao.historico_respostas]
@@ -594,6 +576,13 @@ async def responder_questao(
     
     db.commit()
     
+    # Nova certificação: matching reverso nas vagas que exigem esta competência
+    if teste_finalizado:
+        MatchingService.agendar_atualizacao_candidato(
+            current_candidate.id,
+            MatchingService.ids_competencias_por_nome(db, [sessao.competencia_nome])
+        )
+    
     return {
         "acertou": acertou,
         "resposta_correta_id": resposta_correta.id if resposta_correta else None,
@@ -639,13 +628,12 @@ async def obter_sessao(
     # Determinar próxima questão
     proxima_questao = None
     if not sessao.is_completed:
-        questoes_respondidas_ids = [r["question_id"] for r in (sessao.historico_respostas or [])]
-        questoes_disponiveis = db.query(Question).filter(
-            Question.id.in_(sessao.questoes_usadas or []),
-            ~Question.id.in_(questoes_respondidas_ids)
-        ).join(Test).filter(
-            Test.nivel == NIVEL_PARA_TEST_LEVEL.get(sessao.nivel_atual)
-        ).first()
+        questoes_respondidas_ids = {r["question_id"] for r in (sessao.historico_respostas or [])}
+        nivel_enum = NIVEL_PARA_TEST_LEVEL.get(sessao.nivel_atual)
+        questoes_disponiveis = next((
+            q for q in banco_questoes.questoes_por_ids(db, sessao.questoes_usadas or [])
+            if q.nivel == nivel_enum and q.id not in questoes_respondidas_ids
+        ), None)
         
         if questoes_disponiveis:
             proxima_questao = _questao_para_response(questoes_disponiveis)
@@ -5,10 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from io import BytesIO
+from io import BytesIO, StringIO
 from pathlib import Path
 import requests
-from app.core.database import get_db
+import csv
+import json
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user, get_current_company
 from app.core.config import settings
 from app.models.user import User, UserType
@@ -36,8 +38,14 @@ from app.schemas.candidato_anonimo import (
 )
 from app.services.company_service import CompanyService
 from app.services.file_service import FileService
+from app.services.matching_service import MatchingService
 from app.core.security import get_password_hash
-from app.utils.anonimizacao import anonimizar_candidato
+from app.utils.anonimizacao import (
+    anonimizar_candidato,
+    anonimizar_candidatos,
+    buscar_candidato_por_id_anonimo,
+    opcoes_carregamento_anonimizacao
+)
 
 router = APIRouter()
 
@@ -882,14 +890,16 @@ async def listar_candidatos_anonimos(
     # Contar total
     total = query.count()
     
-    # Aplicar paginação
-    candidates = query.order_by(Candidate.created_at.desc()).offset(skip).limit(limit).all()
+    # Aplicar paginação (relacionamentos da anonimização carregados em lote)
+    candidates = query.options(
+        *opcoes_carregamento_anonimizacao()
+    ).order_by(Candidate.created_at.desc()).offset(skip).limit(limit).all()
     
     # Converter para resposta anônima
-    candidatos_anonimos = []
-    for candidate in candidates:
-        dados_anonimos = anonimizar_candidato(candidate)
-        candidatos_anonimos.append(CandidatoAnonimoResponse(**dados_anonimos))
+    candidatos_anonimos = [
+        CandidatoAnonimoResponse(**dados_anonimos)
+        for dados_anonimos in anonimizar_candidatos(db, candidates)
+    ]
     
     return CandidatoAnonimoListResponse(
         total=total,
@@ -899,6 +909,99 @@ async def listar_candidatos_anonimos(
     )
 
 
+# Candidatos lidos do cursor do servidor e anonimizados por vez na exportação
+LOTE_EXPORTACAO = 500
+
+# Campos de lista viram JSON dentro da célula no CSV
+CAMPOS_LISTA_EXPORTACAO = {"formacoes_academicas", "notas_testes", "autoavaliacao_habilidades"}
+
+
+def _exportar_candidatos_anonimos(
+    formato: str,
+    estado: Optional[str],
+    cidade: Optional[str],
+    is_pcd: Optional[bool]
+):
+    """
+    Gera a exportação em blocos: cursor no servidor (yield_per), anonimização em lote
+    e serialização por lote. A memória fica limitada a um lote, qualquer que seja o total.
+    
+    Usa sessão própria porque o corpo é consumido depois que o endpoint retorna.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Candidate).options(*opcoes_carregamento_anonimizacao())
+        
+        if estado:
+            query = query.filter(Candidate.estado.ilike(f"%{estado}%"))
+        if cidade:
+            query = query.filter(Candidate.cidade.ilike(f"%{cidade}%"))
+        if is_pcd is not None:
+            query = query.filter(Candidate.is_pcd == is_pcd)
+        
+        campos = list(CandidatoAnonimoResponse.model_fields.keys())
+        
+        if formato == "csv":
+            buffer = StringIO()
+            csv.writer(buffer).writerow(campos)
+            yield buffer.getvalue()
+        
+        def _serializar(lote: List[Candidate]) -> str:
+            anonimos = [
+                CandidatoAnonimoResponse(**dados) for dados in anonimizar_candidatos(db, lote)
+            ]
+            if formato == "ndjson":
+                return "".join(candidato.model_dump_json() + "\n" for candidato in anonimos)
+            
+            buffer = StringIO()
+            writer = csv.writer(buffer)
+            for candidato in anonimos:
+                dados = candidato.model_dump(mode="json")
+                writer.writerow([
+                    json.dumps(dados[campo], ensure_ascii=False) if campo in CAMPOS_LISTA_EXPORTACAO else dados[campo]
+                    for campo in campos
+                ])
+            return buffer.getvalue()
+        
+        lote = []
+        for candidate in query.order_by(Candidate.id).yield_per(LOTE_EXPORTACAO):
+            lote.append(candidate)
+            if len(lote) >= LOTE_EXPORTACAO:
+                yield _serializar(lote)
+                lote = []
+        
+        if lote:
+            yield _serializar(lote)
+    finally:
+        db.close()
+
+
+@router.get("/candidatos-anonimos/exportar")
+async def exportar_candidatos_anonimos(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato: ndjson ou csv"),
+    estado: Optional[str] = Query(None, description="Filtrar por estado"),
+    cidade: Optional[str] = Query(None, description="Filtrar por cidade"),
+    is_pcd: Optional[bool] = Query(None, description="Filtrar por PCD"),
+    current_company: Company = Depends(get_current_company)
+):
+    """
+    Exporta o pool completo de candidatos anônimos em streaming (NDJSON ou CSV)
+    
+    Substitui a paginação de /candidatos-anonimos com limit=500 para extrações
+    completas: sem count() nem OFFSET, os dados começam a chegar imediatamente e
+    o consumo de memória não depende do tamanho do pool.
+    
+    Mesmos filtros e mesmos campos (sem dados sensíveis) da listagem.
+    """
+    media_type = "application/x-ndjson" if formato == "ndjson" else "text/csv; charset=utf-8"
+    
+    return StreamingResponse(
+        _exportar_candidatos_anonimos(formato, estado, cidade, is_pcd),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=candidatos_anonimos.{formato}"}
+    )
+
+
 @router.get("/candidatos-anonimos/detalhes/{id_anonimo}", response_model=CandidatoAnonimoDetalhesResponse)
 async def obter_detalhes_candidato_anonimo(
     id_anonimo: str,
@@ -911,15 +1014,8 @@ async def obter_detalhes_candidato_anonimo(
     O id_anonimo é um hash que identifica o candidato sem expor dados sensíveis
     """
     
-    # Buscar todos os candidatos e encontrar o que corresponde ao ID anônimo
-    candidates = db.query(Candidate).all()
-    
-    candidate_encontrado = None
-    for c in candidates:
-        id_anonimo_gerado = anonimizar_candidato(c).get("id_anonimo")
-        if id_anonimo_gerado == id_anonimo:
-            candidate_encontrado = c
-            break
+    # Busca indexada pelo ID anônimo
+    candidate_encontrado = buscar_candidato_por_id_anonimo(db, id_anonimo)
     
     if not candidate_encontrado:
         raise HTTPException(
@@ -937,6 +1033,8 @@ async def get_ideal_candidates_for_job(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
     min_compatibility: float = Query(0.5, ge=0, le=1, description="Score mínimo de compatibilidade (0-1)"),
+    cursor_certificados: Optional[str] = Query(None, description="Cursor da próxima página do grupo certificados"),
+    cursor_autoavaliacao: Optional[str] = Query(None, description="Cursor da próxima página do grupo autoavaliação"),
     current_company: Company = Depends(get_current_company),
     db: Session = Depends(get_db)
 ):
@@ -954,12 +1052,11 @@ async def get_ideal_candidates_for_job(
     - min_compatibility: Score mínimo (0-1) para incluir o candidato
     - skip: Para paginação
     - limit: Máx 50 candidatos por página
+    - cursor_certificados / cursor_autoavaliacao: Paginação por cursor (usar o
+      "proximo_cursor" de cada grupo); quando informado, skip é ignorado no grupo
     """
-    from sqlalchemy import and_
     from app.models.job import Job
     from app.models.vaga_requisito import VagaRequisito
-    from app.models.competencia import AutoavaliacaoCompetencia
-    from app.models.candidato_teste import CandidatoTeste, StatusTesteCandidato
     
     # Verificar se a vaga pertence à empresa
     job = db.query(Job).filter(
@@ -977,98 +1074,73 @@ async def get_ideal_candidates_for_job(
     requisitos = db.query(VagaRequisito).filter(
         VagaRequisito.vaga_id == job_id
     ).all()
+    requisitos_totais = len(requisitos)
     
-    # Buscar IDs de candidatos com testes concluídos
-    candidatos_com_testes = set()
-    testes_concluidos = db.query(CandidatoTeste.candidate_id).filter(
-        CandidatoTeste.status == StatusTesteCandidato.CONCLUIDO
-    ).distinct().all()
-    
-    for teste in testes_concluidos:
-        candidatos_com_testes.add(teste[0])
+    # Requisitos, compatibilidade mínima, ordenação e paginação são resolvidos no banco
+    # (sem requisitos, todos os candidatos têm compatibilidade 1.0)
+    consulta = MatchingService.consulta_compatibilidade(db, job_id, requisitos, min_compatibility)
+    totais = MatchingService.contar_compatibilidade_por_grupo(db, consulta)
+    try:
+        pagina_certificados = MatchingService.paginar_compatibilidade(
+            db, consulta, True, skip, limit, cursor_certificados
+        )
+        pagina_autoavaliacao = MatchingService.paginar_compatibilidade(
+            db, consulta, False, skip, limit, cursor_autoavaliacao
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    if not requisitos:
-        # Se vaga não tem requisitos definidos, retornar todos os candidatos
-        candidates = db.query(Candidate).all()
-        candidatos_certificados = []
-        candidatos_autoavaliacao = []
-        
-        for c in candidates:
-            dado = {**anonimizar_candidato(c), "compatibilidade": 1.0}
-            if c.id in candidatos_com_testes:
-                candidatos_certificados.append(dado)
-            else:
-                candidatos_autoavaliacao.append(dado)
-    else:
-        # Carregar TODAS as competências de TODOS os candidatos em uma única query
-        todas_competencias = db.query(AutoavaliacaoCompetencia).all()
-        
-        # Organizar competências por candidate_id para acesso rápido
-        competencias_por_candidato = {}
-        for comp in todas_competencias:
-            if comp.candidate_id not in competencias_por_candidato:
-                competencias_por_candidato[comp.candidate_id] = {}
-            competencias_por_candidato[comp.candidate_id][comp.competencia_id] = int(comp.nivel_declarado)
-        
-        # Buscar todos os candidatos
-        all_candidates = db.query(Candidate).all()
-        candidatos_certificados = []
-        candidatos_autoavaliacao = []
-        
-        requisitos_totais = len(requisitos)
-        
-        for candidate in all_candidates:
-            # Pegar competências do candidato do mapa (sem fazer query)
-            competencias_map = competencias_por_candidato.get(candidate.id, {})
-            
-            # Contar quantos requisitos o candidato atende
-            requisitos_atendidos = 0
-            
-            for requisito in requisitos:
-                nivel_candidato = competencias_map.get(requisito.competencia_id, 0)
-                nivel_minimo = int(requisito.nivel_minimo)
-                
-                if nivel_candidato >= nivel_minimo:
-                    requisitos_atendidos += 1
-            
-            # Calcular score (0-1)
-            score_compatibilidade = requisitos_atendidos / requisitos_totais if requisitos_totais > 0 else 0
-            
-            # Incluir candidato se passou no threshold
-            if score_compatibilidade >= min_compatibility:
-                dados = anonimizar_candidato(candidate)
-                dados["compatibilidade"] = round(score_compatibilidade, 2)
-                
-                # Separar por tipo
-                if candidate.id in candidatos_com_testes:
-                    candidatos_certificados.append(dados)
-                else:
-                    candidatos_autoavaliacao.append(dados)
-        
-        # Ordenar ambos os grupos por score (maior compatibilidade primeiro)
-        candidatos_certificados.sort(key=lambda x: x["compatibilidade"], reverse=True)
-        candidatos_autoavaliacao.sort(key=lambda x: x["compatibilidade"], reverse=True)
+    # Carregar apenas os candidatos da página
+    ids_pagina = [linha[0] for linha in pagina_certificados + pagina_autoavaliacao]
+    candidatos_por_id = {
+        c.id: c for c in db.query(Candidate).options(
+            *opcoes_carregamento_anonimizacao()
+        ).filter(Candidate.id.in_(ids_pagina)).all()
+    } if ids_pagina else {}
+    
+    def _anonimizar_pagina(pagina):
+        candidatos = []
+        anonimos = anonimizar_candidatos(db, [candidatos_por_id[candidate_id] for candidate_id, _ in pagina])
+        for dados, (candidate_id, requisitos_atendidos) in zip(anonimos, pagina):
+            dados["compatibilidade"] = round(requisitos_atendidos / requisitos_totais, 2) if requisitos_totais > 0 else 1.0
+            candidatos.append(dados)
+        return candidatos
+    
+    def _proximo_cursor(pagina):
+        # Página incompleta: não há mais candidatos no grupo
+        if len(pagina) < limit:
+            return None
+        candidate_id, requisitos_atendidos = pagina[-1]
+        return MatchingService.codificar_cursor(requisitos_atendidos, candidate_id)
+    
+    total_certificados = totais.get(True, 0)
+    total_autoavaliacao = totais.get(False, 0)
     
     # Preparar resposta com dois grupos
     return {
-        "total_certificados": len(candidatos_certificados),
-        "total_autoavaliacao": len(candidatos_autoavaliacao),
-        "total_geral": len(candidatos_certificados) + len(candidatos_autoavaliacao),
+        "total_certificados": total_certificados,
+        "total_autoavaliacao": total_autoavaliacao,
+        "total_geral": total_certificados + total_autoavaliacao,
         "compatibilidade_minima": min_compatibility,
         "grupos": {
             "certificados": {
                 "titulo": "Candidatos Certificados (RECOMENDADOS)",
                 "descricao": "Candidatos que realizaram e completaram os testes de certificação",
                 "recomendado": True,
-                "total": len(candidatos_certificados),
-                "candidatos": candidatos_certificados[skip : skip + limit]
+                "total": total_certificados,
+                "candidatos": _anonimizar_pagina(pagina_certificados),
+                "proximo_cursor": _proximo_cursor(pagina_certificados)
             },
             "autoavaliacao": {
                 "titulo": "Candidatos com Autoavaliação",
                 "descricao": "Candidatos que completaram apenas a autoavaliação de competências",
                 "recomendado": False,
-                "total": len(candidatos_autoavaliacao),
-                "candidatos": candidatos_autoavaliacao[skip : skip + limit]
+                "total": total_autoavaliacao,
+                "candidatos": _anonimizar_pagina(pagina_autoavaliacao),
+                "proximo_cursor": _proximo_cursor(pagina_autoavaliacao)
             }
         }
     }
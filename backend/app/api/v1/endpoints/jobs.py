@@ -1,7 +1,7 @@
 """
 Endpoints de Vagas
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
@@ -22,7 +22,9 @@ from app.schemas.job import (
     RecomendacaoVaga
 )
 from app.services.job_service import JobService
+from app.services.matching_service import MatchingService
 from app.services.recommendation_service import RecommendationService
+from app.services.vagas_similares import obter_indice_vagas_similares
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -75,6 +77,32 @@ async def get_available_job(
     return job
 
 
+@router.get("/publico/{job_id}/similares", response_model=List[JobPublic])
+async def get_similar_jobs(
+    job_id: int,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Vagas abertas semelhantes a uma vaga (texto de descrição e requisitos)
+    
+    Não requer autenticação. Consulta o índice MinHash/LSH em memória,
+    sem comparar com todas as vagas abertas
+    """
+    similares = obter_indice_vagas_similares(db).similares(job_id, limit)
+    if not similares:
+        return []
+    
+    vagas = {
+        vaga.id: vaga
+        for vaga in db.query(Job).filter(
+            Job.id.in_([similar_id for similar_id, _ in similares]),
+            Job.status == JobStatus.ABERTA
+        )
+    }
+    return [vagas[similar_id] for similar_id, _ in similares if similar_id in vagas]
+
+
 # ============================================================================
 # ROTAS ESPECÍFICAS DE CANDIDATOS (COM AUTENTICAÇÃO)
 # Devem vir ANTES de rotas parameterizadas como /{job_id}
@@ -376,12 +404,17 @@ async def update_job(
 @router.post("/{job_id}/publish", response_model=JobResponse)
 async def publish_job(
     job_id: int,
+    background_tasks: BackgroundTasks,
     current_company: Company = Depends(get_current_company),
     db: Session = Depends(get_db)
 ):
     """Publica uma vaga"""
     service = JobService(db)
     job = await service.publish_job(job_id, current_company.id)
+    
+    # Matching da vaga publicada calculado em segundo plano
+    execucao = MatchingService.agendar_recalculo(db, job.id, "publicacao")
+    background_tasks.add_task(MatchingService.executar_recalculo, execucao.id, job.id)
     return job
 
 
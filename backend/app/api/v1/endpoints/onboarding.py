@@ -16,6 +16,7 @@ from app.models.test import Test, Alternative, CandidateTestResult
 from app.models.formacao_academica import FormacaoAcademica as FormacaoAcademicaModel
 from app.models.experiencia_profissional import ExperienciaProfissional as ExperienciaProfissionalModel
 from app.models.trabalho_temporario import TrabalhoTemporario as TrabalhoTemporarioModel
+from app.models.candidato_habilidade import CandidatoHabilidade as CandidatoHabilidadeModel, normalizar_habilidade
 from app.services.file_service import FileService
 from app.schemas.onboarding import (
     DadosPessoaisUpdate,
@@ -154,6 +155,91 @@ async def create_candidate_profile(
     )
 
 
+def _habilidades_response(candidate: Candidate) -> Optional[List[HabilidadeAutoAvaliacao]]:
+    """Habilidades do candidato lidas de candidato_habilidades (sem reparsear o JSON)"""
+    if not candidate.habilidades_rel:
+        return None
+    return [
+        HabilidadeAutoAvaliacao(
+            habilidade=h.habilidade,
+            nivel=h.nivel,
+            anos_experiencia=h.anos_experiencia
+        )
+        for h in candidate.habilidades_rel
+    ]
+
+
+def _sincronizar_habilidades(candidate: Candidate, habilidades: List[HabilidadeAutoAvaliacao]) -> None:
+    """Substitui as linhas de candidato_habilidades pelas habilidades informadas"""
+    candidate.habilidades_rel = [
+        CandidatoHabilidadeModel(
+            habilidade=h.habilidade.strip(),
+            habilidade_normalizada=normalizar_habilidade(h.habilidade),
+            nivel=h.nivel,
+            anos_experiencia=h.anos_experiencia
+        )
+        for h in habilidades
+    ]
+
+
+def _formacoes_response(candidate: Candidate) -> Optional[List[FormacaoAcademica]]:
+    """Formações do candidato lidas de formacoes_academicas (sem reparsear o JSON)"""
+    if not candidate.formacoes_academicas_rel:
+        return None
+    return [
+        FormacaoAcademica(
+            instituicao=f.instituicao,
+            curso=f.curso,
+            nivel=f.nivel,
+            status=f.status,
+            ano_conclusao=f.ano_conclusao
+        )
+        for f in candidate.formacoes_academicas_rel
+    ]
+
+
+def _sincronizar_formacoes(candidate: Candidate, formacoes: List[FormacaoAcademica]) -> None:
+    """Substitui as linhas de formacoes_academicas pelas formações informadas"""
+    candidate.formacoes_academicas_rel = [
+        FormacaoAcademicaModel(
+            instituicao=f.instituicao,
+            curso=f.curso,
+            nivel=f.nivel,
+            status=f.status,
+            ano_conclusao=f.ano_conclusao
+        )
+        for f in formacoes
+    ]
+
+
+def _experiencias_response(candidate: Candidate) -> Optional[List[ExperienciaProfissional]]:
+    """Experiências do candidato lidas de experiencias_profissionais (sem reparsear o JSON)"""
+    if not candidate.experiencias_profissionais_rel:
+        return None
+    return [
+        ExperienciaProfissional(
+            cargo=e.cargo,
+            empresa=e.empresa,
+            periodo=e.periodo,
+            descricao=e.descricao
+        )
+        for e in candidate.experiencias_profissionais_rel
+    ]
+
+
+def _sincronizar_experiencias(candidate: Candidate, experiencias: List[ExperienciaProfissional]) -> None:
+    """Substitui as linhas de experiencias_profissionais pelas experiências informadas"""
+    candidate.experiencias_profissionais_rel = [
+        ExperienciaProfissionalModel(
+            cargo=e.cargo,
+            empresa=e.empresa,
+            periodo=e.periodo,
+            descricao=e.descricao
+        )
+        for e in experiencias
+    ]
+
+
 def calculate_progress(candidate: Candidate, db: Session = None) -> int:
     """
     Calcula percentual de completude do onboarding baseado apenas em 2 categorias.
@@ -269,13 +355,7 @@ async def get_onboarding_status(
         )
 
     # Parse JSON fields if they exist
-    habilidades = None
-    if candidate.habilidades:
-        try:
-            habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-            habilidades = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-        except:
-            habilidades = None
+    habilidades = _habilidades_response(candidate)
     
     # Buscar formações acadêmicas do banco de dados (JOIN)
     formacoes_db = db.query(FormacaoAcademicaModel).filter(
@@ -592,13 +672,7 @@ async def update_dados_pessoais(
 
     
     # Parse JSON fields
-    habilidades = None
-    if candidate.habilidades:
-        try:
-            habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-            habilidades = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-        except:
-            habilidades = None
+    habilidades = _habilidades_response(candidate)
     
     return CandidatoOnboardingResponse(
         id=candidate.id,
@@ -883,12 +957,12 @@ async def update_dados_profissionais(
                     experiencia_list = experiencia_profissional if isinstance(experiencia_profissional, list) else json.loads(json.dumps(experiencia_profissional))
                 
                 # Validar cada experiência
-                for exp in experiencia_list:
-                    ExperienciaProfissional(**exp)
+                experiencias_validadas = [ExperienciaProfissional(**exp) for exp in experiencia_list]
 
                 experiencia_json = json.dumps(experiencia_list, ensure_ascii=False)
                 candidate.experiencia_profissional = experiencia_json
                 attributes.flag_modified(candidate, "experiencia_profissional")
+                _sincronizar_experiencias(candidate, experiencias_validadas)
                 print(f"[DEBUG] Experiência salva com sucesso")
             except json.JSONDecodeError as e:
                 print(f"[DEBUG] ERRO JSON na experiência: {str(e)}")
@@ -920,12 +994,12 @@ async def update_dados_profissionais(
                     formacoes_list = formacoes_academicas if isinstance(formacoes_academicas, list) else json.loads(json.dumps(formacoes_academicas))
                 
                 # Validar cada formação
-                for f in formacoes_list:
-                    FormacaoAcademica(**f)
+                formacoes_validadas = [FormacaoAcademica(**f) for f in formacoes_list]
 
                 formacoes_json = json.dumps(formacoes_list, ensure_ascii=False)
                 candidate.formacoes_academicas = formacoes_json
                 attributes.flag_modified(candidate, "formacoes_academicas")
+                _sincronizar_formacoes(candidate, formacoes_validadas)
                 print(f"[DEBUG] Formações acadêmicas salvas com sucesso")
             except json.JSONDecodeError as e:
                 raise HTTPException(
@@ -951,12 +1025,12 @@ async def update_dados_profissionais(
                     habilidades_list = habilidades if isinstance(habilidades, list) else json.loads(json.dumps(habilidades))
                 
                 # Validar cada habilidade
-                for h in habilidades_list:
-                    HabilidadeAutoAvaliacao(**h)
+                habilidades_validadas = [HabilidadeAutoAvaliacao(**h) for h in habilidades_list]
 
                 habilidades_json = json.dumps(habilidades_list, ensure_ascii=False)
                 candidate.habilidades = habilidades_json
                 attributes.flag_modified(candidate, "habilidades")
+                _sincronizar_habilidades(candidate, habilidades_validadas)
                 print(f"[DEBUG] Habilidades salvas com sucesso")
             except json.JSONDecodeError as e:
                 print(f"[DEBUG] ERRO JSON em habilidades: {str(e)}")
@@ -1039,36 +1113,10 @@ async def update_dados_profissionais(
     print(f"  - candidate.habilidades: {repr(candidate.habilidades)}")
     print(f"{'='*60}\n")
     
-    # Parse JSON fields para response
-    habilidades_parsed = None
-    if candidate.habilidades:
-        try:
-            habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-            habilidades_parsed = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-            print(f"[DEBUG] Habilidades parseadas com sucesso: {len(habilidades_parsed)} items")
-        except Exception as e:
-            print(f"[DEBUG] ERRO ao parsear habilidades para response: {str(e)}")
-            habilidades_parsed = None
-    
-    # Parse formações acadêmicas
-    formacoes_academicas_parsed = None
-    if candidate.formacoes_academicas:
-        try:
-            formacoes_data = json.loads(candidate.formacoes_academicas) if isinstance(candidate.formacoes_academicas, str) else candidate.formacoes_academicas
-            formacoes_academicas_parsed = [FormacaoAcademica(**f) for f in formacoes_data]
-        except Exception as e:
-            print(f"[DEBUG] ERRO ao parsear formações acadêmicas para response: {str(e)}")
-            formacoes_academicas_parsed = None
-    
-    # Parse experiências profissionais
-    experiencias_profissionais_parsed = None
-    if candidate.experiencia_profissional:
-        try:
-            experiencias_data = json.loads(candidate.experiencia_profissional) if isinstance(candidate.experiencia_profissional, str) else candidate.experiencia_profissional
-            experiencias_profissionais_parsed = [ExperienciaProfissional(**e) for e in experiencias_data]
-        except Exception as e:
-            print(f"[DEBUG] ERRO ao parsear experiências profissionais para response: {str(e)}")
-            experiencias_profissionais_parsed = None
+    # Habilidades, formações e experiências lidas das tabelas normalizadas
+    habilidades_parsed = _habilidades_response(candidate)
+    formacoes_academicas_parsed = _formacoes_response(candidate)
+    experiencias_profissionais_parsed = _experiencias_response(candidate)
     
     return CandidatoOnboardingResponse(
         id=candidate.id,
@@ -1257,13 +1305,7 @@ async def submit_teste_habilidades(
         db.refresh(candidate)
         
         # Parse JSON fields
-        habilidades = None
-        if candidate.habilidades:
-            try:
-                habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-                habilidades = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-            except:
-                habilidades = None
+        habilidades = _habilidades_response(candidate)
         
         return CandidatoOnboardingResponse(
             id=candidate.id,
@@ -1371,13 +1413,7 @@ async def salvar_formacoes_academicas(
         logger.info(f"[FORMACOES] Candidato atualizado com sucesso")
         
         # Parse JSON fields
-        habilidades = None
-        if candidate.habilidades:
-            try:
-                habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-                habilidades = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-            except:
-                habilidades = None
+        habilidades = _habilidades_response(candidate)
         
         # Buscar formações acadêmicas do banco de dados
         logger.info(f"[FORMACOES] Buscando formações para candidate_id={candidate.id}")
@@ -1525,13 +1561,7 @@ async def salvar_experiencias_profissionais(
         logger.info(f"[EXPERIENCIAS] Candidato atualizado com sucesso")
         
         # Parse JSON fields
-        habilidades = None
-        if candidate.habilidades:
-            try:
-                habilidades_data = json.loads(candidate.habilidades) if isinstance(candidate.habilidades, str) else candidate.habilidades
-                habilidades = [HabilidadeAutoAvaliacao(**h) for h in habilidades_data]
-            except:
-                habilidades = None
+        habilidades = _habilidades_response(candidate)
         
         # Buscar formações acadêmicas do banco de dados
         formacoes_db = db.query(FormacaoAcademicaModel).filter(
@@ -341,7 +341,7 @@ async def empresa_indicar_interesse_anonimo(
     Exemplo:
     POST /api/v1/pipeline/candidato-anonimo/CAND-1DDE1C25/indicar-interesse?job_id=10
     """
-    from app.utils.anonimizacao import anonimizar_candidato
+    from app.utils.anonimizacao import buscar_candidato_por_id_anonimo
     from datetime import datetime
     
     try:
@@ -357,14 +357,8 @@ async def empresa_indicar_interesse_anonimo(
                 detail="Vaga não encontrada ou não pertence a sua empresa"
             )
         
-        # Buscar candidato pelo ID anônimo (comparando hashes)
-        all_candidates = db.query(Candidate).all()
-        candidate = None
-        
-        for c in all_candidates:
-            if anonimizar_candidato(c).get("id_anonimo") == id_anonimo:
-                candidate = c
-                break
+        # Buscar candidato pelo ID anônimo (coluna indexada)
+        candidate = buscar_candidato_por_id_anonimo(db, id_anonimo)
         
         if not candidate:
             raise HTTPException(
@@ -45,6 +45,8 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Folha de respostas assinada (entrega do nível inteiro do teste adaptativo)
+    FOLHA_RESPOSTAS_EXPIRE_MINUTES: int = 120
     
     # Upload de arquivos
     UPLOAD_DIR: str = "uploads"
@@ -73,6 +75,23 @@ class Settings(BaseSettings):
     R2_URL_EXPIRATION: int = 3600  # 1 hora em segundos
     USE_R2: bool = True  # Ativa/desativa uso do R2
     R2_UPLOAD_DIR: str = "uploads"  # Diretório dentro do bucket
+    
+    # Cache de recomendações de vagas (por processo, LRU): expiração para refletir alterações feitas em outros workers
+    RECOMENDACOES_CACHE_MAX_CANDIDATOS: int = 5000
+    RECOMENDACOES_CACHE_TTL_SEGUNDOS: int = 300
+    
+    # Índice TF-IDF de similaridade textual (python -m app.services.similaridade_textual)
+    INDICE_TFIDF_ARQUIVO: str = "data/indice_tfidf.npz"
+    
+    # Tarefas em segundo plano (matching e reindexação dos índices em memória): threads por processo
+    MATCHING_MAX_WORKERS: int = 2
+    
+    # Índices em memória de vagas e candidatos semelhantes: recarga periódica para refletir outros workers
+    VAGAS_SIMILARES_TTL_SEGUNDOS: int = 300
+    CANDIDATOS_SIMILARES_TTL_SEGUNDOS: int = 300
+    
+    # Banco de questões em memória: recarga periódica para refletir alterações feitas em outros workers
+    BANCO_QUESTOES_TTL_SEGUNDOS: int = 300
 
 
 # Criar settings AQUI (após load_dotenv ter sido chamado em app/__init__.py)
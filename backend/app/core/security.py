@@ -78,6 +78,14 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def create_answer_sheet_token(data: dict) -> str:
+    """Cria token JWT (HMAC) da folha de respostas de um nível do teste adaptativo"""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(minutes=settings.FOLHA_RESPOSTAS_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "type": "folha_respostas"})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Decodifica token JWT"""
     try:
@@ -0,0 +1,48 @@
+"""
+Execução em segundo plano compartilhada pelo processo
+
+Um único executor com MATCHING_MAX_WORKERS threads atende o matching e a
+reindexação dos índices em memória (vagas e candidatos semelhantes), de modo que
+commits frequentes não criam threads sem limite. As threads não são daemon: no
+encerramento do processo, o que já está na fila termina de executar.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Set
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=settings.MATCHING_MAX_WORKERS, thread_name_prefix="segundo_plano")
+
+
+class FilaIds:
+    """
+    Ids pendentes de uma tarefa em lote: ids agendados enquanto uma execução ainda
+    está na fila (commits seguidos) são unidos e processados em uma única chamada.
+    """
+
+    def __init__(self, nome: str, tarefa: Callable[[List[int]], None]):
+        self.nome = nome
+        self.tarefa = tarefa
+        self._lock = threading.Lock()
+        self._pendentes: Set[int] = set()
+
+    def agendar(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            agendada = bool(self._pendentes)
+            self._pendentes.update(ids)
+            if agendada or not self._pendentes:
+                return
+        executor.submit(self._executar)
+
+    def _executar(self) -> None:
+        with self._lock:
+            ids = sorted(self._pendentes)
+            self._pendentes.clear()
+        try:
+            self.tarefa(ids)
+        except Exception as e:
+            logger.error(f"Erro na tarefa em segundo plano {self.nome}: {str(e)}", exc_info=True)
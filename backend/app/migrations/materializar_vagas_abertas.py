@@ -0,0 +1,37 @@
+"""
+Materializa o matching das vagas abertas publicadas antes de vaga_match_scores
+Run this once after the 036-038 migrations: grava os scores e cria os VagaCandidato
+(kanban) das vagas ABERTA que ainda não têm scores materializados
+"""
+import logging
+
+from app.core.database import SessionLocal
+from app.models import Job
+from app.models.job import JobStatus
+from app.services.matching_service import MatchingService
+
+logger = logging.getLogger(__name__)
+
+
+def materializar_vagas_abertas() -> None:
+    """Executa recalcular_vaga em cada vaga aberta ainda não materializada"""
+    db = SessionLocal()
+    try:
+        vaga_ids = [vaga_id for vaga_id, in db.query(Job.id).filter(Job.status == JobStatus.ABERTA).order_by(Job.id)]
+        pendentes = [vaga_id for vaga_id in vaga_ids if not MatchingService.vaga_materializada(db, vaga_id)]
+        logger.info(f"{len(pendentes)} de {len(vaga_ids)} vagas abertas sem matching materializado")
+
+        for vaga_id in pendentes:
+            try:
+                compativeis = MatchingService.recalcular_vaga(db, vaga_id)
+                logger.info(f"Vaga {vaga_id}: {compativeis} candidatos vinculados")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Erro ao materializar a vaga {vaga_id}: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    materializar_vagas_abertas()
@@ -8,10 +8,16 @@ from app.models.password_reset import PasswordResetToken
 from app.models.test import Test, Question, Alternative, AdaptiveTestSession, Autoavaliacao
 from app.models.formacao_academica import FormacaoAcademica
 from app.models.experiencia_profissional import ExperienciaProfissional
+from app.models.candidato_habilidade import CandidatoHabilidade
 from app.models.trabalho_temporario import TrabalhoTemporario
 from app.models.competencia import Competencia, AutoavaliacaoCompetencia, AreaAtuacao, NivelProficiencia
 from app.models.candidato_teste import CandidatoTeste, VagaCandidato, StatusOnboarding, StatusKanbanCandidato
 from app.models.vaga_requisito import VagaRequisito
+from app.models.vaga_match_score import VagaMatchScore
+from app.models.matching_execucao import MatchingExecucao, StatusMatchingExecucao
+from app.models.recomendacao_vaga import RecomendacaoVaga
+from app.models.assinatura_vaga import AssinaturaVaga
+from app.models.versao_cache import VersaoCache
 from app.models.notificacao import NotificacaoEnviada, ConfigPreco
 from app.models.historico_estado import HistoricoEstadoPipeline, VISIBILIDADE_POR_ESTADO, get_visibilidade_estado
 from app.models.cobranca import (
@@ -26,10 +32,11 @@ from app.models.contrato_plataforma import (
 __all__ = [
     "User", "Company", "Job", "JobApplication", "Candidate", "PasswordResetToken", 
     "Test", "Question", "Alternative", "AdaptiveTestSession", "Autoavaliacao", 
-    "FormacaoAcademica", "ExperienciaProfissional", "TrabalhoTemporario",
+    "FormacaoAcademica", "ExperienciaProfissional", "CandidatoHabilidade", "TrabalhoTemporario",
     "Competencia", "AutoavaliacaoCompetencia", "AreaAtuacao", "NivelProficiencia",
     "CandidatoTeste", "VagaCandidato", "StatusOnboarding", "StatusKanbanCandidato",
-    "VagaRequisito", "NotificacaoEnviada", "ConfigPreco",
+    "VagaRequisito", "VagaMatchScore", "MatchingExecucao", "StatusMatchingExecucao", "RecomendacaoVaga", "AssinaturaVaga", "VersaoCache",
+    "NotificacaoEnviada", "ConfigPreco",
     "HistoricoEstadoPipeline", "VISIBILIDADE_POR_ESTADO", "get_visibilidade_estado",
     "Cobranca", "StatusCobranca", "TipoCobranca", "MetodoPagamento",
     "calcular_taxa_sucesso", "FAIXAS_TAXA_SUCESSO", "PRAZO_PAGAMENTO_DIAS",
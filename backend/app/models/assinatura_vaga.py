@@ -0,0 +1,22 @@
+"""
+Modelo de Assinatura MinHash de vaga (índice de vagas semelhantes)
+"""
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class AssinaturaVaga(Base):
+    """
+    Assinatura MinHash dos shingles de description + requirements de uma vaga,
+    calculada na publicação (app.services.vagas_similares) e usada para
+    reconstruir o índice LSH em memória sem recalcular as assinaturas.
+    """
+    __tablename__ = "assinaturas_vagas"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    assinatura = Column(LargeBinary, nullable=False)  # NUM_PERMUTACOES x uint32
+    calculado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<AssinaturaVaga(job_id={self.job_id})>"
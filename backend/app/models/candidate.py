@@ -1,8 +1,9 @@
 """
 Modelo de candidato
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Enum, Boolean, Computed, event, inspect
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, attributes
 from sqlalchemy.sql import func
 import enum
 from app.core.database import Base
@@ -41,6 +42,9 @@ class Candidate(Base):
     id = Column(Integer, primary_key=True, index=True)
     cpf = Column(String(11), unique=True, index=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    
+    # ID anônimo (CAND-XXXXXXXX) persistido para busca indexada; mantido pelos eventos abaixo
+    id_anonimo = Column(String(20), index=True, nullable=True)
 
     # Dados pessoais
     full_name = Column(String(255), nullable=False)
@@ -70,7 +74,7 @@ class Candidate(Base):
     anos_experiencia = Column(Integer, nullable=True)  # Total de anos de experiência
     formacao_escolaridade = Column(Text, nullable=True)  # Formação acadêmica
     formacoes_academicas = Column(Text, nullable=True)  # Formações detalhadas (JSON array)
-    habilidades = Column(Text, nullable=True)  # Habilidades (JSON string)
+    habilidades = Column(Text, nullable=True)  # Habilidades (JSON string, compatibilidade; ver habilidades_rel)
     autoavaliacao_habilidades = Column(Text, nullable=True)  # Auto-avaliação das habilidades (JSON)
     
     # Teste de Habilidades
@@ -97,6 +101,18 @@ class Candidate(Base):
     garantia_finalizada = Column(Boolean, default=False)  # Garantia terminou, pode decidir voltar
     data_fim_garantia = Column(DateTime(timezone=True), nullable=True)  # Data que a garantia terminou
     
+    # Busca textual (coluna gerada pelo banco, migrations 040/047): nome > habilidades > área
+    # (das habilidades, só os valores do JSON: f_habilidades_tsvector ignora as chaves)
+    busca_vetor = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('portuguese', f_unaccent(coalesce(full_name, ''))), 'A') || "
+            "setweight(f_habilidades_tsvector(habilidades), 'B') || "
+            "setweight(to_tsvector('portuguese', f_unaccent(coalesce(area_atuacao, ''))), 'C')",
+            persisted=True
+        )
+    )
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -110,8 +126,35 @@ class Candidate(Base):
     vaga_candidatos = relationship("VagaCandidato", back_populates="candidate", cascade="all, delete-orphan")  # NOVO
     formacoes_academicas_rel = relationship("FormacaoAcademica", back_populates="candidate", cascade="all, delete-orphan")
     experiencias_profissionais_rel = relationship("ExperienciaProfissional", back_populates="candidate", cascade="all, delete-orphan")
+    habilidades_rel = relationship(
+        "CandidatoHabilidade", back_populates="candidate",
+        cascade="all, delete-orphan", order_by="CandidatoHabilidade.id"
+    )
     cobrancas = relationship("Cobranca", back_populates="candidato")  # PAGAMENTOS
     
     def __repr__(self):
         return f"<Candidate(cpf={self.cpf}, full_name={self.full_name})>"
 
+
+@event.listens_for(Candidate, "after_insert")
+def _definir_id_anonimo_apos_insert(mapper, connection, target):
+    """O ID anônimo depende do id gerado pelo banco: gravado logo após o INSERT"""
+    from app.utils.anonimizacao import gerar_id_anonimo
+    
+    id_anonimo = gerar_id_anonimo(target.id, target.cpf)
+    connection.execute(
+        Candidate.__table__.update()
+        .where(Candidate.__table__.c.id == target.id)
+        .values(id_anonimo=id_anonimo)
+    )
+    attributes.set_committed_value(target, "id_anonimo", id_anonimo)
+
+
+@event.listens_for(Candidate, "before_update")
+def _atualizar_id_anonimo_cpf(mapper, connection, target):
+    """Recalcula o ID anônimo quando o CPF muda"""
+    from app.utils.anonimizacao import gerar_id_anonimo
+    
+    if inspect(target).attrs.cpf.history.has_changes():
+        target.id_anonimo = gerar_id_anonimo(target.id, target.cpf)
+
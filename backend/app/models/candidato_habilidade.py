@@ -0,0 +1,43 @@
+"""
+Modelo para Habilidades dos Candidatos (normalizado a partir de Candidate.habilidades)
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from typing import Optional
+from app.core.database import Base
+
+
+def normalizar_habilidade(nome: Optional[str]) -> str:
+    """Chave de busca da habilidade: sem espaços nas pontas e em minúsculas"""
+    return (nome or "").strip().lower()
+
+
+class CandidatoHabilidade(Base):
+    """Habilidade declarada pelo candidato no onboarding (uma linha por habilidade)"""
+    __tablename__ = "candidato_habilidades"
+
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, index=True)
+    habilidade = Column(String(255), nullable=False)  # Como o candidato digitou
+    habilidade_normalizada = Column(String(255), nullable=False)  # normalizar_habilidade(habilidade)
+    nivel = Column(Integer, nullable=False)  # 1 a 5
+    anos_experiencia = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=func.now())
+
+    __table_args__ = (
+        Index("ix_candidato_habilidades_normalizada", "habilidade_normalizada", "candidate_id"),
+        # Busca por trecho do nome (migration 041)
+        Index(
+            "ix_candidato_habilidades_normalizada_trgm",
+            "habilidade_normalizada",
+            postgresql_using="gin",
+            postgresql_ops={"habilidade_normalizada": "gin_trgm_ops"}
+        ),
+    )
+
+    # Relacionamentos
+    candidate = relationship("Candidate", back_populates="habilidades_rel")
+
+    def __repr__(self):
+        return f"<CandidatoHabilidade(candidate_id={self.candidate_id}, habilidade={self.habilidade}, nivel={self.nivel})>"
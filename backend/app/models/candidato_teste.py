@@ -1,7 +1,7 @@
 """
 Modelo de Resultado de Teste e Interessamento
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum as SQLEnum, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum as SQLEnum, Boolean, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -75,6 +75,10 @@ class StatusKanbanCandidato(str, enum.Enum):
 class VagaCandidato(Base):
     """Relacionamento entre vaga e candidato com rastreamento de estado"""
     __tablename__ = "vaga_candidatos"
+    __table_args__ = (
+        # Alvo do INSERT ... ON CONFLICT (vaga_id, candidate_id) da materialização do matching
+        UniqueConstraint("vaga_id", "candidate_id", name="uq_vaga_candidato"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vaga_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
@@ -1,7 +1,7 @@
 """
 Modelo de Competência e Autoavaliação
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum as SQLEnum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum as SQLEnum, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -83,6 +83,10 @@ class Competencia(Base):
 class AutoavaliacaoCompetencia(Base):
     """Autoavaliação do candidato em cada competência"""
     __tablename__ = "autoavaliacao_competencias"
+    __table_args__ = (
+        # Índice invertido competência -> (nível, candidato) usado no matching de vagas
+        Index("ix_autoavaliacao_competencias_competencia_nivel", "competencia_id", "nivel_declarado", "candidate_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
@@ -1,7 +1,8 @@
 """
 Modelo de Vaga
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum, Numeric
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum, Numeric, Computed, Index, event, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -19,6 +20,14 @@ class JobStatus(str, enum.Enum):
 class Job(Base):
     """Modelo de vaga"""
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Busca por requisito (migration 047): tsvector só dos requisitos
+        Index(
+            "ix_jobs_requirements_busca",
+            text("to_tsvector('portuguese', f_unaccent(coalesce(requirements, '')))"),
+            postgresql_using="gin"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -27,6 +36,7 @@ class Job(Base):
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
     requirements = Column(Text)
+    habilidades_extraidas = Column(ARRAY(String(50)), nullable=True)  # Tecnologias dos requisitos; mantido pelos eventos abaixo
     benefits = Column(Text)
     area_atuacao = Column(String(50), nullable=True)  # Área da vaga
     
@@ -52,6 +62,17 @@ class Job(Base):
     views_count = Column(Integer, default=0)
     applications_count = Column(Integer, default=0)
     
+    # Busca textual (coluna gerada pelo banco, migration 040): título > requisitos > descrição
+    busca_vetor = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('portuguese', f_unaccent(coalesce(title, ''))), 'A') || "
+            "setweight(to_tsvector('portuguese', f_unaccent(coalesce(requirements, ''))), 'B') || "
+            "setweight(to_tsvector('portuguese', f_unaccent(coalesce(description, ''))), 'C')",
+            persisted=True
+        )
+    )
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -70,3 +91,20 @@ class Job(Base):
         return f"<Job(id={self.id}, title={self.title}, status={self.status})>"
 
 
+@event.listens_for(Job, "before_insert")
+def _extrair_habilidades_insert(mapper, connection, target):
+    """Extrai as tecnologias dos requisitos uma única vez, na criação da vaga"""
+    from app.utils.extracao_habilidades import extrair_habilidades
+    
+    target.habilidades_extraidas = sorted(extrair_habilidades(target.requirements))
+
+
+@event.listens_for(Job, "before_update")
+def _extrair_habilidades_update(mapper, connection, target):
+    """Reextrai as tecnologias quando os requisitos mudam"""
+    from app.utils.extracao_habilidades import extrair_habilidades
+    
+    if inspect(target).attrs.requirements.history.has_changes():
+        target.habilidades_extraidas = sorted(extrair_habilidades(target.requirements))
+
+
@@ -0,0 +1,52 @@
+"""
+Modelo de Execução do matching de uma vaga (em segundo plano)
+"""
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class StatusMatchingExecucao(str, enum.Enum):
+    """Status de uma execução do matching de uma vaga"""
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+
+class MatchingExecucao(Base):
+    """
+    Execução em segundo plano do matching de uma vaga (publicação ou mudança de requisitos).
+    Permite à empresa acompanhar progresso e conclusão do cálculo.
+    """
+    __tablename__ = "matching_execucoes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vaga_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    status = Column(String(20), nullable=False, default=StatusMatchingExecucao.PENDENTE.value)
+    motivo = Column(String(50), nullable=True)  # publicacao, requisitos_alterados
+    
+    # Progresso
+    total_candidatos = Column(Integer, nullable=True)
+    candidatos_processados = Column(Integer, nullable=False, default=0)
+    candidatos_compativeis = Column(Integer, nullable=True)
+    erro = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    iniciado_em = Column(DateTime(timezone=True), nullable=True)
+    concluido_em = Column(DateTime(timezone=True), nullable=True)
+    
+    @property
+    def progresso(self) -> int:
+        """Percentual concluído (0-100)"""
+        if self.status == StatusMatchingExecucao.CONCLUIDO.value:
+            return 100
+        if not self.total_candidatos:
+            return 0
+        return min(99, int(self.candidatos_processados * 100 / self.total_candidatos))
+    
+    def __repr__(self):
+        return f"<MatchingExecucao(vaga_id={self.vaga_id}, status={self.status}, processados={self.candidatos_processados})>"
@@ -0,0 +1,39 @@
+"""
+Modelo de Recomendação de vaga pré-calculada (candidato x vaga)
+"""
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RecomendacaoVaga(Base):
+    """
+    Top-N de vagas recomendadas por candidato, gerado em lote
+    (app.services.recomendacao_lote) e lido diretamente pelos endpoints de recomendação.
+    """
+    __tablename__ = "recomendacoes_vagas"
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "job_id", name="uq_recomendacao_vaga"),
+        # Leitura por candidato já na ordem do ranking
+        Index("ix_recomendacoes_vagas_candidato_posicao", "candidate_id", "posicao"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    posicao = Column(Integer, nullable=False)  # 1 = melhor recomendação
+    
+    # Scores (0-1) e detalhes, mesmos critérios de RecommendationService.recomendar_vagas
+    compatibilidade_score = Column(Float, nullable=False)
+    score_habilidades = Column(Float, nullable=False)
+    score_localizacao = Column(Float, nullable=False)
+    score_experiencia = Column(Float, nullable=False)
+    motivo_localizacao = Column(String(255), nullable=True)
+    habilidades_matches = Column(Integer, nullable=False, default=0)
+    habilidades_faltando = Column(ARRAY(String(50)), nullable=True)
+    
+    calculado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<RecomendacaoVaga(candidate_id={self.candidate_id}, job_id={self.job_id}, posicao={self.posicao})>"
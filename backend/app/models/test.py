@@ -77,6 +77,8 @@ class AdaptiveTestSession(Base):
     # Estado atual do teste
     nivel_atual = Column(String(20), nullable=False, default="basico")  # basico, intermediario, avancado
     questao_atual_index = Column(Integer, default=0)  # Índice da questão atual no nível
+    # Questões sorteadas no início de cada nível: qualquer worker serve a próxima pelo índice
+    questoes_sorteadas = Column(JSON, nullable=True)  # {nivel: [question_id, ...]}
     
     # Contadores de acertos por nível
     acertos_basico = Column(Integer, default=0)
@@ -0,0 +1,41 @@
+"""
+Modelo de Score de Matching materializado (vaga x candidato)
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class VagaMatchScore(Base):
+    """
+    Resultado do matching prioritizado (BD CC + BD CA) persistido por vaga e candidato.
+    Recalculado por completo na publicação da vaga e atualizado incrementalmente
+    quando autoavaliações, certificações ou requisitos mudam.
+    """
+    __tablename__ = "vaga_match_scores"
+    __table_args__ = (
+        UniqueConstraint("vaga_id", "candidate_id", name="uq_vaga_match_score"),
+        # Leitura das telas de matching: faixa por vaga já ordenada por tipo e score
+        Index("ix_vaga_match_scores_ranking", "vaga_id", "atende_minimo", "tipo_match", "score_total"),
+        Index("ix_vaga_match_scores_candidate_id", "candidate_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    vaga_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    
+    # Resultado do matching
+    atende_minimo = Column(Boolean, nullable=False, default=False)
+    tipo_match = Column(String(50), nullable=True)  # '1º Match (Certificado)' ou '2º Match (Autoavaliação)'
+    score_total = Column(Integer, nullable=False, default=0)
+    score_certificacao = Column(Integer, nullable=False, default=0)
+    score_autoavaliacao = Column(Integer, nullable=False, default=0)
+    competencias_certificadas = Column(Integer, nullable=False, default=0)
+    competencias_autoavaliadas = Column(Integer, nullable=False, default=0)
+    testes_realizados = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<VagaMatchScore(vaga_id={self.vaga_id}, candidate_id={self.candidate_id}, score={self.score_total}, atende={self.atende_minimo})>"
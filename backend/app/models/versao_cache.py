@@ -0,0 +1,22 @@
+"""
+Modelo de Versão de cache em memória compartilhada entre processos
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class VersaoCache(Base):
+    """
+    Contador por cache (ex.: 'banco_questoes'), incrementado na mesma transação
+    que altera os dados do cache. Cada processo compara com a versão que carregou
+    e recarrega quando ela muda, sem esperar o TTL.
+    """
+    __tablename__ = "versoes_cache"
+
+    chave = Column(String(50), primary_key=True)
+    versao = Column(BigInteger, nullable=False, default=0)
+    atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<VersaoCache(chave={self.chave}, versao={self.versao})>"
@@ -40,25 +40,25 @@ class DadosPessoaisUpdate(BaseModel):
 
 class HabilidadeAutoAvaliacao(BaseModel):
     """Schema para auto-avaliação de habilidade"""
-    habilidade: str = Field(..., min_length=1)
+    habilidade: str = Field(..., min_length=1, max_length=255)
     nivel: int = Field(..., ge=1, le=5, description="Nível de 1 a 5")
     anos_experiencia: Optional[int] = None
 
 
 class ExperienciaProfissional(BaseModel):
     """Schema para experiência profissional"""
-    cargo: str = Field(..., min_length=1, description="Cargo/Função")
-    empresa: str = Field(..., min_length=1, description="Nome da empresa")
-    periodo: str = Field(..., description="Período (ex: 2020-2023 ou Jan/2020 - Atual)")
+    cargo: str = Field(..., min_length=1, max_length=255, description="Cargo/Função")
+    empresa: str = Field(..., min_length=1, max_length=255, description="Nome da empresa")
+    periodo: str = Field(..., max_length=100, description="Período (ex: 2020-2023 ou Jan/2020 - Atual)")
     descricao: Optional[str] = Field(None, description="Descrição das atividades")
 
 
 class FormacaoAcademica(BaseModel):
     """Schema para formação acadêmica"""
-    instituicao: str = Field(..., min_length=1, description="Nome da instituição")
-    curso: str = Field(..., min_length=1, description="Nome do curso")
-    nivel: str = Field(..., description="Nível: Fundamental, Médio, Superior, Pós-Graduação, etc")
-    status: str = Field(..., description="Status: Completo, Em andamento, Trancado")
+    instituicao: str = Field(..., min_length=1, max_length=255, description="Nome da instituição")
+    curso: str = Field(..., min_length=1, max_length=255, description="Nome do curso")
+    nivel: str = Field(..., max_length=50, description="Nível: Fundamental, Médio, Superior, Pós-Graduação, etc")
+    status: str = Field(..., max_length=50, description="Status: Completo, Em andamento, Trancado")
     ano_conclusao: Optional[int] = Field(None, description="Ano de conclusão (se completo)")
 
 
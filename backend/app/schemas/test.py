@@ -181,6 +181,33 @@ class AnswerQuestionRequest(BaseModel):
     alternative_id: int
 
 
+class AnswerSheetResponse(BaseModel):
+    """Schema com todas as questões restantes do nível e o token assinado da folha de respostas"""
+    session_id: int
+    nivel_atual: str
+    questoes: List[QuestionWithAlternatives]
+    token: str  # Deve ser devolvido junto com as respostas
+    progresso: dict
+
+
+class AnswerSheetSubmit(BaseModel):
+    """Schema para responder todas as questões de uma folha de uma vez"""
+    token: str
+    respostas: List[AnswerQuestionRequest]
+
+
+class AnswerSheetResult(BaseModel):
+    """Schema do resultado de uma folha: correção do nível e próxima folha (ou finalização)"""
+    session_id: int
+    is_completed: bool
+    acertos: int
+    total: int
+    resultados: List[dict]  # [{"question_id": int, "acertou": bool}]
+    proxima_folha: Optional[AnswerSheetResponse] = None
+    progresso: dict
+    mensagem: Optional[str] = None
+
+
 class AdaptiveTestResult(BaseModel):
     """Schema do resultado final do teste adaptativo"""
     session_id: int
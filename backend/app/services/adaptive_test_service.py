@@ -15,14 +15,16 @@ Regras:
 
 - Confirmado quando: ≥3 acertos em 5 questões
 """
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
-import random
 
-from app.models.test import Test, Question, Alternative, AdaptiveTestSession, TestLevel
+from app.models.test import AdaptiveTestSession, TestLevel
 from app.models.candidate import Candidate
+from app.services.banco_questoes import banco_questoes, QuestaoBanco
+from app.services.correcao_testes import CorrecaoTestes, RespostaCorrigida
+from app.core.security import create_answer_sheet_token, decode_token
 
 
 class AdaptiveTestService:
@@ -36,7 +38,6 @@ class AdaptiveTestService:
     
     def __init__(self, db: Session):
         self.db = db
-        self._questoes_cache = {}  # Cache para evitar re-embaralhamento
     
     def iniciar_sessao_adaptativa(
         self, 
@@ -79,12 +80,49 @@ class AdaptiveTestService:
         
         return nova_sessao
     
-    def obter_proxima_questao(self, sessao: AdaptiveTestSession) -> Optional[Question]:
+    def sortear_questoes_nivel(self, sessao: AdaptiveTestSession) -> List[int]:
         """
-        Obtém a próxima questão para a sessão, usando cache para evitar re-embaralhamento.
+        IDs das questões do nível atual da sessão.
         
-        Cache é inicializado no __init__ e compartilhado entre chamadas,
-        evitando que as questões sejam re-embaralhadas.
+        Sorteados uma única vez no início do nível e gravados em
+        sessao.questoes_sorteadas, para que qualquer worker sirva a mesma sequência.
+        O sorteio bloqueia a sessão (como a submissão da folha): requisições
+        simultâneas do mesmo nível gravam e recebem um único sorteio.
+        """
+        sorteadas = sessao.questoes_sorteadas or {}
+        if sessao.nivel_atual in sorteadas:
+            return sorteadas[sessao.nivel_atual]
+        
+        # A sessão não usa autoflush: grava antes da releitura as alterações pendentes
+        # do chamador (correção da folha, novo nível), que populate_existing descartaria
+        self.db.flush()
+        # Relê a sessão bloqueada; outra requisição pode ter sorteado enquanto esta esperava
+        self.db.query(AdaptiveTestSession).filter(
+            AdaptiveTestSession.id == sessao.id
+        ).populate_existing().with_for_update().one()
+        sorteadas = sessao.questoes_sorteadas or {}
+        if sessao.nivel_atual in sorteadas:
+            self.db.commit()
+            return sorteadas[sessao.nivel_atual]
+        
+        questoes = banco_questoes.sortear(
+            self.db, sessao.habilidade, self._nivel_para_enum(sessao.nivel_atual), self.QUESTOES_POR_NIVEL
+        )
+        if not questoes:
+            # Libera o bloqueio (o que o chamador já gravou continua valendo, como no sorteio)
+            self.db.commit()
+            return []
+        
+        ids = [q.id for q in questoes]
+        sessao.questoes_sorteadas = {**sorteadas, sessao.nivel_atual: ids}
+        self.db.commit()
+        
+        return ids
+    
+    def obter_proxima_questao(self, sessao: AdaptiveTestSession) -> Optional[QuestaoBanco]:
+        """
+        Obtém a próxima questão da sequência sorteada para o nível atual
+        (busca por chave primária no banco de questões do processo).
         """
         nivel_atual = sessao.nivel_atual
         index_atual = sessao.questao_atual_index
@@ -93,38 +131,21 @@ class AdaptiveTestService:
         if nivel_atual == "basico":
             if sessao.total_basico >= self.QUESTOES_POR_NIVEL:
                 return None
-            chave_cache = "questoes_basico"
         elif nivel_atual == "intermediario":
             if sessao.total_intermediario >= self.QUESTOES_POR_NIVEL:
                 return None
-            chave_cache = "questoes_intermediario"
         elif nivel_atual == "avancado":
             if sessao.total_avancado >= self.QUESTOES_POR_NIVEL:
                 return None
-            chave_cache = "questoes_avancado"
         else:
             return None
         
-        # Se não tem questões em cache para este nível, buscar e embaralhar
-        if chave_cache not in self._questoes_cache:
-            questoes = self.db.query(Question).join(Test).filter(
-                Test.habilidade.ilike(f"%{sessao.habilidade}%"),
-                Test.nivel == self._nivel_para_enum(nivel_atual)
-            ).options(selectinload(Question.alternatives)).all()
-            
-            if not questoes:
-                return None
-            
-            random.shuffle(questoes)
-            self._questoes_cache[chave_cache] = questoes
-        
-        questoes = self._questoes_cache[chave_cache]
+        ids = self.sortear_questoes_nivel(sessao)
         
         # Retornar questão na sequência
-        if index_atual < len(questoes):
-            questao = questoes[index_atual]
+        if index_atual < len(ids):
             # Não incrementar aqui - deixar para depois que responder
-            return questao
+            return banco_questoes.questao(self.db, ids[index_atual])
         
         return None
     
@@ -147,20 +168,12 @@ class AdaptiveTestService:
         Registra resposta, valida alternativa e atualiza contadores
         Retorna (is_correct, mensagem_erro)
         """
-        # Buscar questão e alternativa
-        questao = self.db.query(Question).filter(Question.id == question_id).first()
-        if not questao:
-            return False, "Questão não encontrada"
-        
-        alternativa = self.db.query(Alternative).filter(
-            Alternative.id == alternative_id,
-            Alternative.question_id == question_id
-        ).first()
-        
-        if not alternativa:
-            return False, "Alternativa não encontrada"
+        # Corrigir pelo gabarito em memória
+        corrigida, erro = CorrecaoTestes.corrigir_resposta(self.db, question_id, alternative_id)
+        if erro:
+            return False, erro
         
-        is_correct = alternativa.is_correct
+        is_correct = corrigida.acertou
         
         # Registrar no histórico
         if sessao.historico_respostas is None:
@@ -194,6 +207,89 @@ class AdaptiveTestService:
         
         return is_correct, None
     
+    def emitir_folha_nivel(self, sessao: AdaptiveTestSession) -> Tuple[List[QuestaoBanco], Optional[str]]:
+        """
+        Entrega de uma vez as questões restantes do nível atual, com o token
+        assinado (HMAC) da folha de respostas.
+        Retorna (questoes, token); sem questões disponíveis, ([], None)
+        """
+        ids = self.sortear_questoes_nivel(sessao)[sessao.questao_atual_index:]
+        questoes = banco_questoes.questoes_por_ids(self.db, ids)
+        if not questoes:
+            return [], None
+        
+        token = create_answer_sheet_token({
+            "sessao": sessao.id,
+            "candidato": sessao.candidate_id,
+            "nivel": sessao.nivel_atual,
+            "inicio": sessao.questao_atual_index,
+            "questoes": [q.id for q in questoes]
+        })
+        return questoes, token
+    
+    def registrar_folha(
+        self,
+        sessao: AdaptiveTestSession,
+        token: str,
+        respostas: Dict[int, int]
+    ) -> Tuple[List[RespostaCorrigida], Optional[str]]:
+        """
+        Corrige todas as respostas de uma folha e atualiza contadores e histórico.
+        Não faz commit: o chamador decide o próximo nível e grava tudo de uma vez.
+        Retorna (respostas_corrigidas, mensagem_erro)
+        
+        A folha só vale para a sessão, o nível e a posição em que foi emitida,
+        então não pode ser reenviada depois de corrigida.
+        """
+        payload = decode_token(token)
+        if not payload or payload.get("type") != "folha_respostas":
+            return [], "Folha de respostas inválida ou expirada"
+        
+        if (
+            payload.get("sessao") != sessao.id
+            or payload.get("nivel") != sessao.nivel_atual
+            or payload.get("inicio") != sessao.questao_atual_index
+        ):
+            return [], "Folha de respostas não corresponde ao estado atual da sessão"
+        
+        questoes = payload.get("questoes") or []
+        if set(respostas) != set(questoes):
+            return [], "Responda todas as questões da folha (e apenas elas)"
+        
+        corrigidas = []
+        for question_id in questoes:
+            corrigida, erro = CorrecaoTestes.corrigir_resposta(self.db, question_id, respostas[question_id])
+            if erro:
+                return [], erro
+            corrigidas.append(corrigida)
+        
+        agora = datetime.now().isoformat()
+        sessao.historico_respostas = (sessao.historico_respostas or []) + [
+            {
+                "question_id": corrigida.questao.id,
+                "alternative_id": corrigida.alternativa.id,
+                "is_correct": corrigida.acertou,
+                "nivel": sessao.nivel_atual,
+                "timestamp": agora
+            }
+            for corrigida in corrigidas
+        ]
+        
+        acertos = sum(1 for corrigida in corrigidas if corrigida.acertou)
+        if sessao.nivel_atual == "basico":
+            sessao.total_basico += len(corrigidas)
+            sessao.acertos_basico += acertos
+        elif sessao.nivel_atual == "intermediario":
+            sessao.total_intermediario += len(corrigidas)
+            sessao.acertos_intermediario += acertos
+        elif sessao.nivel_atual == "avancado":
+            sessao.total_avancado += len(corrigidas)
+            sessao.acertos_avancado += acertos
+        
+        sessao.questao_atual_index += len(corrigidas)
+        
+        return corrigidas, None
+    
     def decidir_proximo_nivel(self, sessao: AdaptiveTestSession) -> Tuple[Optional[str], str]:
         """
         Decide qual é o próximo nível ou se finaliza
@@ -0,0 +1,399 @@
+"""
+Banco de questões em memória (por processo) para os testes adaptativos e de certificação
+
+Os testes buscavam as questões a cada resposta com
+Test.habilidade.ilike('%x%') + selectinload(Question.alternatives). O banco carrega
+tests/questions/alternatives uma vez (3 consultas só de colunas) e guarda tuplas
+imutáveis agrupadas por (habilidade normalizada, TestLevel):
+
+    questoes = banco_questoes.questoes(db, "python", TestLevel.basico)
+
+A busca mantém a semântica do ilike: a habilidade informada pode ser trecho da
+habilidade do teste ("react" encontra "React Native").
+
+O gabarito (question_id -> alternativa correta, alternative_id -> alternativa)
+é montado na mesma carga e usado por app.services.correcao_testes.
+O catálogo de testes por (habilidade, nível) também é montado na carga e atende
+/candidates/testes/habilidades-disponiveis.
+
+Invalidação por versão: qualquer commit que toque tests/questions/alternatives
+(inclusive exclusões em massa do admin e importação por planilha) incrementa a
+versão e a próxima leitura recarrega o banco. Outros processos (workers) recarregam
+após BANCO_QUESTOES_TTL_SEGUNDOS; antes de corrigir respostas, a correção confere
+a versão compartilhada (versoes_cache, incrementada na mesma transação da alteração),
+de modo que um gabarito corrigido pelo admin vale em todos os workers na hora.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.test import Test, Question, Alternative, TestLevel
+from app.models.versao_cache import VersaoCache
+
+logger = logging.getLogger(__name__)
+
+CHAVE_BANCO_QUESTOES_ALTERADO = "banco_questoes_alterado"
+# Linha de versoes_cache do banco de questões
+CHAVE_VERSAO_COMPARTILHADA = "banco_questoes"
+# Intervalo mínimo entre recargas forçadas por id ausente (ids inválidos não disparam recarga a cada requisição)
+RECARGA_POR_AUSENCIA_MINIMA_SEGUNDOS = 5
+# Buscas por trecho memorizadas por carga: a habilidade vem do usuário, então o memo é limitado
+MAX_BUSCAS_MEMORIZADAS = 1024
+
+
+class AlternativaBanco(NamedTuple):
+    id: int
+    question_id: int
+    texto: str
+    ordem: int
+    is_correct: bool
+
+
+class QuestaoBanco(NamedTuple):
+    """Mesmos nomes de atributos de Question, para uso no lugar do modelo"""
+    id: int
+    test_id: int
+    texto_questao: str
+    ordem: int
+    habilidade: str
+    nivel: TestLevel
+    alternatives: Tuple[AlternativaBanco, ...]  # ordenadas por ordem
+
+
+class TesteBanco(NamedTuple):
+    """Teste do catálogo, com as questões na ordem de aplicação"""
+    id: int
+    nome: str
+    habilidade: str
+    nivel: TestLevel
+    descricao: Optional[str]
+    questoes: Tuple[QuestaoBanco, ...]  # ordenadas por ordem
+
+
+def normalizar_habilidade(habilidade: Optional[str]) -> str:
+    return (habilidade or "").strip().casefold()
+
+
+class BancoQuestoes:
+    """Questões e alternativas imutáveis, recarregadas quando a versão muda"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versao = 0
+        self._versao_carregada = -1
+        self._carregado_em = 0.0
+        # versoes_cache.versao lida no início da última carga
+        self._versao_compartilhada: Optional[int] = None
+        self._por_grupo: Dict[Tuple[str, TestLevel], Tuple[QuestaoBanco, ...]] = {}
+        self._por_id: Dict[int, QuestaoBanco] = {}
+        self._por_teste: Dict[int, Tuple[QuestaoBanco, ...]] = {}
+        # Catálogo: (habilidade normalizada, TestLevel) -> testes com questões
+        self._catalogo: Dict[Tuple[str, TestLevel], Tuple[TesteBanco, ...]] = {}
+        # Gabarito: question_id -> alternativa correta; alternative_id -> alternativa (com question_id)
+        self._gabarito: Dict[int, AlternativaBanco] = {}
+        self._alternativas: Dict[int, AlternativaBanco] = {}
+        # Resultado das buscas por trecho de habilidade (válido até a próxima carga)
+        self._buscas: Dict[Tuple[str, TestLevel], Tuple[QuestaoBanco, ...]] = {}
+        self.cargas = 0
+
+    @property
+    def versao(self) -> int:
+        return self._versao
+
+    def invalidar(self) -> None:
+        """Incrementa a versão: a próxima leitura recarrega o banco"""
+        with self._lock:
+            self._versao += 1
+
+    @staticmethod
+    def _ler_versao_compartilhada(db: Session) -> int:
+        versao = db.query(VersaoCache.versao).filter(VersaoCache.chave == CHAVE_VERSAO_COMPARTILHADA).scalar()
+        return versao or 0
+
+    def sincronizar(self, db: Session) -> None:
+        """
+        Confere a versão compartilhada (uma consulta por chave primária) e invalida o
+        banco se outro processo alterou questões/alternativas desde a última carga.
+        Usado antes de corrigir respostas, que não podem esperar o TTL.
+        """
+        if self._ler_versao_compartilhada(db) != self._versao_compartilhada:
+            self.invalidar()
+
+    def _recarregar_por_ausencia(self, db: Session) -> None:
+        """
+        Id pedido não está no banco carregado: pode ter sido criado por outro worker
+        depois da última carga. Recarrega, exceto se a carga for recente.
+        """
+        if time.monotonic() - self._carregado_em < RECARGA_POR_AUSENCIA_MINIMA_SEGUNDOS:
+            return
+        self.invalidar()
+        self._garantir_carregado(db)
+
+    def _expirado(self) -> bool:
+        return (
+            self._versao_carregada != self._versao
+            or time.monotonic() - self._carregado_em > settings.BANCO_QUESTOES_TTL_SEGUNDOS
+        )
+
+    def _garantir_carregado(self, db: Session) -> None:
+        if not self._expirado():
+            return
+        with self._lock:
+            if not self._expirado():
+                return
+            versao = self._versao
+            self._carregar(db)
+            self._versao_carregada = versao
+            self._carregado_em = time.monotonic()
+
+    def _carregar(self, db: Session) -> None:
+        # Lida antes dos dados: alteração concorrente com a carga só causa uma recarga extra
+        versao_compartilhada = self._ler_versao_compartilhada(db)
+        testes = {
+            test_id: (habilidade, nivel, nome, descricao)
+            for test_id, habilidade, nivel, nome, descricao in db.query(
+                Test.id, Test.habilidade, Test.nivel, Test.nome, Test.descricao
+            )
+        }
+
+        alternativas: Dict[int, List[AlternativaBanco]] = {}
+        for alternativa_id, question_id, texto, ordem, is_correct in db.query(
+            Alternative.id, Alternative.question_id, Alternative.texto, Alternative.ordem, Alternative.is_correct
+        ):
+            alternativas.setdefault(question_id, []).append(
+                AlternativaBanco(alternativa_id, question_id, texto, ordem, bool(is_correct))
+            )
+
+        por_grupo: Dict[Tuple[str, TestLevel], List[QuestaoBanco]] = {}
+        por_teste: Dict[int, List[QuestaoBanco]] = {}
+        por_id: Dict[int, QuestaoBanco] = {}
+        gabarito: Dict[int, AlternativaBanco] = {}
+        for question_id, test_id, texto_questao, ordem in db.query(
+            Question.id, Question.test_id, Question.texto_questao, Question.ordem
+        ).order_by(Question.id):
+            if test_id not in testes:
+                continue
+            habilidade, nivel, _, _ = testes[test_id]
+            questao = QuestaoBanco(
+                id=question_id,
+                test_id=test_id,
+                texto_questao=texto_questao,
+                ordem=ordem,
+                habilidade=habilidade,
+                nivel=nivel,
+                alternatives=tuple(sorted(alternativas.get(question_id, ()), key=lambda alt: alt.ordem))
+            )
+            por_id[question_id] = questao
+            por_grupo.setdefault((normalizar_habilidade(habilidade), nivel), []).append(questao)
+            por_teste.setdefault(test_id, []).append(questao)
+            correta = next((alt for alt in questao.alternatives if alt.is_correct), None)
+            if correta is not None:
+                gabarito[question_id] = correta
+
+        self._por_grupo = {chave: tuple(questoes) for chave, questoes in por_grupo.items()}
+        self._por_id = por_id
+        self._por_teste = {test_id: tuple(questoes) for test_id, questoes in por_teste.items()}
+        catalogo: Dict[Tuple[str, TestLevel], List[TesteBanco]] = {}
+        for test_id, questoes in sorted(por_teste.items()):
+            habilidade, nivel, nome, descricao = testes[test_id]
+            catalogo.setdefault((normalizar_habilidade(habilidade), nivel), []).append(TesteBanco(
+                id=test_id,
+                nome=nome,
+                habilidade=habilidade,
+                nivel=nivel,
+                descricao=descricao,
+                questoes=tuple(sorted(questoes, key=lambda q: q.ordem))
+            ))
+        self._catalogo = {chave: tuple(testes_grupo) for chave, testes_grupo in catalogo.items()}
+        self._gabarito = gabarito
+        self._alternativas = {
+            alternativa.id: alternativa
+            for questao in por_id.values()
+            for alternativa in questao.alternatives
+        }
+        self._buscas = {}
+        self._versao_compartilhada = versao_compartilhada
+        self.cargas += 1
+        logger.info(f"Banco de questões carregado: {len(por_id)} questões em {len(self._por_grupo)} grupos")
+
+    def questoes(self, db: Session, habilidade: str, nivel: TestLevel) -> Tuple[QuestaoBanco, ...]:
+        """Questões do nível cuja habilidade contém o trecho informado (ordenadas por id)"""
+        self._garantir_carregado(db)
+        # Referências locais: uma recarga concorrente troca os dicionários inteiros
+        por_grupo, buscas = self._por_grupo, self._buscas
+        chave = (normalizar_habilidade(habilidade), nivel)
+        encontradas = buscas.get(chave)
+        if encontradas is None:
+            trecho, _ = chave
+            grupos = [
+                questoes for (habilidade_grupo, nivel_grupo), questoes in por_grupo.items()
+                if nivel_grupo == nivel and trecho in habilidade_grupo
+            ]
+            if len(grupos) == 1:
+                encontradas = grupos[0]
+            else:
+                encontradas = tuple(sorted((q for grupo in grupos for q in grupo), key=lambda q: q.id))
+            # Habilidades cadastradas sempre são memorizadas; trechos arbitrários só até o limite
+            if chave in por_grupo or len(buscas) < MAX_BUSCAS_MEMORIZADAS:
+                buscas[chave] = encontradas
+        return encontradas
+
+    def sortear(
+        self,
+        db: Session,
+        habilidade: str,
+        nivel: TestLevel,
+        quantidade: int,
+        excluir: Iterable[int] = (),
+        rng: Optional[random.Random] = None
+    ) -> List[QuestaoBanco]:
+        """
+        Sorteio sem reposição de até `quantidade` questões do grupo, ignorando os ids em `excluir`.
+        
+        Substitui o ORDER BY random() LIMIT n (que ordena todo o conjunto filtrado):
+        índices aleatórios são sorteados sobre a tupla em cache até completar a
+        quantidade, em tempo proporcional à quantidade pedida. Com rng semeado
+        (random.Random(semente)) o resultado é reprodutível.
+        """
+        questoes = self.questoes(db, habilidade, nivel)
+        excluir = excluir if isinstance(excluir, (set, frozenset)) else set(excluir)
+        rng = rng or random
+        total = len(questoes)
+        
+        # Grupo pequeno perto das exclusões: filtra e sorteia sobre o que sobra
+        if total <= 2 * quantidade + len(excluir):
+            disponiveis = [q for q in questoes if q.id not in excluir]
+            return rng.sample(disponiveis, min(quantidade, len(disponiveis)))
+        
+        # Há pelo menos quantidade + 1 questões não excluídas: termina em O(quantidade) sorteios esperados
+        sorteados = set()
+        escolhidas: List[QuestaoBanco] = []
+        while len(escolhidas) < quantidade:
+            indice = rng.randrange(total)
+            if indice in sorteados:
+                continue
+            sorteados.add(indice)
+            if questoes[indice].id not in excluir:
+                escolhidas.append(questoes[indice])
+        return escolhidas
+    
+    def questao(self, db: Session, question_id: int) -> Optional[QuestaoBanco]:
+        self._garantir_carregado(db)
+        if question_id not in self._por_id:
+            self._recarregar_por_ausencia(db)
+        return self._por_id.get(question_id)
+
+    def questoes_do_teste(self, db: Session, test_id: int) -> Tuple[QuestaoBanco, ...]:
+        self._garantir_carregado(db)
+        return self._por_teste.get(test_id, ())
+
+    def testes_catalogo(self, db: Session, competencia: str, nivel: Optional[TestLevel] = None) -> List[TesteBanco]:
+        """
+        Testes com questões da competência (nome exato da habilidade ou, se não houver,
+        habilidades que contêm o nome), do nível informado ou de todos os níveis
+        """
+        self._garantir_carregado(db)
+        catalogo = self._catalogo
+        trecho = normalizar_habilidade(competencia)
+        
+        def _grupos(combina):
+            return [
+                teste
+                for (habilidade, nivel_grupo), testes in sorted(catalogo.items(), key=lambda item: item[0][0])
+                if combina(habilidade) and (nivel is None or nivel_grupo == nivel)
+                for teste in testes
+            ]
+        
+        return _grupos(lambda habilidade: habilidade == trecho) or _grupos(lambda habilidade: trecho in habilidade)
+
+    def alternativa(self, db: Session, alternative_id: int) -> Optional[AlternativaBanco]:
+        self._garantir_carregado(db)
+        if alternative_id not in self._alternativas:
+            self._recarregar_por_ausencia(db)
+        return self._alternativas.get(alternative_id)
+
+    def alternativa_correta(self, db: Session, question_id: int) -> Optional[AlternativaBanco]:
+        self._garantir_carregado(db)
+        return self._gabarito.get(question_id)
+
+    def questoes_por_ids(self, db: Session, question_ids: List[int]) -> List[QuestaoBanco]:
+        """
+        Questões na ordem dos ids informados. Se algum id falta, recarrega o banco antes
+        de desistir dele; ids que continuam inexistentes são ignorados.
+        """
+        self._garantir_carregado(db)
+        if any(question_id not in self._por_id for question_id in question_ids):
+            self._recarregar_por_ausencia(db)
+        return [self._por_id[question_id] for question_id in question_ids if question_id in self._por_id]
+
+    def estatisticas(self) -> Dict:
+        return {
+            "versao": self._versao,
+            "versao_carregada": self._versao_carregada,
+            "versao_compartilhada": self._versao_compartilhada,
+            "questoes": len(self._por_id),
+            "grupos": len(self._por_grupo),
+            "testes_catalogo": sum(len(testes) for testes in self._catalogo.values()),
+            "cargas": self.cargas
+        }
+
+
+banco_questoes = BancoQuestoes()
+
+
+# ============================================================================
+# Invalidação quando tests/questions/alternatives mudam
+# ============================================================================
+
+_MODELOS_BANCO = (Test, Question, Alternative)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_banco_questoes_alterado(session, flush_context):
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objeto, _MODELOS_BANCO):
+            session.info[CHAVE_BANCO_QUESTOES_ALTERADO] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_banco_questoes_alterado_em_massa(orm_execute_state):
+    """query(...).delete() / update() não passam pelo flush"""
+    if orm_execute_state.is_delete or orm_execute_state.is_update:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in _MODELOS_BANCO:
+            orm_execute_state.session.info[CHAVE_BANCO_QUESTOES_ALTERADO] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _incrementar_versao_compartilhada(session):
+    """Incrementa versoes_cache na mesma transação que altera o banco de questões"""
+    # O flush final do commit acontece depois deste evento: antecipá-lo registra a alteração
+    session.flush()
+    if session.info.get(CHAVE_BANCO_QUESTOES_ALTERADO):
+        session.execute(
+            insert(VersaoCache)
+            .values(chave=CHAVE_VERSAO_COMPARTILHADA, versao=1)
+            .on_conflict_do_update(
+                index_elements=[VersaoCache.chave],
+                set_={"versao": VersaoCache.versao + 1, "atualizado_em": func.now()}
+            )
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_banco_questoes(session):
+    if session.info.pop(CHAVE_BANCO_QUESTOES_ALTERADO, False):
+        banco_questoes.invalidar()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_banco_questoes_alterado(session, previous_transaction):
+    session.info.pop(CHAVE_BANCO_QUESTOES_ALTERADO, None)
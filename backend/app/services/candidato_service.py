@@ -4,6 +4,7 @@ Serviço para gerenciar fluxo de candidato
 from sqlalchemy.orm import Session
 from app.models import Candidate, User, AutoavaliacaoCompetencia, Competencia, CandidatoTeste, VagaCandidato
 from app.models.candidato_teste import StatusOnboarding, StatusKanbanCandidato
+from app.services.matching_service import MatchingService
 from typing import List, Optional
 
 
@@ -37,6 +38,9 @@ class CandidatoService:
         candidate.status_onboarding = StatusOnboarding.AREA_SELECIONADA.value
         candidate.percentual_completude = 10
         db.commit()
+        
+        # Atualizar scores de matching do candidato nas vagas materializadas (em segundo plano)
+        MatchingService.agendar_atualizacao_candidato(candidate_id)
         return candidate
     
     @staticmethod
@@ -62,6 +66,14 @@ class CandidatoService:
         if not candidate.area_atuacao:
             raise ValueError("Candidato deve selecionar uma área antes de autoavaliar")
         
+        # Níveis anteriores, para saber quais competências mudaram (matching reverso)
+        niveis_anteriores = dict(
+            db.query(
+                AutoavaliacaoCompetencia.competencia_id,
+                AutoavaliacaoCompetencia.nivel_declarado
+            ).filter(AutoavaliacaoCompetencia.candidate_id == candidate_id).all()
+        )
+        
         # Limpar autoavaliações anteriores
         db.query(AutoavaliacaoCompetencia).filter(
             AutoavaliacaoCompetencia.candidate_id == candidate_id
@@ -79,6 +91,18 @@ class CandidatoService:
         candidate.status_onboarding = StatusOnboarding.AUTOAVALIACAO_CONCLUIDA.value
         candidate.percentual_completude = 40
         db.commit()
+        
+        # Matching reverso: só as vagas com requisito nas competências que mudaram
+        niveis_novos = {
+            int(comp_data['competencia_id']): int(comp_data['nivel_declarado'])
+            for comp_data in competencias
+        }
+        competencias_alteradas = [
+            competencia_id
+            for competencia_id in set(niveis_anteriores) | set(niveis_novos)
+            if niveis_anteriores.get(competencia_id) != niveis_novos.get(competencia_id)
+        ]
+        MatchingService.agendar_atualizacao_candidato(candidate_id, competencias_alteradas)
         return candidate
     
     @staticmethod
@@ -132,6 +156,9 @@ class CandidatoService:
         candidate.percentual_completude = 100
         candidate.onboarding_completo = True
         db.commit()
+        
+        # Atualizar scores de matching do candidato nas vagas materializadas (em segundo plano)
+        MatchingService.agendar_atualizacao_candidato(candidate_id)
         return candidate
     
     @staticmethod
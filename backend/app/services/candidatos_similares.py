@@ -0,0 +1,369 @@
+"""
+Busca aproximada de candidatos semelhantes (ANN) por vetor de competências
+
+Cada candidato vira um vetor compacto (uint8) com o nível 0-4 de cada
+competência, com a mesma precedência do matching: nível certificado
+(MapaCompetencias) > autoavaliação do mapa > AutoavaliacaoCompetencia.
+
+O índice é um LSH por projeções aleatórias (hiperplanos) em NumPy, mantido em
+memória no processo:
+- TABELAS tabelas de hash com BITS bits cada; a consulta visita o bucket exato
+  e os vizinhos a 1 bit (multi-probe) e reordena os candidatos pelo cosseno exato
+- Inserções/remoções incrementais após o commit de autoavaliações,
+  certificações ou mudanças de onboarding do candidato (só no processo do commit),
+  no executor compartilhado e com os ids de commits seguidos unidos em um lote
+- Reconstrução completa sob demanda (primeiro uso ou endpoint do admin) e após
+  CANDIDATOS_SIMILARES_TTL_SEGUNDOS, para refletir alterações feitas em outros workers
+
+Os hiperplanos de cada competência são gerados por uma semente fixa + coluna,
+então competências novas ampliam o índice sem invalidar os hashes existentes.
+"""
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.segundo_plano import FilaIds
+from app.models import Candidate, Competencia, AutoavaliacaoCompetencia
+from app.models.competencia import MapaCompetencias
+
+logger = logging.getLogger(__name__)
+
+TABELAS = 8
+BITS = 12
+SEMENTE = 20261016
+
+CHAVE_CANDIDATOS_SIMILARES_ALTERADOS = "candidatos_similares_alterados"
+
+
+def carregar_niveis(db: Session, candidate_ids: Optional[List[int]] = None) -> Dict[int, Dict[Hashable, int]]:
+    """
+    Níveis de competência dos candidatos elegíveis (ativos e com onboarding completo).
+
+    Returns:
+        candidate_id -> {competencia_id (ou "nome:<competência>"): nível 0-4}
+    """
+    filtros = [Candidate.is_active == True, Candidate.onboarding_completo == True]
+    if candidate_ids is not None:
+        filtros.append(Candidate.id.in_(candidate_ids))
+
+    areas = dict(db.query(Candidate.id, Candidate.area_atuacao).filter(*filtros).all())
+    niveis: Dict[int, Dict[Hashable, int]] = {candidate_id: {} for candidate_id in areas}
+    if not niveis:
+        return niveis
+
+    # Nome -> id da competência (preferindo a da área do candidato)
+    por_area_nome: Dict[Tuple[str, str], int] = {}
+    por_nome: Dict[str, int] = {}
+    for competencia_id, area, nome in db.query(Competencia.id, Competencia.area, Competencia.nome):
+        por_area_nome[(area, nome.lower())] = competencia_id
+        por_nome.setdefault(nome.lower(), competencia_id)
+
+    # 1. Fallback: autoavaliação direta
+    for candidate_id, competencia_id, nivel in db.query(
+        AutoavaliacaoCompetencia.candidate_id,
+        AutoavaliacaoCompetencia.competencia_id,
+        AutoavaliacaoCompetencia.nivel_declarado
+    ).filter(AutoavaliacaoCompetencia.candidate_id.in_(list(niveis))):
+        if nivel is not None:
+            niveis[candidate_id][competencia_id] = int(nivel)
+
+    # 2. Mapa consolidado: certificação tem prioridade sobre autoavaliação
+    for candidate_id, competencia_id, nome, certificado, autoavaliacao in db.query(
+        MapaCompetencias.candidate_id,
+        MapaCompetencias.competencia_id,
+        MapaCompetencias.competencia_nome,
+        MapaCompetencias.nivel_certificado,
+        MapaCompetencias.nivel_autoavaliacao
+    ).filter(MapaCompetencias.candidate_id.in_(list(niveis))):
+        nivel = certificado if certificado is not None else autoavaliacao
+        if nivel is None:
+            continue
+        chave = competencia_id or por_area_nome.get((areas[candidate_id], nome.lower())) \
+            or por_nome.get(nome.lower()) or f"nome:{nome.lower()}"
+        niveis[candidate_id][chave] = int(nivel)
+
+    return niveis
+
+
+class IndiceCandidatosSimilares:
+    """Índice LSH (projeções aleatórias) sobre os vetores de competência dos candidatos"""
+
+    def __init__(self, tabelas: int = TABELAS, bits: int = BITS):
+        self.tabelas = tabelas
+        self.bits = bits
+        self._pesos_bits = (1 << np.arange(bits, dtype=np.int64))
+        self._lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._colunas: Dict[Hashable, int] = {}
+        self._planos = np.zeros((self.tabelas * self.bits, 0), dtype=np.float32)
+        self._niveis = np.zeros((0, 0), dtype=np.uint8)
+        self._normas = np.zeros(0, dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hashes = np.zeros((0, self.tabelas), dtype=np.int64)
+        self._total = 0
+        self._linha_por_id: Dict[int, int] = {}
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(self.tabelas)]
+        self.construido = False
+        self.construido_em = 0.0
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def expirado(self) -> bool:
+        return (
+            not self.construido
+            or time.monotonic() - self.construido_em > settings.CANDIDATOS_SIMILARES_TTL_SEGUNDOS
+        )
+
+    # ------------------------------------------------------------------
+    # Estrutura
+    # ------------------------------------------------------------------
+
+    def _garantir_colunas(self, chaves: Iterable[Hashable]) -> None:
+        """Cria colunas (e hiperplanos) para competências ainda não vistas"""
+        novas = [chave for chave in dict.fromkeys(chaves) if chave not in self._colunas]
+        if not novas:
+            return
+        inicio = len(self._colunas)
+        for deslocamento, chave in enumerate(novas):
+            self._colunas[chave] = inicio + deslocamento
+
+        planos_novos = np.stack([
+            np.random.default_rng(SEMENTE + inicio + deslocamento)
+            .standard_normal(self.tabelas * self.bits).astype(np.float32)
+            for deslocamento in range(len(novas))
+        ], axis=1)
+        self._planos = np.hstack([self._planos, planos_novos])
+        self._niveis = np.hstack([self._niveis, np.zeros((self._niveis.shape[0], len(novas)), dtype=np.uint8)])
+
+    def _garantir_capacidade(self, linhas: int) -> None:
+        capacidade = self._niveis.shape[0]
+        if linhas <= capacidade:
+            return
+        nova = max(linhas, capacidade * 2, 64)
+        extra = nova - capacidade
+        self._niveis = np.vstack([self._niveis, np.zeros((extra, self._niveis.shape[1]), dtype=np.uint8)])
+        self._normas = np.concatenate([self._normas, np.zeros(extra, dtype=np.float32)])
+        self._ids = np.concatenate([self._ids, np.zeros(extra, dtype=np.int64)])
+        self._hashes = np.vstack([self._hashes, np.zeros((extra, self.tabelas), dtype=np.int64)])
+
+    def _vetor(self, niveis: Dict[Hashable, int]) -> np.ndarray:
+        vetor = np.zeros(len(self._colunas), dtype=np.uint8)
+        for chave, nivel in niveis.items():
+            vetor[self._colunas[chave]] = max(0, min(int(nivel), 255))
+        return vetor
+
+    def _calcular_hashes(self, vetores: np.ndarray) -> np.ndarray:
+        """(n x colunas) -> (n x tabelas) chaves de bucket"""
+        projecao = vetores.astype(np.float32) @ self._planos.T
+        bits = (projecao > 0).reshape(len(vetores), self.tabelas, self.bits)
+        return bits.astype(np.int64) @ self._pesos_bits
+
+    def _remover_dos_buckets(self, candidate_id: int, hashes: np.ndarray) -> None:
+        for tabela, chave in enumerate(hashes.tolist()):
+            bucket = self._buckets[tabela].get(chave)
+            if bucket is not None:
+                bucket.discard(candidate_id)
+                if not bucket:
+                    del self._buckets[tabela][chave]
+
+    def _adicionar_aos_buckets(self, candidate_id: int, hashes: np.ndarray) -> None:
+        for tabela, chave in enumerate(hashes.tolist()):
+            self._buckets[tabela].setdefault(chave, set()).add(candidate_id)
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    def reconstruir(self, niveis_por_candidato: Dict[int, Dict[Hashable, int]]) -> None:
+        """Substitui o índice inteiro (hash de todos os vetores em uma multiplicação)"""
+        with self._lock:
+            self._limpar()
+            self._garantir_colunas(chave for niveis in niveis_por_candidato.values() for chave in niveis)
+
+            candidatos = [
+                (candidate_id, self._vetor(niveis))
+                for candidate_id, niveis in niveis_por_candidato.items()
+            ]
+            candidatos = [(candidate_id, vetor) for candidate_id, vetor in candidatos if vetor.any()]
+            self._garantir_capacidade(len(candidatos))
+
+            if candidatos:
+                vetores = np.stack([vetor for _, vetor in candidatos])
+                total = len(candidatos)
+                self._niveis[:total] = vetores
+                self._normas[:total] = np.linalg.norm(vetores.astype(np.float32), axis=1)
+                self._ids[:total] = [candidate_id for candidate_id, _ in candidatos]
+                self._hashes[:total] = self._calcular_hashes(vetores)
+                self._total = total
+                for linha, (candidate_id, _) in enumerate(candidatos):
+                    self._linha_por_id[candidate_id] = linha
+                    self._adicionar_aos_buckets(candidate_id, self._hashes[linha])
+
+            self.construido = True
+            self.construido_em = time.monotonic()
+
+    def inserir(self, candidate_id: int, niveis: Dict[Hashable, int]) -> None:
+        """Insere ou atualiza um candidato (sem nenhum nível informado, ele sai do índice)"""
+        with self._lock:
+            self._garantir_colunas(niveis)
+            vetor = self._vetor(niveis)
+            if not vetor.any():
+                self.remover(candidate_id)
+                return
+
+            linha = self._linha_por_id.get(candidate_id)
+            if linha is None:
+                self._garantir_capacidade(self._total + 1)
+                linha = self._total
+                self._total += 1
+                self._linha_por_id[candidate_id] = linha
+                self._ids[linha] = candidate_id
+            else:
+                self._remover_dos_buckets(candidate_id, self._hashes[linha])
+
+            self._niveis[linha] = vetor
+            self._normas[linha] = np.linalg.norm(vetor.astype(np.float32))
+            self._hashes[linha] = self._calcular_hashes(vetor[np.newaxis, :])[0]
+            self._adicionar_aos_buckets(candidate_id, self._hashes[linha])
+
+    def remover(self, candidate_id: int) -> None:
+        with self._lock:
+            linha = self._linha_por_id.pop(candidate_id, None)
+            if linha is None:
+                return
+            self._remover_dos_buckets(candidate_id, self._hashes[linha])
+
+            # A última linha ocupa o espaço liberado (buckets guardam ids, não linhas)
+            ultima = self._total - 1
+            if linha != ultima:
+                self._niveis[linha] = self._niveis[ultima]
+                self._normas[linha] = self._normas[ultima]
+                self._ids[linha] = self._ids[ultima]
+                self._hashes[linha] = self._hashes[ultima]
+                self._linha_por_id[int(self._ids[linha])] = linha
+            self._total = ultima
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def similares(self, candidate_id: int, k: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """
+        Os k candidatos mais semelhantes (candidate_id, cosseno 0-1), do mais ao menos semelhante.
+        None se o candidato não está no índice (sem competências avaliadas).
+        """
+        with self._lock:
+            linha = self._linha_por_id.get(candidate_id)
+            if linha is None:
+                return None
+
+            # Multi-probe: bucket exato + buckets a 1 bit de distância em cada tabela
+            vizinhos: Set[int] = set()
+            for tabela, chave in enumerate(self._hashes[linha].tolist()):
+                buckets = self._buckets[tabela]
+                vizinhos.update(buckets.get(chave, ()))
+                for bit in range(self.bits):
+                    vizinhos.update(buckets.get(chave ^ (1 << bit), ()))
+            vizinhos.discard(candidate_id)
+
+            if len(vizinhos) >= k:
+                linhas = np.fromiter((self._linha_por_id[id_] for id_ in vizinhos), dtype=np.int64, count=len(vizinhos))
+            else:
+                # Poucos vizinhos no LSH: busca exata em todo o índice
+                linhas = np.arange(self._total, dtype=np.int64)
+                linhas = linhas[linhas != linha]
+            if not len(linhas):
+                return []
+
+            consulta = self._niveis[linha].astype(np.float32)
+            similaridades = (self._niveis[linhas].astype(np.float32) @ consulta) / (
+                self._normas[linhas] * self._normas[linha]
+            )
+
+            n = min(k, len(linhas))
+            melhores = np.argpartition(-similaridades, n - 1)[:n]
+            melhores = melhores[np.argsort(-similaridades[melhores], kind="stable")]
+            return [(int(self._ids[linhas[i]]), float(similaridades[i])) for i in melhores]
+
+
+# Índice do processo (construído no primeiro uso e reconstruído após o TTL)
+indice_candidatos_similares = IndiceCandidatosSimilares()
+_construcao_lock = threading.Lock()
+
+
+def reconstruir_indice(db: Session) -> int:
+    """Reconstrói o índice a partir do banco; retorna a quantidade de candidatos indexados"""
+    indice_candidatos_similares.reconstruir(carregar_niveis(db))
+    logger.info(f"Índice de candidatos semelhantes reconstruído: {len(indice_candidatos_similares)} candidatos")
+    return len(indice_candidatos_similares)
+
+
+def obter_indice_similares(db: Session) -> IndiceCandidatosSimilares:
+    """Índice pronto para consulta (reconstruído do banco quando expira)"""
+    if indice_candidatos_similares.expirado:
+        with _construcao_lock:
+            if indice_candidatos_similares.expirado:
+                reconstruir_indice(db)
+    return indice_candidatos_similares
+
+
+def atualizar_candidatos(candidate_ids: List[int]) -> None:
+    """Reindexa candidatos em sessão própria (executado no executor após o commit)"""
+    db = SessionLocal()
+    try:
+        niveis = carregar_niveis(db, candidate_ids)
+        for candidate_id in candidate_ids:
+            if candidate_id in niveis:
+                indice_candidatos_similares.inserir(candidate_id, niveis[candidate_id])
+            else:
+                indice_candidatos_similares.remover(candidate_id)
+    except Exception as e:
+        logger.error(f"Erro ao atualizar índice de candidatos semelhantes: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+
+_fila_reindexacao = FilaIds("reindexação de candidatos semelhantes", atualizar_candidatos)
+
+
+# ============================================================================
+# Inserções incrementais quando competências ou elegibilidade do candidato mudam
+# ============================================================================
+
+@event.listens_for(Session, "after_flush")
+def _registrar_candidatos_similares_alterados(session, flush_context):
+    """Guarda os candidatos cujo vetor de competências pode ter mudado no flush"""
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objeto, (AutoavaliacaoCompetencia, MapaCompetencias)) and objeto.candidate_id:
+            candidate_id = objeto.candidate_id
+        elif isinstance(objeto, Candidate) and objeto.id:
+            candidate_id = objeto.id
+        else:
+            continue
+        session.info.setdefault(CHAVE_CANDIDATOS_SIMILARES_ALTERADOS, set()).add(candidate_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _reindexar_candidatos_similares(session):
+    """Após o commit, atualiza em segundo plano os candidatos afetados (se o índice já existe)"""
+    candidate_ids = session.info.pop(CHAVE_CANDIDATOS_SIMILARES_ALTERADOS, None)
+    if not candidate_ids or not indice_candidatos_similares.construido:
+        return
+    _fila_reindexacao.agendar(candidate_ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_candidatos_similares_alterados(session, previous_transaction):
+    """Alterações desfeitas não reindexam"""
+    session.info.pop(CHAVE_CANDIDATOS_SIMILARES_ALTERADOS, None)
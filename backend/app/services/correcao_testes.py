@@ -0,0 +1,75 @@
+"""
+Correção de respostas dos testes (adaptativo, certificação e teste fixo)
+
+Usa o gabarito do banco de questões em memória
+(question_id -> alternativa correta, alternative_id -> alternativa/questão):
+corrigir uma resposta ou uma submissão inteira não faz consultas ao banco de dados.
+O gabarito é recarregado junto com o banco quando questões/alternativas são editadas:
+cada correção confere antes a versão compartilhada (banco_questoes.sincronizar), então
+uma alteração feita em outro worker vale imediatamente.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.banco_questoes import banco_questoes, QuestaoBanco, AlternativaBanco
+
+
+class RespostaCorrigida(NamedTuple):
+    questao: QuestaoBanco
+    alternativa: AlternativaBanco  # escolhida pelo candidato
+    alternativa_correta: Optional[AlternativaBanco]  # None se a questão não tem alternativa correta cadastrada
+
+    @property
+    def acertou(self) -> bool:
+        return self.alternativa.is_correct
+
+
+class CorrecaoTestes:
+    """Correção pelo gabarito em memória"""
+
+    @staticmethod
+    def corrigir_resposta(
+        db: Session,
+        question_id: int,
+        alternative_id: int
+    ) -> Tuple[Optional[RespostaCorrigida], Optional[str]]:
+        """
+        Corrige uma resposta.
+        Retorna (resposta_corrigida, mensagem_erro)
+        """
+        banco_questoes.sincronizar(db)
+        questao = banco_questoes.questao(db, question_id)
+        if not questao:
+            return None, "Questão não encontrada"
+
+        alternativa = banco_questoes.alternativa(db, alternative_id)
+        if not alternativa or alternativa.question_id != question_id:
+            return None, "Alternativa não encontrada"
+
+        return RespostaCorrigida(questao, alternativa, banco_questoes.alternativa_correta(db, question_id)), None
+
+    @staticmethod
+    def corrigir_teste(
+        db: Session,
+        test_id: int,
+        respostas: Dict[int, int]
+    ) -> Tuple[List[RespostaCorrigida], Optional[str]]:
+        """
+        Corrige a submissão de um teste fixo (question_id -> alternative_id) em O(questões).
+        Retorna (respostas_corrigidas, mensagem_erro); mensagem_erro indica resposta faltando
+        ou alternativa de outra questão.
+        """
+        banco_questoes.sincronizar(db)
+        corrigidas = []
+        for questao in banco_questoes.questoes_do_teste(db, test_id):
+            if questao.id not in respostas:
+                return [], f"Falta resposta para a questão {questao.ordem}"
+
+            alternativa = banco_questoes.alternativa(db, respostas[questao.id])
+            if not alternativa or alternativa.question_id != questao.id:
+                return [], f"Alternativa inválida para a questão {questao.ordem}"
+
+            corrigidas.append(RespostaCorrigida(questao, alternativa, banco_questoes.alternativa_correta(db, questao.id)))
+
+        return corrigidas, None
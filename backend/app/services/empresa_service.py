@@ -6,19 +6,20 @@ Implementa matching em duas etapas conforme fluxo:
 2º Match (BD CA): Usa AUTOAVALIAÇÃO como fallback (menos confiável)
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from app.models import Job, VagaCandidato, Candidate, AutoavaliacaoCompetencia, CandidatoTeste, VagaRequisito
+from sqlalchemy import and_, or_, func
+from app.models import Job, VagaCandidato, Candidate, VagaRequisito
 from app.models.candidato_teste import StatusKanbanCandidato
-from app.models.competencia import MapaCompetencias, CertificacaoCompetencia
+from app.models.competencia import CertificacaoCompetencia
+from app.services.matching_engine import TIPO_MATCH_CERTIFICADO
+from app.services.matching_service import MatchingService
+from app.services.similaridade_textual import obter_indice
 import hashlib
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 
-# Constantes para cálculo de score de matching
-PESO_CERTIFICACAO = 3  # Certificação vale 3x mais que autoavaliação
-PESO_AUTOAVALIACAO = 1
-BONUS_TESTES_COMPLETOS = 10  # Bonus por ter testes realizados
+# Candidatos por consulta ao buscar os vínculos da listagem (limite de parâmetros do IN)
+TAMANHO_LOTE_VINCULOS = 5000
 
 
 class EmpresaService:
@@ -38,184 +39,55 @@ class EmpresaService:
         Returns:
             Tupla (lista_candidatos_anonimos, quantidade_excluida_por_filtros)
         """
-        vaga = db.query(Job).filter(Job.id == vaga_id).first()
-        if not vaga:
-            raise ValueError("Vaga não encontrada")
-        
-        # Buscar requisitos da vaga
-        requisitos = db.query(VagaRequisito).filter(VagaRequisito.vaga_id == vaga_id).all()
-        requisitos_map = {req.competencia_id: req for req in requisitos}
-        competencias_requeridas = [req.competencia_id for req in requisitos if req.competencia_id]
-        
-        # Buscar candidatos que têm a área de atuação da vaga
-        candidatos_area = db.query(Candidate).filter(
-            Candidate.area_atuacao == vaga.area_atuacao,
-            Candidate.onboarding_completo == True
-        ).all()
-        
-        if not candidatos_area:
-            return [], 0
-        
-        candidate_ids = [c.id for c in candidatos_area]
-        
-        # ====== CARREGAR DADOS DE MATCHING ======
-        
-        # 1. Carregar MapaCompetencias (contém certificação + autoavaliação unificados)
-        mapa_competencias = db.query(MapaCompetencias).filter(
-            MapaCompetencias.candidate_id.in_(candidate_ids)
-        ).all()
-        
-        # Organizar mapa por (candidate_id, competencia_nome)
-        mapa_por_candidato = {}
-        for mapa in mapa_competencias:
-            if mapa.candidate_id not in mapa_por_candidato:
-                mapa_por_candidato[mapa.candidate_id] = {}
-            mapa_por_candidato[mapa.candidate_id][mapa.competencia_nome.lower()] = {
-                'certificado': mapa.nivel_certificado,
-                'autoavaliacao': mapa.nivel_autoavaliacao,
-                'confiabilidade': mapa.confiabilidade,
-                'competencia_id': mapa.competencia_id
-            }
-        
-        # 2. Carregar AutoavaliacaoCompetencia (fallback)
-        autoavaliacoes = db.query(AutoavaliacaoCompetencia).filter(
-            AutoavaliacaoCompetencia.candidate_id.in_(candidate_ids)
-        ).all()
+        # ====== SCORES MATERIALIZADOS (vaga_match_scores) ======
         
-        autoavaliacao_map = {}
-        for auto in autoavaliacoes:
-            key = (auto.candidate_id, auto.competencia_id)
-            autoavaliacao_map[key] = int(auto.nivel_declarado)
+        ranking, candidatos_excluidos = MatchingService.obter_ranking(db, vaga_id)
         
-        # 3. Carregar testes completos
-        testes_completos = db.query(CandidatoTeste).filter(
-            CandidatoTeste.candidate_id.in_(candidate_ids),
-            CandidatoTeste.status == "concluido"
-        ).all()
+        if not ranking:
+            return [], candidatos_excluidos
         
-        testes_map = {}
-        for teste in testes_completos:
-            testes_map[teste.candidate_id] = testes_map.get(teste.candidate_id, 0) + 1
+        vaga_candidato_map = EmpresaService._vinculos(db, vaga_id, [score['candidate_id'] for score in ranking])
         
-        # 4. Carregar VagaCandidatos existentes
-        vaga_candidatos_existentes = db.query(VagaCandidato).filter(
-            VagaCandidato.vaga_id == vaga_id
-        ).all()
-        vaga_candidato_map = {vc.candidate_id: vc for vc in vaga_candidatos_existentes}
+        # Sinal extra: similaridade TF-IDF entre o texto da vaga e o perfil (não altera a ordem)
+        similaridades = {}
+        indice = obter_indice()
+        vaga = db.query(Job).filter(Job.id == vaga_id).first()
+        if indice is not None and vaga is not None:
+            similaridades = indice.similaridades_vaga_candidatos(
+                db, vaga, [score['candidate_id'] for score in ranking]
+            )
         
-        # ====== PROCESSAR MATCHING ======
+        # ====== MONTAR RESULTADO ======
         
         candidatos_certificados = []  # 1º Match - BD CC
         candidatos_autoavaliados = []  # 2º Match - BD CA
-        candidatos_excluidos = 0
-        novos_vaga_candidatos = []
-        
-        for candidato in candidatos_area:
-            # Calcular score de matching
-            score_certificacao = 0
-            score_autoavaliacao = 0
-            competencias_atendidas_cert = 0
-            competencias_atendidas_auto = 0
-            competencias_faltando = []
-            atende_minimo = True
-            
-            mapa_candidato = mapa_por_candidato.get(candidato.id, {})
-            
-            for requisito in requisitos:
-                nivel_requerido = int(requisito.nivel_minimo) if requisito.nivel_minimo else 0
-                competencia_nome = requisito.competencia.nome.lower() if requisito.competencia else ""
-                
-                # Tentar obter nível do mapa (certificação prioritária)
-                dados_mapa = mapa_candidato.get(competencia_nome, {})
-                nivel_certificado = dados_mapa.get('certificado')
-                nivel_auto = dados_mapa.get('autoavaliacao')
-                
-                # Fallback para autoavaliação direta se não no mapa
-                if nivel_auto is None and requisito.competencia_id:
-                    nivel_auto = autoavaliacao_map.get((candidato.id, requisito.competencia_id))
-                
-                # Lógica de matching prioritizado
-                if nivel_certificado is not None:
-                    # 1º MATCH: Candidato tem CERTIFICAÇÃO
-                    if nivel_certificado >= nivel_requerido:
-                        score_certificacao += nivel_certificado * PESO_CERTIFICACAO
-                        competencias_atendidas_cert += 1
-                    else:
-                        # Não atende requisito mínimo
-                        atende_minimo = False
-                        competencias_faltando.append({
-                            'competencia': competencia_nome,
-                            'requerido': nivel_requerido,
-                            'candidato_cert': nivel_certificado
-                        })
-                        
-                elif nivel_auto is not None:
-                    # 2º MATCH: Candidato tem apenas AUTOAVALIAÇÃO
-                    if nivel_auto >= nivel_requerido:
-                        score_autoavaliacao += nivel_auto * PESO_AUTOAVALIACAO
-                        competencias_atendidas_auto += 1
-                    else:
-                        # Não atende requisito mínimo
-                        atende_minimo = False
-                        competencias_faltando.append({
-                            'competencia': competencia_nome,
-                            'requerido': nivel_requerido,
-                            'candidato_auto': nivel_auto
-                        })
-                else:
-                    # Candidato não tem avaliação nesta competência
-                    atende_minimo = False
-                    competencias_faltando.append({
-                        'competencia': competencia_nome,
-                        'requerido': nivel_requerido,
-                        'candidato': None
-                    })
-            
-            # Verificar se atende requisitos mínimos
-            if not atende_minimo:
-                candidatos_excluidos += 1
-                continue
-            
-            # Calcular score total
-            score_total = score_certificacao + score_autoavaliacao
-            testes_realizados = testes_map.get(candidato.id, 0)
-            
-            if testes_realizados > 0:
-                score_total += BONUS_TESTES_COMPLETOS
-            
-            # Criar ou obter VagaCandidato
-            vaga_candidato = vaga_candidato_map.get(candidato.id)
-            
-            if not vaga_candidato:
-                status_kanban = StatusKanbanCandidato.TESTES_NAO_REALIZADOS
-                if testes_realizados > 0:
-                    status_kanban = StatusKanbanCandidato.TESTES_REALIZADOS
-                
-                vaga_candidato = VagaCandidato(
-                    vaga_id=vaga_id,
-                    candidate_id=candidato.id,
-                    status_kanban=status_kanban,
-                    excluido_por_filtros=False
-                )
-                novos_vaga_candidatos.append(vaga_candidato)
-                vaga_candidato_map[candidato.id] = vaga_candidato
+        
+        for score in ranking:
+            candidate_id = score['candidate_id']
+            testes_realizados = score['testes_realizados']
+            vaga_candidato_id, status_kanban, consentimento = EmpresaService._dados_vinculo(
+                vaga_candidato_map.get(candidate_id), testes_realizados
+            )
             
             # Determinar tipo de match
-            is_certificado = competencias_atendidas_cert > 0
+            is_certificado = score['tipo_match'] == TIPO_MATCH_CERTIFICADO
             
             candidato_dados = {
-                'candidate_id': candidato.id,
-                'vaga_candidato_id': vaga_candidato.id,
-                'status_kanban': vaga_candidato.status_kanban.value,
+                'candidate_id': candidate_id,
+                'vaga_candidato_id': vaga_candidato_id,
+                'status_kanban': status_kanban,
                 'testes_realizados': testes_realizados,
-                'consentimento_entrevista': vaga_candidato.consentimento_entrevista,
-                'score_total': score_total,
-                'score_certificacao': score_certificacao,
-                'score_autoavaliacao': score_autoavaliacao,
-                'competencias_certificadas': competencias_atendidas_cert,
-                'competencias_autoavaliadas': competencias_atendidas_auto,
-                'tipo_match': '1º Match (Certificado)' if is_certificado else '2º Match (Autoavaliação)',
-                'confiabilidade': 'alta' if is_certificado else 'media'
+                'consentimento_entrevista': consentimento,
+                'score_total': score['score_total'],
+                'score_certificacao': score['score_certificacao'],
+                'score_autoavaliacao': score['score_autoavaliacao'],
+                'competencias_certificadas': score['competencias_certificadas'],
+                'competencias_autoavaliadas': score['competencias_autoavaliadas'],
+                'tipo_match': score['tipo_match'],
+                'confiabilidade': 'alta' if is_certificado else 'media',
+                'similaridade_textual': (
+                    round(similaridades[candidate_id] * 100, 1) if candidate_id in similaridades else None
+                )
             }
             
             if is_certificado:
@@ -223,20 +95,47 @@ class EmpresaService:
             else:
                 candidatos_autoavaliados.append(candidato_dados)
         
-        # Adicionar novos VagaCandidatos
-        if novos_vaga_candidatos:
-            db.add_all(novos_vaga_candidatos)
-            db.commit()
-        
-        # Ordenar cada grupo por score (maior primeiro)
-        candidatos_certificados.sort(key=lambda x: x['score_total'], reverse=True)
-        candidatos_autoavaliados.sort(key=lambda x: x['score_total'], reverse=True)
-        
-        # RESULTADO: 1º Match (certificados) + 2º Match (autoavaliados)
+        # RESULTADO: 1º Match (certificados) + 2º Match (autoavaliados), já ordenados por score
         resultado_final = candidatos_certificados + candidatos_autoavaliados
         
         return resultado_final, candidatos_excluidos
     
+    @staticmethod
+    def _vinculos(db: Session, vaga_id: int, candidate_ids: List[int]) -> Dict[int, tuple]:
+        """
+        (id, status_kanban, consentimento_entrevista) do VagaCandidato de cada candidato listado.
+        Somente leitura: os vínculos são criados na materialização da vaga (publicação ou
+        python -m app.migrations.materializar_vagas_abertas). Se faltar algum, a
+        materialização é agendada em segundo plano e a listagem segue sem ele.
+        """
+        vaga_candidato_map = {}
+        for inicio in range(0, len(candidate_ids), TAMANHO_LOTE_VINCULOS):
+            vaga_candidato_map.update({
+                candidate_id: (vaga_candidato_id, status_kanban, consentimento)
+                for candidate_id, vaga_candidato_id, status_kanban, consentimento in db.query(
+                    VagaCandidato.candidate_id,
+                    VagaCandidato.id,
+                    VagaCandidato.status_kanban,
+                    VagaCandidato.consentimento_entrevista
+                ).filter(
+                    VagaCandidato.vaga_id == vaga_id,
+                    VagaCandidato.candidate_id.in_(candidate_ids[inicio:inicio + TAMANHO_LOTE_VINCULOS])
+                )
+            })
+        
+        if len(vaga_candidato_map) < len(candidate_ids):
+            MatchingService.agendar_materializacao(vaga_id)
+        
+        return vaga_candidato_map
+    
+    @staticmethod
+    def _dados_vinculo(vinculo: Optional[tuple], testes_realizados: int) -> Tuple[Optional[int], str, bool]:
+        """(vaga_candidato_id, status_kanban, consentimento); sem vínculo ainda, o estado inicial"""
+        if vinculo is None:
+            return None, MatchingService.status_kanban_inicial(testes_realizados).value, False
+        vaga_candidato_id, status_kanban, consentimento = vinculo
+        return vaga_candidato_id, status_kanban.value, consentimento
+    
     @staticmethod
     def obter_candidatos_para_vaga(db: Session, vaga_id: int) -> Tuple[List[dict], int]:
         """
@@ -254,89 +153,38 @@ class EmpresaService:
         # Buscar requisitos da vaga (opcional)
         requisitos = db.query(VagaRequisito).filter(VagaRequisito.vaga_id == vaga_id).all()
         
-        # Buscar candidatos que têm a área de atuação da vaga
-        candidatos_area = db.query(Candidate).filter(
+        filtros_area = [
             Candidate.area_atuacao == vaga.area_atuacao,
             Candidate.onboarding_completo == True
-        ).all()
-        
-        # Carregar TODAS as autoavaliações e testes de uma vez
-        todas_autoavaliacao = db.query(AutoavaliacaoCompetencia).all()
-        todos_testes = db.query(CandidatoTeste).filter(CandidatoTeste.status == "concluido").all()
+        ]
         
-        # Organizar em dicionários para acesso O(1)
-        autoavaliacao_map = {}
-        for auto in todas_autoavaliacao:
-            key = (auto.candidate_id, auto.competencia_id)
-            autoavaliacao_map[key] = int(auto.nivel_declarado)
+        # Candidatos da área que atendem TODOS os requisitos (verificação feita no banco)
+        candidatos_aprovados = MatchingService.consulta_compatibilidade(
+            db, vaga_id, requisitos, 1.0, filtros_area
+        ).order_by(Candidate.id).all()
         
-        testes_completos_map = {}
-        for teste in todos_testes:
-            testes_completos_map[teste.candidate_id] = testes_completos_map.get(teste.candidate_id, 0) + 1
+        total_area = db.query(func.count(Candidate.id)).filter(*filtros_area).scalar()
+        candidatos_excluidos = total_area - len(candidatos_aprovados)
         
-        # Buscar registros VagaCandidato que já existem
-        vaga_candidatos_existentes = db.query(VagaCandidato).filter(
-            VagaCandidato.vaga_id == vaga_id
-        ).all()
-        vaga_candidato_map = {
-            vc.candidate_id: vc for vc in vaga_candidatos_existentes
-        }
+        vaga_candidato_map = EmpresaService._vinculos(
+            db, vaga_id, [candidate_id for candidate_id, _, _ in candidatos_aprovados]
+        )
         
         candidatos_válidos = []
-        candidatos_excluidos = 0
-        novos_vaga_candidatos = []
         
-        for candidato in candidatos_area:
-            # Verificar se atende os requisitos mínimos
-            atende_requisitos = True
-            
-            for requisito in requisitos:
-                nivel_requerido = int(requisito.nivel_minimo)
-                nivel_candidato = autoavaliacao_map.get((candidato.id, requisito.competencia_id), 0)
-                
-                if nivel_candidato < nivel_requerido:
-                    atende_requisitos = False
-                    break
-            
-            if not atende_requisitos:
-                candidatos_excluidos += 1
-                continue
-            
-            # Se passou nos filtros, criar registro de VagaCandidato se não existir
-            vaga_candidato = vaga_candidato_map.get(candidato.id)
-            
-            if not vaga_candidato:
-                # Verificar quantos testes completou
-                testes_completos = testes_completos_map.get(candidato.id, 0)
-                
-                # Definir status inicial no kanban
-                status_kanban = StatusKanbanCandidato.TESTES_NAO_REALIZADOS
-                if testes_completos > 0:
-                    status_kanban = StatusKanbanCandidato.TESTES_REALIZADOS
-                
-                vaga_candidato = VagaCandidato(
-                    vaga_id=vaga_id,
-                    candidate_id=candidato.id,
-                    status_kanban=status_kanban,
-                    excluido_por_filtros=False
-                )
-                novos_vaga_candidatos.append(vaga_candidato)
-                vaga_candidato_map[candidato.id] = vaga_candidato
+        for candidate_id, _, testes_completos in candidatos_aprovados:
+            vaga_candidato_id, status_kanban, consentimento = EmpresaService._dados_vinculo(
+                vaga_candidato_map.get(candidate_id), testes_completos
+            )
             
-            testes_completos = testes_completos_map.get(candidato.id, 0)
             candidatos_válidos.append({
-                'candidate_id': candidato.id,
-                'vaga_candidato_id': vaga_candidato.id,
-                'status_kanban': vaga_candidato.status_kanban.value,
+                'candidate_id': candidate_id,
+                'vaga_candidato_id': vaga_candidato_id,
+                'status_kanban': status_kanban,
                 'testes_realizados': testes_completos,
-                'consentimento_entrevista': vaga_candidato.consentimento_entrevista
+                'consentimento_entrevista': consentimento
             })
         
-        # Adicionar todos os novos registros de uma vez
-        if novos_vaga_candidatos:
-            db.add_all(novos_vaga_candidatos)
-            db.commit()
-        
         # Ordenar: primeiro os que fizeram testes
         candidatos_válidos.sort(
             key=lambda x: (not x['testes_realizados'], x['status_kanban']),
@@ -354,12 +202,16 @@ class EmpresaService:
     @staticmethod
     def demonstrar_interesse(db: Session, vaga_id: int, candidate_id: int) -> VagaCandidato:
         """Empresa demonstra interesse em um candidato"""
-        vaga_candidato = db.query(VagaCandidato).filter(
-            and_(
-                VagaCandidato.vaga_id == vaga_id,
-                VagaCandidato.candidate_id == candidate_id
-            )
-        ).first()
+        filtro_vinculo = and_(
+            VagaCandidato.vaga_id == vaga_id,
+            VagaCandidato.candidate_id == candidate_id
+        )
+        vaga_candidato = db.query(VagaCandidato).filter(filtro_vinculo).first()
+        
+        if not vaga_candidato and not MatchingService.vaga_materializada(db, vaga_id):
+            # Vaga publicada antes da materialização do matching: materializar agora
+            MatchingService.recalcular_vaga(db, vaga_id)
+            vaga_candidato = db.query(VagaCandidato).filter(filtro_vinculo).first()
         
         if not vaga_candidato:
             raise ValueError("Candidato não está vinculado a esta vaga")
@@ -0,0 +1,335 @@
+"""
+Motor vetorizado de matching (candidatos x requisitos da vaga)
+
+Monta matrizes densas de níveis certificados e autoavaliados
+(linhas = candidatos, colunas = requisitos da vaga) e calcula atende_minimo,
+score_certificacao e score_autoavaliacao de todos os candidatos com poucas
+operações de array, preservando as regras do matching prioritizado:
+
+- Certificação (BD CC) tem prioridade sobre autoavaliação (BD CA)
+- A autoavaliação vem do MapaCompetencias e, na falta dele, de AutoavaliacaoCompetencia
+- Qualquer requisito não atendido (ou sem avaliação) exclui o candidato
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models import Candidate, AutoavaliacaoCompetencia, CandidatoTeste, VagaRequisito
+from app.models.competencia import MapaCompetencias
+from typing import Callable, List, Dict, Optional, Tuple
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+
+
+# Constantes para cálculo de score de matching
+PESO_CERTIFICACAO = 3  # Certificação vale 3x mais que autoavaliação
+PESO_AUTOAVALIACAO = 1
+BONUS_TESTES_COMPLETOS = 10  # Bonus por ter testes realizados
+
+TIPO_MATCH_CERTIFICADO = '1º Match (Certificado)'
+TIPO_MATCH_AUTOAVALIACAO = '2º Match (Autoavaliação)'
+
+# Marcador de "sem nível" nas matrizes (níveis válidos são 0-4)
+SEM_NIVEL = -1
+
+# Maior candidate_id para indexar linhas por tabela densa (8 bytes por id)
+MAX_TABELA_DENSA_IDS = 20_000_000
+
+
+class ResultadoMatching:
+    """Scores calculados para cada candidato (arrays alinhados com candidate_ids)"""
+
+    def __init__(
+        self,
+        candidate_ids: np.ndarray,
+        atende_minimo: np.ndarray,
+        score_certificacao: np.ndarray,
+        score_autoavaliacao: np.ndarray,
+        competencias_certificadas: np.ndarray,
+        competencias_autoavaliadas: np.ndarray,
+        testes_realizados: np.ndarray
+    ):
+        self.candidate_ids = candidate_ids
+        self.atende_minimo = atende_minimo
+        self.score_certificacao = score_certificacao
+        self.score_autoavaliacao = score_autoavaliacao
+        self.competencias_certificadas = competencias_certificadas
+        self.competencias_autoavaliadas = competencias_autoavaliadas
+        self.testes_realizados = testes_realizados
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+    def linha(self, indice: int) -> dict:
+        """Score de um candidato com score_total e tipo de match já resolvidos"""
+        score_certificacao = int(self.score_certificacao[indice])
+        score_autoavaliacao = int(self.score_autoavaliacao[indice])
+        competencias_certificadas = int(self.competencias_certificadas[indice])
+        testes_realizados = int(self.testes_realizados[indice])
+
+        score_total = score_certificacao + score_autoavaliacao
+        if testes_realizados > 0:
+            score_total += BONUS_TESTES_COMPLETOS
+
+        return {
+            'candidate_id': int(self.candidate_ids[indice]),
+            'atende_minimo': bool(self.atende_minimo[indice]),
+            'tipo_match': TIPO_MATCH_CERTIFICADO if competencias_certificadas > 0 else TIPO_MATCH_AUTOAVALIACAO,
+            'score_total': score_total,
+            'score_certificacao': score_certificacao,
+            'score_autoavaliacao': score_autoavaliacao,
+            'competencias_certificadas': competencias_certificadas,
+            'competencias_autoavaliadas': int(self.competencias_autoavaliadas[indice]),
+            'testes_realizados': testes_realizados
+        }
+
+
+class MotorMatching:
+    """Calcula o matching prioritizado de uma vaga para vários candidatos de uma vez"""
+
+    def __init__(self, requisitos: List[VagaRequisito]):
+        self.requisitos = requisitos
+        self.niveis_requeridos = np.array(
+            [int(req.nivel_minimo) if req.nivel_minimo else 0 for req in requisitos],
+            dtype=np.int16
+        )
+        # Colunas da matriz indexadas pelo nome (MapaCompetencias) e pelo id (AutoavaliacaoCompetencia)
+        self.colunas_por_nome: Dict[str, List[int]] = {}
+        self.colunas_por_competencia: Dict[int, List[int]] = {}
+        for coluna, req in enumerate(requisitos):
+            nome = req.competencia.nome.lower() if req.competencia else ""
+            self.colunas_por_nome.setdefault(nome, []).append(coluna)
+            if req.competencia_id:
+                self.colunas_por_competencia.setdefault(req.competencia_id, []).append(coluna)
+
+    @staticmethod
+    def calcular_scores(
+        niveis_certificados: np.ndarray,
+        niveis_autoavaliacao: np.ndarray,
+        niveis_requeridos: np.ndarray,
+        peso_certificacao: int,
+        peso_autoavaliacao: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aplica as regras de matching sobre as matrizes (candidatos x requisitos).
+
+        Returns:
+            Tupla (atende_minimo, score_certificacao, score_autoavaliacao,
+                   competencias_certificadas, competencias_autoavaliadas)
+        """
+        requerido = niveis_requeridos[np.newaxis, :]
+
+        tem_certificacao = niveis_certificados != SEM_NIVEL
+        # Autoavaliação só é considerada quando não há certificação
+        usa_autoavaliacao = ~tem_certificacao & (niveis_autoavaliacao != SEM_NIVEL)
+
+        atende_certificacao = tem_certificacao & (niveis_certificados >= requerido)
+        atende_autoavaliacao = usa_autoavaliacao & (niveis_autoavaliacao >= requerido)
+
+        atende_minimo = (atende_certificacao | atende_autoavaliacao).all(axis=1)
+
+        score_certificacao = np.where(atende_certificacao, niveis_certificados, 0).sum(axis=1) * peso_certificacao
+        score_autoavaliacao = np.where(atende_autoavaliacao, niveis_autoavaliacao, 0).sum(axis=1) * peso_autoavaliacao
+
+        return (
+            atende_minimo,
+            score_certificacao,
+            score_autoavaliacao,
+            atende_certificacao.sum(axis=1),
+            atende_autoavaliacao.sum(axis=1)
+        )
+
+    @staticmethod
+    def indexador_linhas(ids: np.ndarray) -> Callable[[np.ndarray], np.ndarray]:
+        """
+        Função que converte candidate_ids (todos presentes em ids) em índices de linha da matriz.
+        ids são chaves primárias sequenciais: uma tabela densa id -> linha resolve por
+        acesso direto; ids muito esparsos usam busca binária sobre os ids ordenados.
+        """
+        maior_id = int(ids.max()) if len(ids) else 0
+        if maior_id <= MAX_TABELA_DENSA_IDS:
+            linha_por_id = np.zeros(maior_id + 1, dtype=np.int64)
+            linha_por_id[ids] = np.arange(len(ids))
+            return linha_por_id.__getitem__
+
+        ordem = np.argsort(ids, kind="stable")
+        ids_ordenados = ids[ordem]
+        return lambda candidatos: ordem[np.searchsorted(ids_ordenados, candidatos)]
+
+    def montar_niveis(
+        self,
+        ids: np.ndarray,
+        linhas_auto: List[Tuple[int, int, object]],
+        linhas_mapa: List[Tuple[int, str, Optional[int], Optional[int]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Monta as matrizes (candidatos x requisitos) de níveis certificados e autoavaliados.
+
+        Args:
+            ids: candidate_ids (linhas da matriz)
+            linhas_auto: (candidate_id, competencia_id, nivel_declarado) de AutoavaliacaoCompetencia;
+                calcular já as filtra no banco pelas competências da vaga
+            linhas_mapa: (candidate_id, competencia_nome, nivel_certificado, nivel_autoavaliacao)
+                de MapaCompetencias
+
+        Returns:
+            Tupla (niveis_certificados, niveis_autoavaliacao), SEM_NIVEL onde não há nível
+        """
+        total_candidatos = len(ids)
+        total_requisitos = len(self.requisitos)
+        niveis_certificados = np.full((total_candidatos, total_requisitos), SEM_NIVEL, dtype=np.int16)
+        niveis_autoavaliacao = np.full((total_candidatos, total_requisitos), SEM_NIVEL, dtype=np.int16)
+        if total_candidatos == 0 or total_requisitos == 0:
+            return niveis_certificados, niveis_autoavaliacao
+
+        _linhas = MotorMatching.indexador_linhas(ids)
+
+        # Autoavaliação direta (fallback) por competencia_id
+        if linhas_auto and self.colunas_por_competencia:
+            # Três colunas inteiras (nivel_declarado é Integer): uma única conversão para array
+            total = len(linhas_auto)
+            dados = np.fromiter(chain.from_iterable(linhas_auto), dtype=np.int64, count=3 * total).reshape(total, 3)
+            linhas = _linhas(dados[:, 0])
+            competencias = dados[:, 1]
+            niveis = dados[:, 2].astype(np.int16)
+            for competencia_id, colunas in self.colunas_por_competencia.items():
+                mascara = competencias == competencia_id
+                for coluna in colunas:
+                    niveis_autoavaliacao[linhas[mascara], coluna] = niveis[mascara]
+
+        # MapaCompetencias por nome da competência
+        if linhas_mapa:
+            nomes_vaga = list(self.colunas_por_nome)
+            posicao_nome = {nome: posicao for posicao, nome in enumerate(nomes_vaga)}
+            total = len(linhas_mapa)
+            # lower() uma vez por nome distinto, não por linha
+            nomes = list(map(itemgetter(1), linhas_mapa))
+            posicao_bruta = {nome: posicao_nome.get(nome.lower(), -1) for nome in set(nomes)}
+            grupos = np.fromiter(map(posicao_bruta.__getitem__, nomes), dtype=np.int64, count=total)
+            dentro = grupos >= 0
+            linhas = _linhas(np.fromiter(map(itemgetter(0), linhas_mapa), dtype=np.int64, count=total)[dentro])
+            grupos = grupos[dentro]
+            # None -> NaN -> SEM_NIVEL
+            certificados = np.fromiter(map(itemgetter(2), linhas_mapa), dtype=np.float64, count=total)[dentro]
+            autoavaliados = np.fromiter(map(itemgetter(3), linhas_mapa), dtype=np.float64, count=total)[dentro]
+            certificados = np.where(np.isnan(certificados), SEM_NIVEL, certificados).astype(np.int16)
+            autoavaliados = np.where(np.isnan(autoavaliados), SEM_NIVEL, autoavaliados).astype(np.int16)
+
+            # Mesmo critério do dicionário por (candidato, nome): a última linha prevalece
+            chaves = linhas * len(nomes_vaga) + grupos
+            _, ultimas = np.unique(chaves[::-1], return_index=True)
+            ultimas = len(chaves) - 1 - ultimas
+            linhas, grupos = linhas[ultimas], grupos[ultimas]
+            certificados, autoavaliados = certificados[ultimas], autoavaliados[ultimas]
+
+            for posicao, nome in enumerate(nomes_vaga):
+                do_grupo = grupos == posicao
+                com_certificado = do_grupo & (certificados != SEM_NIVEL)
+                com_autoavaliacao = do_grupo & (autoavaliados != SEM_NIVEL)
+                for coluna in self.colunas_por_nome[nome]:
+                    niveis_certificados[linhas[com_certificado], coluna] = certificados[com_certificado]
+                    niveis_autoavaliacao[linhas[com_autoavaliacao], coluna] = autoavaliados[com_autoavaliacao]
+
+        return niveis_certificados, niveis_autoavaliacao
+
+    def calcular(
+        self,
+        db: Session,
+        area_atuacao: Optional[str],
+        peso_certificacao: int = PESO_CERTIFICACAO,
+        peso_autoavaliacao: int = PESO_AUTOAVALIACAO,
+        candidate_ids: Optional[List[int]] = None
+    ) -> ResultadoMatching:
+        """
+        Carrega os níveis dos candidatos da área (onboarding completo) e calcula o matching.
+
+        Args:
+            candidate_ids: Restringe o cálculo a estes candidatos (atualizações incrementais)
+        """
+        filtro_candidatos = [
+            Candidate.area_atuacao == area_atuacao,
+            Candidate.onboarding_completo == True
+        ]
+        if candidate_ids is not None:
+            filtro_candidatos.append(Candidate.id.in_(candidate_ids))
+
+        ids = np.array(
+            [row[0] for row in db.query(Candidate.id).filter(*filtro_candidatos).all()],
+            dtype=np.int64
+        )
+        total_candidatos = len(ids)
+        total_requisitos = len(self.requisitos)
+
+        testes_realizados = np.zeros(total_candidatos, dtype=np.int32)
+
+        if total_candidatos == 0:
+            vazio = np.zeros(0, dtype=np.int32)
+            return ResultadoMatching(ids, np.zeros(0, dtype=bool), vazio, vazio, vazio, vazio, testes_realizados)
+
+        _linhas = MotorMatching.indexador_linhas(ids)
+
+        # 1. Autoavaliação direta (fallback) por competencia_id
+        linhas_auto = []
+        if self.colunas_por_competencia and total_requisitos:
+            linhas_auto = db.query(
+                AutoavaliacaoCompetencia.candidate_id,
+                AutoavaliacaoCompetencia.competencia_id,
+                AutoavaliacaoCompetencia.nivel_declarado
+            ).join(
+                Candidate, Candidate.id == AutoavaliacaoCompetencia.candidate_id
+            ).filter(
+                *filtro_candidatos,
+                AutoavaliacaoCompetencia.competencia_id.in_(list(self.colunas_por_competencia.keys()))
+            ).all()
+
+        # 2. MapaCompetencias (certificação + autoavaliação consolidadas) por nome da competência
+        linhas_mapa = []
+        if total_requisitos:
+            linhas_mapa = db.query(
+                MapaCompetencias.candidate_id,
+                MapaCompetencias.competencia_nome,
+                MapaCompetencias.nivel_certificado,
+                MapaCompetencias.nivel_autoavaliacao
+            ).join(
+                Candidate, Candidate.id == MapaCompetencias.candidate_id
+            ).filter(*filtro_candidatos).all()
+
+        niveis_certificados, niveis_autoavaliacao = self.montar_niveis(ids, linhas_auto, linhas_mapa)
+
+        # 3. Testes concluídos por candidato
+        contagem_testes = db.query(
+            CandidatoTeste.candidate_id,
+            func.count(CandidatoTeste.id)
+        ).join(
+            Candidate, Candidate.id == CandidatoTeste.candidate_id
+        ).filter(
+            *filtro_candidatos,
+            CandidatoTeste.status == "concluido"
+        ).group_by(CandidatoTeste.candidate_id).all()
+
+        if contagem_testes:
+            dados = np.array(contagem_testes, dtype=np.int64)
+            testes_realizados[_linhas(dados[:, 0])] = dados[:, 1]
+
+        (
+            atende_minimo,
+            score_certificacao,
+            score_autoavaliacao,
+            competencias_certificadas,
+            competencias_autoavaliadas
+        ) = self.calcular_scores(
+            niveis_certificados,
+            niveis_autoavaliacao,
+            self.niveis_requeridos,
+            peso_certificacao,
+            peso_autoavaliacao
+        )
+
+        return ResultadoMatching(
+            ids,
+            atende_minimo,
+            score_certificacao,
+            score_autoavaliacao,
+            competencias_certificadas,
+            competencias_autoavaliadas,
+            testes_realizados
+        )
@@ -0,0 +1,687 @@
+"""
+Serviço de matching vaga x candidato apoiado em índices do banco
+
+A verificação por compatibilidade (requisitos atendidos / total) é feita
+inteiramente no banco: JOIN de vaga_requisitos com autoavaliacao_competencias,
+GROUP BY por candidato, HAVING pelo mínimo e ORDER BY/LIMIT, de forma que
+apenas a página pedida sai do Postgres. O índice invertido
+ix_autoavaliacao_competencias_competencia_nivel
+(competencia_id -> nivel_declarado -> candidate_id) atende o JOIN por faixa.
+
+Os scores do matching prioritizado ficam materializados em vaga_match_scores:
+recálculo completo na publicação da vaga e atualização incremental quando
+autoavaliações ou certificações de um candidato mudam. Na mesma etapa os
+candidatos que atendem à vaga ganham seu VagaCandidato (INSERT ... ON CONFLICT
+DO NOTHING), de modo que os endpoints de leitura não escrevem no banco.
+
+O recálculo completo roda em segundo plano (publicação da vaga ou mudança de
+VagaRequisito de vaga aberta) e registra progresso em matching_execucoes. Mudanças
+de requisitos e de candidatos usam o executor compartilhado (app.core.segundo_plano).
+"""
+from sqlalchemy.orm import Session, Query, joinedload
+from sqlalchemy import and_, or_, exists, func, cast, Integer, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.database import SessionLocal
+from app.core.segundo_plano import executor as _executor
+from app.models import (
+    Job, Candidate, Competencia, AutoavaliacaoCompetencia, CandidatoTeste, VagaCandidato, VagaRequisito, VagaMatchScore,
+    MatchingExecucao, StatusMatchingExecucao, HistoricoEstadoPipeline
+)
+from app.models.job import JobStatus
+from app.models.candidato_teste import StatusTesteCandidato, StatusKanbanCandidato
+from app.services.matching_engine import MotorMatching, ResultadoMatching
+from typing import List, Dict, Optional, Set, Tuple, Callable
+from datetime import datetime
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Quantidade de linhas por INSERT em lote
+TAMANHO_LOTE = 1000
+
+# Colunas de vaga_match_scores atualizadas no upsert
+COLUNAS_SCORE = (
+    'atende_minimo', 'tipo_match', 'score_total', 'score_certificacao', 'score_autoavaliacao',
+    'competencias_certificadas', 'competencias_autoavaliadas', 'testes_realizados'
+)
+
+# Chave em Session.info com as vagas cujos requisitos mudaram na transação
+CHAVE_REQUISITOS_ALTERADOS = "matching_vagas_requisitos_alterados"
+
+# Colunas do kanban em que o vínculo ainda não teve ação da empresa nem do candidato:
+# vínculo nesses estados é removido quando o candidato deixa de atender à vaga
+ESTADOS_INICIAIS_KANBAN = (
+    StatusKanbanCandidato.AVALIACAO_COMPETENCIAS,
+    StatusKanbanCandidato.TESTES_REALIZADOS,
+    StatusKanbanCandidato.TESTES_NAO_REALIZADOS
+)
+
+# Matching em segundo plano no executor compartilhado (no máximo MATCHING_MAX_WORKERS
+# execuções simultâneas por processo). Cada candidato tem no máximo uma atualização na fila.
+_pendentes_lock = threading.Lock()
+# candidate_id -> competências alteradas acumuladas (None = todas as vagas da área)
+_candidatos_pendentes: Dict[int, Optional[Set[int]]] = {}
+# vaga_id -> motivo do recálculo na fila (ainda não iniciado)
+_vagas_pendentes: Dict[int, str] = {}
+
+MOTIVO_REQUISITOS_ALTERADOS = "requisitos_alterados"
+# Vaga publicada antes de vaga_match_scores: só recalcula se ainda não estiver materializada
+MOTIVO_MATERIALIZACAO = "materializacao"
+
+
+class MatchingService:
+    """Consultas de matching e manutenção dos scores materializados"""
+
+    @staticmethod
+    def minimo_requisitos(total_requisitos: int, compatibilidade_minima: float) -> int:
+        """Menor quantidade de requisitos atendidos cuja razão alcança a compatibilidade mínima"""
+        if total_requisitos == 0:
+            return 0
+        return next(
+            quantidade for quantidade in range(total_requisitos + 1)
+            if quantidade / total_requisitos >= compatibilidade_minima
+        )
+
+    @staticmethod
+    def consulta_compatibilidade(
+        db: Session,
+        vaga_id: int,
+        requisitos: List[VagaRequisito],
+        compatibilidade_minima: float,
+        filtros_candidato: Optional[list] = None
+    ) -> Query:
+        """
+        Monta a consulta SQL do matching por compatibilidade.
+
+        Cada linha traz (candidate_id, requisitos_atendidos, testes_concluidos) de um
+        candidato cuja razão requisitos_atendidos / total alcança compatibilidade_minima.
+        Nada é executado aqui: ordenação e paginação ficam a cargo de quem chama.
+        """
+        total_requisitos = len(requisitos)
+        # Requisito de nível 0 é atendido mesmo sem autoavaliação da competência
+        requisitos_livres = sum(1 for requisito in requisitos if int(requisito.nivel_minimo) <= 0)
+        minimo_join = MatchingService.minimo_requisitos(total_requisitos, compatibilidade_minima) - requisitos_livres
+
+        nivel_minimo = cast(VagaRequisito.nivel_minimo, Integer)
+        atendidos = db.query(
+            AutoavaliacaoCompetencia.candidate_id.label("candidate_id"),
+            func.count(VagaRequisito.id).label("atendidos")
+        ).select_from(VagaRequisito).join(
+            AutoavaliacaoCompetencia,
+            and_(
+                AutoavaliacaoCompetencia.competencia_id == VagaRequisito.competencia_id,
+                AutoavaliacaoCompetencia.nivel_declarado >= nivel_minimo
+            )
+        ).filter(
+            VagaRequisito.vaga_id == vaga_id,
+            nivel_minimo > 0
+        ).group_by(AutoavaliacaoCompetencia.candidate_id)
+
+        if minimo_join > 0:
+            atendidos = atendidos.having(func.count(VagaRequisito.id) >= minimo_join)
+        atendidos = atendidos.subquery()
+
+        testes_concluidos = db.query(func.count(CandidatoTeste.id)).filter(
+            CandidatoTeste.candidate_id == Candidate.id,
+            CandidatoTeste.status == StatusTesteCandidato.CONCLUIDO
+        ).correlate(Candidate).scalar_subquery()
+
+        consulta = db.query(
+            Candidate.id.label("candidate_id"),
+            (func.coalesce(atendidos.c.atendidos, 0) + requisitos_livres).label("requisitos_atendidos"),
+            testes_concluidos.label("testes_concluidos")
+        )
+
+        # Com mínimo > 0 só interessa quem passou no HAVING; senão, todos os candidatos
+        if minimo_join > 0:
+            consulta = consulta.join(atendidos, atendidos.c.candidate_id == Candidate.id)
+        else:
+            consulta = consulta.outerjoin(atendidos, atendidos.c.candidate_id == Candidate.id)
+
+        if filtros_candidato:
+            consulta = consulta.filter(*filtros_candidato)
+
+        return consulta
+
+    @staticmethod
+    def contar_compatibilidade_por_grupo(db: Session, consulta: Query) -> Dict[bool, int]:
+        """Totais da consulta de compatibilidade separados por ter ou não testes concluídos"""
+        subconsulta = consulta.subquery()
+        tem_testes = subconsulta.c.testes_concluidos > 0
+
+        return {
+            bool(grupo): total
+            for grupo, total in db.query(tem_testes, func.count()).group_by(tem_testes).all()
+        }
+
+    @staticmethod
+    def codificar_cursor(requisitos_atendidos: int, candidate_id: int) -> str:
+        """Cursor da próxima página: chave (requisitos_atendidos, candidate_id) do último item"""
+        return f"{requisitos_atendidos}:{candidate_id}"
+
+    @staticmethod
+    def decodificar_cursor(cursor: str) -> Tuple[int, int]:
+        """Inverso de codificar_cursor; levanta ValueError para cursor malformado"""
+        try:
+            requisitos_atendidos, candidate_id = cursor.split(":")
+            return int(requisitos_atendidos), int(candidate_id)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Cursor inválido: {cursor}")
+
+    @staticmethod
+    def paginar_compatibilidade(
+        db: Session,
+        consulta: Query,
+        com_testes: bool,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Página de um grupo da consulta de compatibilidade, ordenada no banco.
+
+        Com cursor (keyset), a página começa logo após a chave informada e skip é
+        ignorado: o custo não cresce com a profundidade da paginação. O ORDER BY
+        com LIMIT já é resolvido pelo Postgres com top-N heapsort (memória limitada
+        a skip + limit linhas).
+
+        Returns:
+            Lista [(candidate_id, requisitos_atendidos)] por compatibilidade decrescente
+        """
+        subconsulta = consulta.subquery()
+        tem_testes = subconsulta.c.testes_concluidos > 0
+
+        pagina = db.query(
+            subconsulta.c.candidate_id,
+            subconsulta.c.requisitos_atendidos
+        ).filter(
+            tem_testes if com_testes else ~tem_testes
+        )
+
+        if cursor:
+            ultimo_atendidos, ultimo_candidate_id = MatchingService.decodificar_cursor(cursor)
+            # Ordem (requisitos_atendidos DESC, candidate_id ASC): vem depois quem atende
+            # menos requisitos ou, no empate, tem id maior
+            pagina = pagina.filter(or_(
+                subconsulta.c.requisitos_atendidos < ultimo_atendidos,
+                and_(
+                    subconsulta.c.requisitos_atendidos == ultimo_atendidos,
+                    subconsulta.c.candidate_id > ultimo_candidate_id
+                )
+            ))
+            skip = 0
+
+        return pagina.order_by(
+            subconsulta.c.requisitos_atendidos.desc(),
+            subconsulta.c.candidate_id
+        ).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def _calcular_vaga(db: Session, vaga: Job, candidate_ids: Optional[List[int]] = None) -> ResultadoMatching:
+        """Executa o motor de matching para a vaga (opcionalmente só para alguns candidatos)"""
+        requisitos = db.query(VagaRequisito).options(
+            joinedload(VagaRequisito.competencia)
+        ).filter(VagaRequisito.vaga_id == vaga.id).all()
+
+        return MotorMatching(requisitos).calcular(db, vaga.area_atuacao, candidate_ids=candidate_ids)
+
+    @staticmethod
+    def status_kanban_inicial(testes_realizados: int) -> StatusKanbanCandidato:
+        """Coluna do kanban em que um candidato recém-vinculado à vaga começa"""
+        if testes_realizados > 0:
+            return StatusKanbanCandidato.TESTES_REALIZADOS
+        return StatusKanbanCandidato.TESTES_NAO_REALIZADOS
+
+    @staticmethod
+    def _gravar_resultado(
+        db: Session,
+        vaga_id: int,
+        resultado: ResultadoMatching,
+        ao_progredir: Optional[Callable[[int, int], None]] = None
+    ) -> None:
+        """
+        Grava as linhas de score (upsert por vaga e candidato) e vincula à vaga
+        (VagaCandidato) quem atende aos requisitos, em lotes e sem construir objetos ORM.
+
+        O upsert evita violar uq_vaga_match_score quando o recálculo completo da vaga
+        e a atualização de um candidato (atualizar_candidato) rodam ao mesmo tempo.
+        """
+        linhas = [{'vaga_id': vaga_id, **resultado.linha(indice)} for indice in range(len(resultado))]
+        for inicio in range(0, len(linhas), TAMANHO_LOTE):
+            comando = pg_insert(VagaMatchScore).values(linhas[inicio:inicio + TAMANHO_LOTE])
+            db.execute(comando.on_conflict_do_update(
+                index_elements=['vaga_id', 'candidate_id'],
+                set_={
+                    **{coluna: comando.excluded[coluna] for coluna in COLUNAS_SCORE},
+                    'atualizado_em': func.now()
+                }
+            ))
+            if ao_progredir:
+                ao_progredir(min(inicio + TAMANHO_LOTE, len(linhas)), len(linhas))
+
+        MatchingService.vincular_candidatos(db, vaga_id, [
+            (linha['candidate_id'], linha['testes_realizados'])
+            for linha in linhas if linha['atende_minimo']
+        ])
+
+    @staticmethod
+    def vincular_candidatos(db: Session, vaga_id: int, candidatos: List[Tuple[int, int]]) -> None:
+        """
+        Cria o VagaCandidato de cada (candidate_id, testes_realizados) em lotes.
+        Vínculos já existentes (e seu estado no kanban) são preservados. Não faz commit.
+        """
+        vinculos = [
+            {
+                'vaga_id': vaga_id,
+                'candidate_id': candidate_id,
+                'status_kanban': MatchingService.status_kanban_inicial(testes_realizados),
+                'excluido_por_filtros': False
+            }
+            for candidate_id, testes_realizados in candidatos
+        ]
+        for inicio in range(0, len(vinculos), TAMANHO_LOTE):
+            db.execute(
+                pg_insert(VagaCandidato)
+                .values(vinculos[inicio:inicio + TAMANHO_LOTE])
+                .on_conflict_do_nothing(index_elements=['vaga_id', 'candidate_id'])
+            )
+
+    @staticmethod
+    def vaga_materializada(db: Session, vaga_id: int) -> bool:
+        """Indica se a vaga já tem scores materializados"""
+        return db.query(exists().where(VagaMatchScore.vaga_id == vaga_id)).scalar()
+
+    @staticmethod
+    def recalcular_vaga(
+        db: Session,
+        vaga_id: int,
+        ao_progredir: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Recalcula do zero os scores de todos os candidatos da área da vaga.
+        Usado na publicação da vaga e quando os requisitos mudam: vínculos de quem
+        deixou de atender são removidos como em atualizar_candidato.
+
+        Args:
+            ao_progredir: Chamado com (candidatos_gravados, total_candidatos) a cada lote
+
+        Returns:
+            Quantidade de candidatos que atendem aos requisitos mínimos
+        """
+        vaga = db.query(Job).filter(Job.id == vaga_id).first()
+        if not vaga:
+            raise ValueError("Vaga não encontrada")
+
+        resultado = MatchingService._calcular_vaga(db, vaga)
+        if ao_progredir:
+            ao_progredir(0, len(resultado))
+
+        db.query(VagaMatchScore).filter(
+            VagaMatchScore.vaga_id == vaga_id
+        ).delete(synchronize_session=False)
+        MatchingService._gravar_resultado(db, vaga_id, resultado, ao_progredir)
+        # Requisitos ou área mudaram: quem deixou de atender sai do kanban (se ainda em estado inicial)
+        MatchingService._vinculos_incompativeis(db).filter(
+            VagaCandidato.vaga_id == vaga_id
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        return int(resultado.atende_minimo.sum())
+
+    @staticmethod
+    def agendar_recalculo(db: Session, vaga_id: int, motivo: str) -> MatchingExecucao:
+        """Registra uma execução pendente do matching da vaga (executar com executar_recalculo)"""
+        execucao = MatchingExecucao(
+            vaga_id=vaga_id,
+            motivo=motivo,
+            status=StatusMatchingExecucao.PENDENTE.value
+        )
+        db.add(execucao)
+        db.commit()
+        db.refresh(execucao)
+        return execucao
+
+    @staticmethod
+    def _atualizar_execucao(execucao_id: int, **campos) -> None:
+        """Grava o estado da execução em sessão própria, visível antes do fim do recálculo"""
+        db = SessionLocal()
+        try:
+            db.query(MatchingExecucao).filter(
+                MatchingExecucao.id == execucao_id
+            ).update(campos, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def executar_recalculo(execucao_id: int, vaga_id: int) -> None:
+        """
+        Executa o recálculo agendado fora do request (BackgroundTasks ou executor),
+        com sessão própria, atualizando progresso e conclusão da execução.
+        """
+        MatchingService._atualizar_execucao(
+            execucao_id,
+            status=StatusMatchingExecucao.PROCESSANDO.value,
+            iniciado_em=datetime.utcnow()
+        )
+
+        def _progresso(processados: int, total: int) -> None:
+            MatchingService._atualizar_execucao(
+                execucao_id,
+                candidatos_processados=processados,
+                total_candidatos=total
+            )
+
+        db = SessionLocal()
+        try:
+            compativeis = MatchingService.recalcular_vaga(db, vaga_id, ao_progredir=_progresso)
+            MatchingService._atualizar_execucao(
+                execucao_id,
+                status=StatusMatchingExecucao.CONCLUIDO.value,
+                candidatos_compativeis=compativeis,
+                concluido_em=datetime.utcnow()
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erro no matching da vaga {vaga_id} (execução {execucao_id}): {e}")
+            MatchingService._atualizar_execucao(
+                execucao_id,
+                status=StatusMatchingExecucao.ERRO.value,
+                erro=str(e),
+                concluido_em=datetime.utcnow()
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def agendar_recalculo_por_requisitos(vaga_id: int) -> None:
+        """
+        Coloca na fila do executor o recálculo de uma vaga cujos requisitos mudaram.
+        Edições repetidas da mesma vaga enquanto o recálculo ainda não começou geram uma
+        única execução (que lê os requisitos no momento em que roda).
+        """
+        MatchingService._agendar_recalculo_vaga(vaga_id, MOTIVO_REQUISITOS_ALTERADOS)
+
+    @staticmethod
+    def agendar_materializacao(vaga_id: int) -> None:
+        """
+        Coloca na fila do executor a materialização de uma vaga publicada antes de
+        vaga_match_scores (scores e VagaCandidatos), sem bloquear a listagem que a pediu.
+        """
+        MatchingService._agendar_recalculo_vaga(vaga_id, MOTIVO_MATERIALIZACAO)
+
+    @staticmethod
+    def _agendar_recalculo_vaga(vaga_id: int, motivo: str) -> None:
+        with _pendentes_lock:
+            if vaga_id in _vagas_pendentes:
+                # Já na fila: um recálculo incondicional também materializa a vaga
+                if motivo != MOTIVO_MATERIALIZACAO:
+                    _vagas_pendentes[vaga_id] = motivo
+                return
+            _vagas_pendentes[vaga_id] = motivo
+
+        _executor.submit(MatchingService._executar_recalculo_agendado, vaga_id)
+
+    @staticmethod
+    def _executar_recalculo_agendado(vaga_id: int) -> None:
+        """Reexecuta o matching de uma vaga aberta (thread do executor)"""
+        with _pendentes_lock:
+            motivo = _vagas_pendentes.pop(vaga_id, MOTIVO_REQUISITOS_ALTERADOS)
+
+        db = SessionLocal()
+        try:
+            status_vaga = db.query(Job.status).filter(Job.id == vaga_id).scalar()
+            if status_vaga != JobStatus.ABERTA:
+                # Rascunho ou vaga encerrada: o cálculo acontece na publicação
+                return
+            if motivo == MOTIVO_MATERIALIZACAO and MatchingService.vaga_materializada(db, vaga_id):
+                return
+            execucao = MatchingService.agendar_recalculo(db, vaga_id, motivo)
+        except Exception as e:
+            logger.error(f"Erro ao agendar o matching da vaga {vaga_id}: {e}")
+            return
+        finally:
+            db.close()
+
+        MatchingService.executar_recalculo(execucao.id, vaga_id)
+
+    @staticmethod
+    def obter_ultima_execucao(db: Session, vaga_id: int) -> Optional[MatchingExecucao]:
+        """Execução de matching mais recente da vaga"""
+        return db.query(MatchingExecucao).filter(
+            MatchingExecucao.vaga_id == vaga_id
+        ).order_by(MatchingExecucao.id.desc()).first()
+
+    @staticmethod
+    def ids_competencias_por_nome(db: Session, nomes: List[str]) -> List[int]:
+        """Competências do catálogo com esses nomes (mesma comparação do MapaCompetencias)"""
+        nomes_normalizados = [nome.lower() for nome in nomes if nome]
+        if not nomes_normalizados:
+            return []
+
+        return [
+            linha[0] for linha in db.query(Competencia.id).filter(
+                func.lower(Competencia.nome).in_(nomes_normalizados)
+            ).all()
+        ]
+
+    @staticmethod
+    def atualizar_candidato(
+        db: Session,
+        candidate_id: int,
+        competencia_ids: Optional[List[int]] = None
+    ) -> None:
+        """
+        Atualiza incrementalmente os scores de um candidato nas vagas já materializadas.
+        Chamado quando autoavaliação, certificação, área ou onboarding do candidato mudam.
+
+        Args:
+            competencia_ids: Competências que mudaram (matching reverso). Só os pares
+                (vaga, candidato) de vagas abertas com requisito nessas competências são
+                recalculados. None revisita todas as vagas materializadas da área
+                (mudança de área ou onboarding).
+        """
+        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        if not candidate:
+            return
+
+        if competencia_ids is not None:
+            if not competencia_ids or not candidate.area_atuacao:
+                return
+
+            # Matching reverso: vagas abertas cujos requisitos envolvem as competências alteradas
+            vagas = db.query(Job).filter(
+                Job.area_atuacao == candidate.area_atuacao,
+                Job.status == JobStatus.ABERTA,
+                exists().where(VagaMatchScore.vaga_id == Job.id),
+                exists().where(and_(
+                    VagaRequisito.vaga_id == Job.id,
+                    VagaRequisito.competencia_id.in_(competencia_ids)
+                ))
+            ).all()
+
+            for vaga in vagas:
+                db.query(VagaMatchScore).filter(
+                    VagaMatchScore.vaga_id == vaga.id,
+                    VagaMatchScore.candidate_id == candidate_id
+                ).delete(synchronize_session=False)
+                resultado = MatchingService._calcular_vaga(db, vaga, [candidate_id])
+                MatchingService._gravar_resultado(db, vaga.id, resultado)
+
+            MatchingService._desvincular_incompativeis(db, candidate_id, [vaga.id for vaga in vagas])
+            db.commit()
+            return
+
+        # Só vagas já materializadas: as demais serão calculadas por completo na publicação
+        vagas = db.query(Job).filter(
+            Job.area_atuacao == candidate.area_atuacao,
+            exists().where(VagaMatchScore.vaga_id == Job.id)
+        ).all() if candidate.area_atuacao else []
+
+        # Remove o candidato de todas as vagas (inclusive de outra área, se a área mudou)
+        db.query(VagaMatchScore).filter(
+            VagaMatchScore.candidate_id == candidate_id
+        ).delete(synchronize_session=False)
+
+        for vaga in vagas:
+            resultado = MatchingService._calcular_vaga(db, vaga, [candidate_id])
+            MatchingService._gravar_resultado(db, vaga.id, resultado)
+
+        MatchingService._desvincular_incompativeis(db, candidate_id)
+        db.commit()
+
+    @staticmethod
+    def _vinculos_incompativeis(db: Session) -> Query:
+        """
+        VagaCandidatos em vagas materializadas cujo candidato não atende mais à vaga,
+        ainda num estado inicial do kanban (sem interesse nem histórico)
+        """
+        return db.query(VagaCandidato).filter(
+            VagaCandidato.status_kanban.in_(ESTADOS_INICIAIS_KANBAN),
+            VagaCandidato.empresa_demonstrou_interesse.isnot(True),
+            VagaCandidato.candidato_demonstrou_interesse.isnot(True),
+            exists().where(VagaMatchScore.vaga_id == VagaCandidato.vaga_id),
+            ~exists().where(and_(
+                VagaMatchScore.vaga_id == VagaCandidato.vaga_id,
+                VagaMatchScore.candidate_id == VagaCandidato.candidate_id,
+                VagaMatchScore.atende_minimo == True
+            )),
+            ~exists().where(HistoricoEstadoPipeline.vaga_candidato_id == VagaCandidato.id)
+        )
+
+    @staticmethod
+    def _desvincular_incompativeis(db: Session, candidate_id: int, vaga_ids: Optional[List[int]] = None) -> None:
+        """
+        Remove os vínculos do candidato com vagas que ele não atende mais
+        (_vinculos_incompativeis). Não faz commit.
+        """
+        if vaga_ids is not None and not vaga_ids:
+            return
+
+        consulta = MatchingService._vinculos_incompativeis(db).filter(VagaCandidato.candidate_id == candidate_id)
+        if vaga_ids is not None:
+            consulta = consulta.filter(VagaCandidato.vaga_id.in_(vaga_ids))
+
+        consulta.delete(synchronize_session=False)
+
+    @staticmethod
+    def agendar_atualizacao_candidato(candidate_id: int, competencia_ids: Optional[List[int]] = None) -> None:
+        """
+        Agenda atualizar_candidato em segundo plano, com sessão própria, depois que os dados
+        do candidato já foram gravados. Falhas no matching só são registradas em log: não
+        desfazem nem impedem o cadastro. Chamadas repetidas antes da execução são unidas.
+        """
+        with _pendentes_lock:
+            agendado = candidate_id in _candidatos_pendentes
+            anteriores = _candidatos_pendentes.get(candidate_id, set())
+            if competencia_ids is None or anteriores is None:
+                _candidatos_pendentes[candidate_id] = None
+            else:
+                _candidatos_pendentes[candidate_id] = anteriores | set(competencia_ids)
+
+            if not agendado and _candidatos_pendentes[candidate_id] == set():
+                # Nenhuma competência mudou: nada a recalcular
+                del _candidatos_pendentes[candidate_id]
+                return
+
+        if not agendado:
+            _executor.submit(MatchingService._executar_atualizacao_candidato, candidate_id)
+
+    @staticmethod
+    def _executar_atualizacao_candidato(candidate_id: int) -> None:
+        """Executa a atualização agendada de um candidato (thread do executor)"""
+        with _pendentes_lock:
+            competencia_ids = _candidatos_pendentes.pop(candidate_id, set())
+
+        db = SessionLocal()
+        try:
+            MatchingService.atualizar_candidato(
+                db,
+                candidate_id,
+                list(competencia_ids) if competencia_ids is not None else None
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erro ao atualizar o matching do candidato {candidate_id}: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    @staticmethod
+    def obter_ranking(db: Session, vaga_id: int) -> Tuple[List[dict], int]:
+        """
+        Candidatos que atendem à vaga: 1º Match (certificados) antes do 2º Match,
+        cada grupo por score decrescente. Somente leitura.
+
+        Vagas ainda não materializadas (ex.: publicadas antes de vaga_match_scores)
+        são calculadas em memória, sem gravar nada.
+
+        Returns:
+            Tupla (linhas de score, quantidade de candidatos que não atendem)
+        """
+        vaga = db.query(Job).filter(Job.id == vaga_id).first()
+        if not vaga:
+            raise ValueError("Vaga não encontrada")
+
+        if not MatchingService.vaga_materializada(db, vaga_id):
+            resultado = MatchingService._calcular_vaga(db, vaga)
+            linhas = [resultado.linha(indice) for indice in range(len(resultado))]
+            ranking = [linha for linha in linhas if linha['atende_minimo']]
+            ranking.sort(key=lambda linha: (linha['tipo_match'], -linha['score_total'], linha['candidate_id']))
+            return ranking, len(linhas) - len(ranking)
+
+        scores = db.query(VagaMatchScore).filter(
+            VagaMatchScore.vaga_id == vaga_id,
+            VagaMatchScore.atende_minimo == True
+        ).order_by(
+            VagaMatchScore.tipo_match,  # '1º Match ...' < '2º Match ...'
+            VagaMatchScore.score_total.desc(),
+            VagaMatchScore.candidate_id
+        ).all()
+
+        excluidos = db.query(VagaMatchScore).filter(
+            VagaMatchScore.vaga_id == vaga_id,
+            VagaMatchScore.atende_minimo == False
+        ).count()
+
+        ranking = [
+            {
+                'candidate_id': score.candidate_id,
+                'atende_minimo': score.atende_minimo,
+                'tipo_match': score.tipo_match,
+                'score_total': score.score_total,
+                'score_certificacao': score.score_certificacao,
+                'score_autoavaliacao': score.score_autoavaliacao,
+                'competencias_certificadas': score.competencias_certificadas,
+                'competencias_autoavaliadas': score.competencias_autoavaliadas,
+                'testes_realizados': score.testes_realizados
+            }
+            for score in scores
+        ]
+        return ranking, excluidos
+
+
+# ============================================================================
+# Recálculo automático quando VagaRequisito muda
+# ============================================================================
+
+@event.listens_for(Session, "after_flush")
+def _registrar_requisitos_alterados(session, flush_context):
+    """Guarda as vagas cujos requisitos foram inseridos, alterados ou removidos no flush"""
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objeto, VagaRequisito) and objeto.vaga_id:
+            session.info.setdefault(CHAVE_REQUISITOS_ALTERADOS, set()).add(objeto.vaga_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _recalcular_vagas_com_requisitos_alterados(session):
+    """Após o commit, reexecuta em segundo plano (executor limitado) o matching das vagas afetadas"""
+    for vaga_id in session.info.pop(CHAVE_REQUISITOS_ALTERADOS, ()):
+        MatchingService.agendar_recalculo_por_requisitos(vaga_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_requisitos_alterados(session, previous_transaction):
+    """Alterações desfeitas não disparam recálculo"""
+    session.info.pop(CHAVE_REQUISITOS_ALTERADOS, None)
@@ -0,0 +1,381 @@
+"""
+Cálculo em lote das recomendações de vagas de todos os candidatos ativos
+
+Carrega uma única vez as vagas abertas e as habilidades/localização dos
+candidatos como arrays e pontua todos os pares (candidato x vaga) em blocos
+vetorizados distribuídos em um ProcessPoolExecutor, com as mesmas regras de
+RecommendationService.recomendar_vagas:
+
+- Habilidades: máscara booleana por tecnologia de TECNOLOGIAS_COMUNS
+  (candidatos x tecnologias) @ (tecnologias x vagas)
+- Localização: códigos (remota / sem dados / mesma cidade / mesmo estado / diferente)
+- Experiência: score por vaga aplicado a quem informou experiência
+
+O top-N de cada candidato é gravado em recomendacoes_vagas, lido diretamente
+pelos endpoints de recomendação. Uso (ex.: antes do e-mail semanal):
+
+    python -m app.services.recomendacao_lote
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models import Candidate, Job, Autoavaliacao, RecomendacaoVaga
+from app.models.job import JobStatus
+from app.services.recommendation_service import (
+    RecommendationService, PESO_HABILIDADES, PESO_LOCALIZACAO, PESO_EXPERIENCIA, SCORE_EXPERIENCIA_PADRAO
+)
+from app.utils.extracao_habilidades import TECNOLOGIAS_COMUNS
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 50  # Limite máximo aceito pelos endpoints de recomendação
+TAMANHO_BLOCO = 2000  # Candidatos por tarefa do pool
+
+TECNOLOGIAS = list(TECNOLOGIAS_COMUNS)
+
+# Códigos de localização -> score (mesma ordem de calcular_compatibilidade_localizacao)
+LOCAL_REMOTA, LOCAL_SEM_DADOS, LOCAL_MESMA_CIDADE, LOCAL_MESMO_ESTADO, LOCAL_DIFERENTE = range(5)
+SCORES_LOCALIZACAO = np.array([1.0, 0.5, 1.0, 0.7, 0.3])
+
+
+class VagasLote:
+    """Vagas abertas em forma de arrays (compartilhadas com os processos do pool)"""
+
+    def __init__(self, vagas: List[Job]):
+        self.job_ids = np.array([vaga.id for vaga in vagas], dtype=np.int64)
+        self.remota = np.array([bool(vaga.remote) for vaga in vagas], dtype=bool)
+
+        # Tecnologias exigidas (vagas x tecnologias)
+        self.habilidades = np.zeros((len(vagas), len(TECNOLOGIAS)), dtype=bool)
+        for linha, vaga in enumerate(vagas):
+            exigidas = RecommendationService.habilidades_vaga(vaga)
+            for coluna, tech in enumerate(TECNOLOGIAS):
+                self.habilidades[linha, coluna] = tech in exigidas
+        self.total_habilidades = self.habilidades.sum(axis=1)
+
+        # Score de experiência para quem informou experiência (vagas sem requisitos: padrão)
+        self.score_experiencia = np.array([
+            RecommendationService.score_experiencia_vaga(vaga.requirements) if vaga.requirements
+            else SCORE_EXPERIENCIA_PADRAO
+            for vaga in vagas
+        ])
+
+        # Localização normalizada como códigos inteiros (-1 = sem localização)
+        self.locais: Dict[str, int] = {}
+        locais_vagas = []
+        for vaga in vagas:
+            local = vaga.location.lower().strip() if vaga.location else None
+            locais_vagas.append(local)
+        for local in locais_vagas:
+            if local is not None:
+                self.locais.setdefault(local, len(self.locais))
+        self.local = np.array(
+            [self.locais[local] if local is not None else -1 for local in locais_vagas],
+            dtype=np.int64
+        )
+        self._locais_vagas = locais_vagas
+        self.estados: Dict[str, int] = {}
+        self.termina_com_estado = np.zeros((0, len(vagas)), dtype=bool)
+
+    def indexar_estados(self, estados: List[str]) -> None:
+        """Matriz (estados x vagas): localização da vaga termina com o estado"""
+        self.estados = {estado: indice for indice, estado in enumerate(estados)}
+        self.termina_com_estado = np.array([
+            [local is not None and local.endswith(estado) for local in self._locais_vagas]
+            for estado in estados
+        ], dtype=bool).reshape(len(estados), len(self._locais_vagas))
+
+
+class CandidatosLote:
+    """Um bloco de candidatos em forma de arrays"""
+
+    def __init__(
+        self,
+        candidate_ids: np.ndarray,
+        habilidades: np.ndarray,
+        cidade: np.ndarray,
+        tem_cidade: np.ndarray,
+        estado: np.ndarray,
+        tem_experiencia: np.ndarray
+    ):
+        self.candidate_ids = candidate_ids
+        self.habilidades = habilidades  # (candidatos x tecnologias)
+        self.cidade = cidade  # código em VagasLote.locais (-1 = nenhuma vaga na cidade)
+        self.tem_cidade = tem_cidade
+        self.estado = estado  # índice em VagasLote.estados (-1 = sem estado)
+        self.tem_experiencia = tem_experiencia
+
+
+# Vagas do lote, definidas uma vez por processo do pool
+_vagas_processo: Optional[VagasLote] = None
+
+
+def _inicializar_processo(vagas: VagasLote) -> None:
+    global _vagas_processo
+    _vagas_processo = vagas
+
+
+def pontuar_bloco(
+    vagas: VagasLote,
+    candidatos: CandidatosLote,
+    top_n: int = TOP_N
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pontua todos os pares do bloco e devolve o top-N de cada candidato.
+
+    Returns:
+        Tupla (candidate_ids, indices_vagas, score_final, score_habilidades,
+               codigo_localizacao, score_experiencia, habilidades_matches),
+        todos com forma (candidatos x top_n), exceto candidate_ids
+    """
+    total_vagas = len(vagas.job_ids)
+
+    # Habilidades: matches / exigidas (0.5 para vagas sem tecnologias reconhecidas)
+    matches = candidatos.habilidades.astype(np.int32) @ vagas.habilidades.T.astype(np.int32)
+    com_exigencias = vagas.total_habilidades > 0
+    score_habilidades = np.where(
+        com_exigencias[np.newaxis, :],
+        matches / np.maximum(vagas.total_habilidades, 1)[np.newaxis, :],
+        0.5
+    )
+    matches = np.where(com_exigencias[np.newaxis, :], matches, 0)
+
+    # Localização
+    codigo = np.full((len(candidatos.candidate_ids), total_vagas), LOCAL_DIFERENTE, dtype=np.int8)
+    if len(vagas.estados):
+        com_estado = candidatos.estado >= 0
+        mesmo_estado = np.zeros_like(codigo, dtype=bool)
+        mesmo_estado[com_estado] = vagas.termina_com_estado[candidatos.estado[com_estado]]
+        codigo[mesmo_estado] = LOCAL_MESMO_ESTADO
+    mesma_cidade = (candidatos.cidade[:, np.newaxis] == vagas.local[np.newaxis, :]) & (candidatos.cidade[:, np.newaxis] >= 0)
+    codigo[mesma_cidade] = LOCAL_MESMA_CIDADE
+    sem_dados = ~candidatos.tem_cidade[:, np.newaxis] | (vagas.local[np.newaxis, :] < 0)
+    codigo[sem_dados] = LOCAL_SEM_DADOS
+    codigo[:, vagas.remota] = LOCAL_REMOTA
+    score_localizacao = SCORES_LOCALIZACAO[codigo]
+
+    # Experiência
+    score_experiencia = np.where(
+        candidatos.tem_experiencia[:, np.newaxis],
+        vagas.score_experiencia[np.newaxis, :],
+        SCORE_EXPERIENCIA_PADRAO
+    )
+
+    score_final = (
+        score_habilidades * PESO_HABILIDADES +
+        score_localizacao * PESO_LOCALIZACAO +
+        score_experiencia * PESO_EXPERIENCIA
+    )
+
+    # Top-N por candidato, em ordem decrescente de score
+    n = min(top_n, total_vagas)
+    if n < total_vagas:
+        melhores = np.argpartition(-score_final, n - 1, axis=1)[:, :n]
+    else:
+        melhores = np.tile(np.arange(total_vagas), (len(candidatos.candidate_ids), 1))
+    ordem = np.argsort(-np.take_along_axis(score_final, melhores, axis=1), axis=1, kind="stable")
+    melhores = np.take_along_axis(melhores, ordem, axis=1)
+
+    def _top(matriz: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(matriz, melhores, axis=1)
+
+    return (
+        candidatos.candidate_ids,
+        melhores,
+        _top(score_final),
+        _top(score_habilidades),
+        _top(codigo),
+        _top(score_experiencia),
+        _top(matches)
+    )
+
+
+def _pontuar_bloco_processo(candidatos: CandidatosLote):
+    """Tarefa do pool: usa as vagas carregadas no inicializador do processo"""
+    return pontuar_bloco(_vagas_processo, candidatos)
+
+
+class RecomendacaoLoteService:
+    """Orquestra o cálculo em lote e a gravação em recomendacoes_vagas"""
+
+    @staticmethod
+    def _carregar_vagas(db: Session) -> Tuple[List[Job], VagasLote]:
+        vagas = db.query(Job).filter(Job.status == JobStatus.ABERTA).order_by(Job.id).all()
+        return vagas, VagasLote(vagas)
+
+    @staticmethod
+    def _carregar_candidatos(db: Session, vagas: VagasLote) -> Tuple[List[CandidatosLote], Dict[int, Tuple[str, str]]]:
+        """
+        Blocos de candidatos ativos e, por candidato, (cidade, estado) originais
+        para montar o motivo de localização.
+        """
+        linhas = db.query(
+            Candidate.id, Candidate.cidade, Candidate.estado, Candidate.experiencia_profissional
+        ).filter(Candidate.is_active == True).order_by(Candidate.id).all()
+
+        # Habilidades autoavaliadas: primeira autoavaliação de cada candidato
+        habilidades_por_candidato: Dict[int, set] = {}
+        for candidate_id, respostas in db.query(
+            Autoavaliacao.candidate_id, Autoavaliacao.respostas
+        ).order_by(Autoavaliacao.candidate_id, Autoavaliacao.id):
+            if candidate_id in habilidades_por_candidato:
+                continue
+            habilidades_por_candidato[candidate_id] = {
+                resposta.get("habilidade", "").lower()
+                for resposta in (respostas or []) if isinstance(resposta, dict)
+            }
+
+        estados = sorted({estado.lower() for _, _, estado, _ in linhas if estado})
+        vagas.indexar_estados(estados)
+
+        total = len(linhas)
+        candidate_ids = np.array([linha[0] for linha in linhas], dtype=np.int64)
+        habilidades = np.zeros((total, len(TECNOLOGIAS)), dtype=bool)
+        cidade = np.full(total, -1, dtype=np.int64)
+        tem_cidade = np.zeros(total, dtype=bool)
+        estado = np.full(total, -1, dtype=np.int64)
+        tem_experiencia = np.zeros(total, dtype=bool)
+        localizacao: Dict[int, Tuple[str, str]] = {}
+
+        for linha, (candidate_id, cidade_candidato, estado_candidato, experiencia) in enumerate(linhas):
+            declaradas = habilidades_por_candidato.get(candidate_id, set())
+            for coluna, tech in enumerate(TECNOLOGIAS):
+                habilidades[linha, coluna] = tech in declaradas
+            if cidade_candidato:
+                tem_cidade[linha] = True
+                cidade[linha] = vagas.locais.get(cidade_candidato.lower().strip(), -1)
+            if estado_candidato:
+                estado[linha] = vagas.estados[estado_candidato.lower()]
+            tem_experiencia[linha] = bool(experiencia)
+            localizacao[candidate_id] = (cidade_candidato, estado_candidato)
+
+        blocos = [
+            CandidatosLote(
+                candidate_ids[inicio:inicio + TAMANHO_BLOCO],
+                habilidades[inicio:inicio + TAMANHO_BLOCO],
+                cidade[inicio:inicio + TAMANHO_BLOCO],
+                tem_cidade[inicio:inicio + TAMANHO_BLOCO],
+                estado[inicio:inicio + TAMANHO_BLOCO],
+                tem_experiencia[inicio:inicio + TAMANHO_BLOCO]
+            )
+            for inicio in range(0, total, TAMANHO_BLOCO)
+        ]
+        return blocos, localizacao
+
+    @staticmethod
+    def _motivo_localizacao(codigo: int, cidade: Optional[str], estado: Optional[str]) -> str:
+        """Mesmos textos de RecommendationService.calcular_compatibilidade_localizacao"""
+        if codigo == LOCAL_REMOTA:
+            return "Vaga 100% remota"
+        if codigo == LOCAL_SEM_DADOS:
+            return "Localização não especificada"
+        if codigo == LOCAL_MESMA_CIDADE:
+            return f"Mesma cidade: {cidade}"
+        if codigo == LOCAL_MESMO_ESTADO:
+            return f"Mesmo estado: {estado}"
+        return "Localização diferente"
+
+    @staticmethod
+    def _gravar_bloco(
+        db: Session,
+        vagas: VagasLote,
+        bloco: CandidatosLote,
+        resultado: tuple,
+        localizacao: Dict[int, Tuple[str, str]],
+        calculado_em: datetime
+    ) -> int:
+        """Substitui as recomendações dos candidatos do bloco pelo novo top-N"""
+        candidate_ids, melhores, score_final, score_habilidades, codigo, score_experiencia, matches = resultado
+
+        linhas = []
+        for linha, candidate_id in enumerate(candidate_ids.tolist()):
+            cidade, estado = localizacao[candidate_id]
+            for posicao, indice_vaga in enumerate(melhores[linha].tolist()):
+                faltando = [
+                    TECNOLOGIAS[coluna]
+                    for coluna in np.flatnonzero(vagas.habilidades[indice_vaga] & ~bloco.habilidades[linha])
+                ]
+                linhas.append({
+                    "candidate_id": candidate_id,
+                    "job_id": int(vagas.job_ids[indice_vaga]),
+                    "posicao": posicao + 1,
+                    "compatibilidade_score": float(score_final[linha, posicao]),
+                    "score_habilidades": float(score_habilidades[linha, posicao]),
+                    "score_localizacao": float(SCORES_LOCALIZACAO[codigo[linha, posicao]]),
+                    "score_experiencia": float(score_experiencia[linha, posicao]),
+                    "motivo_localizacao": RecomendacaoLoteService._motivo_localizacao(
+                        int(codigo[linha, posicao]), cidade, estado
+                    ),
+                    "habilidades_matches": int(matches[linha, posicao]),
+                    "habilidades_faltando": faltando[:3],
+                    "calculado_em": calculado_em,
+                })
+
+        db.query(RecomendacaoVaga).filter(
+            RecomendacaoVaga.candidate_id.in_(candidate_ids.tolist())
+        ).delete(synchronize_session=False)
+        if linhas:
+            db.execute(insert(RecomendacaoVaga), linhas)
+        db.commit()
+        return len(candidate_ids)
+
+    @staticmethod
+    def precalcular(processos: Optional[int] = None) -> int:
+        """
+        Recalcula e grava o top-N de todos os candidatos ativos.
+
+        Args:
+            processos: Tamanho do pool (padrão: número de CPUs)
+
+        Returns:
+            Quantidade de candidatos processados
+        """
+        db = SessionLocal()
+        try:
+            calculado_em = datetime.now(timezone.utc)
+            _, vagas = RecomendacaoLoteService._carregar_vagas(db)
+            blocos, localizacao = RecomendacaoLoteService._carregar_candidatos(db, vagas)
+
+            if not len(vagas.job_ids):
+                # Sem vagas abertas: nenhuma recomendação vale mais
+                db.query(RecomendacaoVaga).delete(synchronize_session=False)
+                db.commit()
+                return 0
+
+            processados = 0
+            with ProcessPoolExecutor(
+                max_workers=processos or os.cpu_count(),
+                initializer=_inicializar_processo,
+                initargs=(vagas,)
+            ) as pool:
+                for bloco, resultado in zip(blocos, pool.map(_pontuar_bloco_processo, blocos)):
+                    processados += RecomendacaoLoteService._gravar_bloco(
+                        db, vagas, bloco, resultado, localizacao, calculado_em
+                    )
+                    logger.info(f"Recomendações em lote: {processados} candidatos gravados")
+
+            # Candidatos que deixaram de estar ativos não mantêm recomendações antigas
+            db.query(RecomendacaoVaga).filter(
+                RecomendacaoVaga.calculado_em < calculado_em
+            ).delete(synchronize_session=False)
+            db.commit()
+            return processados
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    total = RecomendacaoLoteService.precalcular()
+    logger.info(f"Recomendações pré-calculadas para {total} candidatos")
@@ -1,8 +1,16 @@
 """
 Serviço de recomendação de vagas para candidatos
+
+As recomendações de cada candidato ficam em um cache LRU por processo
+(cache_recomendacoes), invalidado após o commit quando a autoavaliação ou a
+localização/experiência do candidato mudam, e por completo quando alguma vaga é
+criada, editada, publicada, encerrada ou removida. A invalidação só alcança o
+processo que fez o commit: nos demais workers cada entrada expira após
+RECOMENDACOES_CACHE_TTL_SEGUNDOS.
 """
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional, Tuple
+from sqlalchemy import event, func, inspect
+from typing import List, Dict, FrozenSet, Optional, Tuple
 import json
 import logging
 from difflib import SequenceMatcher
@@ -10,9 +18,35 @@ from difflib import SequenceMatcher
 from app.models.candidate import Candidate
 from app.models.job import Job, JobStatus
 from app.models.test import Autoavaliacao
+from app.models.recomendacao_vaga import RecomendacaoVaga
+from app.core.config import settings
+from app.utils.cache_lru import CacheLRU
+from app.services.search_service import SearchService
+from app.utils.extracao_habilidades import TECNOLOGIAS_COMUNS, extrair_habilidades
 
 logger = logging.getLogger(__name__)
 
+# Pesos do score final de recomendação
+PESO_HABILIDADES = 0.5
+PESO_LOCALIZACAO = 0.3
+PESO_EXPERIENCIA = 0.2
+SCORE_EXPERIENCIA_PADRAO = 0.5  # Sem experiência informada ou vaga sem requisitos
+
+# candidate_id -> lista completa de recomendações já ordenada por score
+cache_recomendacoes = CacheLRU(
+    settings.RECOMENDACOES_CACHE_MAX_CANDIDATOS,
+    ttl_segundos=settings.RECOMENDACOES_CACHE_TTL_SEGUNDOS
+)
+
+CHAVE_RECOMENDACOES_INVALIDADAS = "recomendacoes_invalidadas"
+
+# Campos que entram no cálculo das recomendações
+CAMPOS_CANDIDATO_RECOMENDACAO = ("cidade", "estado", "experiencia_profissional")
+CAMPOS_VAGA_RECOMENDACAO = (
+    "status", "title", "description", "requirements", "habilidades_extraidas", "company_id",
+    "location", "remote", "job_type", "salary_min", "salary_max"
+)
+
 
 class RecommendationService:
     """Serviço para recomendar vagas com base no perfil do candidato"""
@@ -75,64 +109,154 @@ class RecommendationService:
         # Sem match
         return (0.3, f"Localização diferente")
     
+    @staticmethod
+    def habilidades_vaga(vaga: Job) -> FrozenSet[str]:
+        """
+        Tecnologias exigidas pela vaga (conjunto pré-calculado em jobs.habilidades_extraidas).
+        Vagas ainda sem o conjunto gravado são extraídas na hora.
+        """
+        if vaga.habilidades_extraidas is not None:
+            return frozenset(vaga.habilidades_extraidas)
+        return extrair_habilidades(vaga.requirements)
+    
     def calcular_compatibilidade_habilidades(
         self,
         habilidades_candidato: Dict[str, int],
-        requisitos_job: Optional[str]
+        habilidades_vaga: FrozenSet[str]
     ) -> Tuple[float, int, List[str]]:
         """
         Calcula compatibilidade de habilidades
         
         Retorna: (score 0-1, habilidades_matches, habilidades_faltando)
         """
-        if not requisitos_job:
+        if not habilidades_vaga:
             return (0.5, 0, [])
         
-        # Extrair habilidades dos requisitos
-        requisitos_lower = requisitos_job.lower()
-        
-        # Palavras-chave de linguagens e tecnologias
-        tecnologias_comuns = {
-            "python": ["python", "django", "flask", "fastapi"],
-            "javascript": ["javascript", "js", "node", "nodejs"],
-            "react": ["react", "reactjs"],
-            "typescript": ["typescript", "ts"],
-            "java": ["java"],
-            "c#": ["c#", "csharp", "dotnet"],
-            "sql": ["sql", "postgres", "postgresql", "mysql", "oracle"],
-            "nosql": ["nosql", "mongodb", "redis"],
-            "docker": ["docker"],
-            "kubernetes": ["kubernetes", "k8s"],
-            "aws": ["aws", "amazon"],
-            "azure": ["azure"],
-            "gcp": ["gcp", "google cloud"],
-            "git": ["git", "github", "gitlab"],
-            "rest": ["rest", "api"],
-            "graphql": ["graphql"],
-        }
+        habilidades_encontradas = habilidades_vaga.intersection(habilidades_candidato)
+        # Ordem de TECNOLOGIAS_COMUNS, como na listagem original
+        habilidades_faltando = [
+            tech for tech in TECNOLOGIAS_COMUNS
+            if tech in habilidades_vaga and tech not in habilidades_encontradas
+        ]
         
-        habilidades_encontradas = []
-        habilidades_faltando = []
+        score = len(habilidades_encontradas) / len(habilidades_vaga)
+        return (score, len(habilidades_encontradas), habilidades_faltando)
+    
+    @staticmethod
+    def score_experiencia_vaga(requisitos: str) -> float:
+        """Score de experiência de um candidato com experiência informada para vaga com requisitos"""
+        requisitos_lower = requisitos.lower()
+        if "junior" in requisitos_lower or "iniciante" in requisitos_lower:
+            return 0.6
+        return 0.7
+    
+    @staticmethod
+    def montar_recomendacao(
+        vaga: Job,
+        score_habilidades: float,
+        matches: int,
+        faltando: List[str],
+        score_localizacao: float,
+        motivo_localizacao: str,
+        score_experiencia: float,
+        similaridade_textual: Optional[float] = None
+    ) -> Dict:
+        """
+        Item de resposta dos endpoints de recomendação com o score final ponderado.
+        A similaridade textual (TF-IDF) é um sinal extra: aparece nos motivos, fora do score.
+        """
+        score_final = (
+            score_habilidades * PESO_HABILIDADES +
+            score_localizacao * PESO_LOCALIZACAO +
+            score_experiencia * PESO_EXPERIENCIA
+        )
         
-        for tech, keywords in tecnologias_comuns.items():
-            # Verificar se alguma keyword está nos requisitos
-            encontrada = any(keyword in requisitos_lower for keyword in keywords)
+        return {
+            "job_id": vaga.id,
+            "job_title": vaga.title,
+            "company_id": vaga.company_id,
+            "location": vaga.location,
+            "remote": vaga.remote,
+            "job_type": vaga.job_type,
+            "salary_min": float(vaga.salary_min) if vaga.salary_min else None,
+            "salary_max": float(vaga.salary_max) if vaga.salary_max else None,
+            "description": vaga.description[:200] + "..." if vaga.description else None,
             
-            if encontrada:
-                # Verificar se o candidato tem essa habilidade
-                if tech.lower() in habilidades_candidato:
-                    habilidades_encontradas.append(tech)
-                else:
-                    habilidades_faltando.append(tech)
+            # Score de compatibilidade
+            "compatibilidade_score": round(score_final * 100, 1),  # 0-100
+            "motivos": {
+                "localizacao": {
+                    "score": round(score_localizacao * 100, 1),
+                    "motivo": motivo_localizacao
+                },
+                "habilidades": {
+                    "score": round(score_habilidades * 100, 1),
+                    "matches": matches,
+                    "faltando": faltando[:3]  # Top 3 faltando
+                },
+                "experiencia": {
+                    "score": round(score_experiencia * 100, 1),
+                    "motivo": "Experiência compatível"
+                },
+                "similaridade_textual": {
+                    "score": round(similaridade_textual * 100, 1) if similaridade_textual is not None else None,
+                    "motivo": "Semelhança entre o perfil e o texto da vaga"
+                }
+            }
+        }
+    
+    @staticmethod
+    def similaridades_textuais(candidate: Candidate, vagas: List[Job]) -> Dict[int, float]:
+        """job_id -> similaridade TF-IDF com o perfil (vazio enquanto o índice não for construído)"""
+        from app.services.similaridade_textual import obter_indice
         
-        # Calcular score
-        total_habilidades = len(habilidades_encontradas) + len(habilidades_faltando)
+        indice = obter_indice()
+        if indice is None or not vagas:
+            return {}
+        return indice.similaridades_candidato_vagas(candidate, vagas)
+    
+    def recomendacoes_precalculadas(self, candidate: Candidate) -> Optional[List[Dict]]:
+        """
+        Top-N gravado pelo cálculo em lote (recomendacoes_vagas), se ainda válido:
+        nenhuma vaga, dado do candidato ou autoavaliação mudou depois do cálculo.
+        """
+        calculado_em = self.db.query(func.min(RecomendacaoVaga.calculado_em)).filter(
+            RecomendacaoVaga.candidate_id == candidate.id
+        ).scalar()
+        if calculado_em is None:
+            return None
         
-        if total_habilidades == 0:
-            return (0.5, 0, [])
+        ultima_vaga = self.db.query(
+            func.max(func.coalesce(Job.updated_at, Job.created_at))
+        ).scalar()
+        ultima_autoavaliacao = self.db.query(
+            func.max(func.coalesce(Autoavaliacao.updated_at, Autoavaliacao.created_at))
+        ).filter(Autoavaliacao.candidate_id == candidate.id).scalar()
+        alteracoes = [ultima_vaga, ultima_autoavaliacao, candidate.updated_at or candidate.created_at]
+        if any(alteracao is not None and alteracao > calculado_em for alteracao in alteracoes):
+            return None
         
-        score = len(habilidades_encontradas) / total_habilidades
-        return (score, len(habilidades_encontradas), habilidades_faltando)
+        linhas = self.db.query(RecomendacaoVaga, Job).join(
+            Job, Job.id == RecomendacaoVaga.job_id
+        ).filter(
+            RecomendacaoVaga.candidate_id == candidate.id,
+            Job.status == JobStatus.ABERTA
+        ).order_by(RecomendacaoVaga.posicao).all()
+        similaridades = self.similaridades_textuais(candidate, [vaga for _, vaga in linhas])
+        
+        return [
+            self.montar_recomendacao(
+                vaga,
+                recomendacao.score_habilidades,
+                recomendacao.habilidades_matches,
+                list(recomendacao.habilidades_faltando or []),
+                recomendacao.score_localizacao,
+                recomendacao.motivo_localizacao,
+                recomendacao.score_experiencia,
+                similaridades.get(vaga.id)
+            )
+            for recomendacao, vaga in linhas
+        ]
     
     def recomendar_vagas(
         self,
@@ -145,6 +269,11 @@ class RecommendationService:
         Retorna lista de vagas com score de compatibilidade
         """
         try:
+            em_cache = cache_recomendacoes.obter(candidate_id)
+            if em_cache is not None:
+                return em_cache[:limit]
+            geracao = cache_recomendacoes.geracao
+            
             # Buscar candidato
             candidate = self.db.query(Candidate).filter(
                 Candidate.id == candidate_id
@@ -153,6 +282,12 @@ class RecommendationService:
             if not candidate:
                 return []
             
+            # Top-N do cálculo em lote, quando ainda válido (lista já ordenada)
+            precalculadas = self.recomendacoes_precalculadas(candidate)
+            if precalculadas is not None:
+                cache_recomendacoes.definir(candidate_id, precalculadas, geracao)
+                return precalculadas[:limit]
+            
             # Obter habilidades do candidato
             habilidades_candidato = self.obter_habilidades_candidato(candidate_id)
             
@@ -162,6 +297,7 @@ class RecommendationService:
             ).all()
             
             recomendacoes = []
+            similaridades = self.similaridades_textuais(candidate, vagas)
             
             for vaga in vagas:
                 # Score de localização
@@ -175,62 +311,25 @@ class RecommendationService:
                 # Score de habilidades
                 score_habilidades, matches, faltando = self.calcular_compatibilidade_habilidades(
                     habilidades_candidato,
-                    vaga.requirements
+                    self.habilidades_vaga(vaga)
                 )
                 
                 # Score de experiência (baseado em anos)
-                score_experiencia = 0.5  # Default
+                score_experiencia = SCORE_EXPERIENCIA_PADRAO
                 if candidate.experiencia_profissional and vaga.requirements:
-                    # Se candidato tem experiência mencionada, aumenta score
-                    if "junior" in vaga.requirements.lower() or "iniciante" in vaga.requirements.lower():
-                        score_experiencia = 0.6
-                    elif "senior" in vaga.requirements.lower():
-                        score_experiencia = 0.7
-                    else:
-                        score_experiencia = 0.7
-                
-                # Score final (média ponderada)
-                score_final = (
-                    score_habilidades * 0.5 +      # 50% peso em habilidades
-                    score_localizacao * 0.3 +       # 30% peso em localização
-                    score_experiencia * 0.2         # 20% peso em experiência
-                )
-                
-                # Preparar recomendação
-                recomendacao = {
-                    "job_id": vaga.id,
-                    "job_title": vaga.title,
-                    "company_id": vaga.company_id,
-                    "location": vaga.location,
-                    "remote": vaga.remote,
-                    "job_type": vaga.job_type,
-                    "salary_min": float(vaga.salary_min) if vaga.salary_min else None,
-                    "salary_max": float(vaga.salary_max) if vaga.salary_max else None,
-                    "description": vaga.description[:200] + "..." if vaga.description else None,
-                    
-                    # Score de compatibilidade
-                    "compatibilidade_score": round(score_final * 100, 1),  # 0-100
-                    "motivos": {
-                        "localizacao": {
-                            "score": round(score_localizacao * 100, 1),
-                            "motivo": motivo_localizacao
-                        },
-                        "habilidades": {
-                            "score": round(score_habilidades * 100, 1),
-                            "matches": matches,
-                            "faltando": faltando[:3]  # Top 3 faltando
-                        },
-                        "experiencia": {
-                            "score": round(score_experiencia * 100, 1),
-                            "motivo": "Experiência compatível"
-                        }
-                    }
-                }
+                    score_experiencia = self.score_experiencia_vaga(vaga.requirements)
                 
-                recomendacoes.append(recomendacao)
+                recomendacoes.append(self.montar_recomendacao(
+                    vaga,
+                    score_habilidades, matches, faltando,
+                    score_localizacao, motivo_localizacao,
+                    score_experiencia,
+                    similaridades.get(vaga.id)
+                ))
             
             # Ordenar por score (decrescente)
             recomendacoes.sort(key=lambda x: x["compatibilidade_score"], reverse=True)
+            cache_recomendacoes.definir(candidate_id, recomendacoes, geracao)
             
             logger.info(f"Recomendadas {len(recomendacoes[:limit])} vagas para candidato {candidate_id}")
             
@@ -263,9 +362,9 @@ class RecommendationService:
                 habilidade = max(habilidades_candidato.items(), key=lambda x: x[1])[0]
             
             # Buscar vagas que mencionam essa habilidade
-            vagas = self.db.query(Job).filter(
-                Job.status == JobStatus.ABERTA,
-                Job.requirements.ilike(f"%{habilidade}%")
+            vagas = SearchService.filtrar_vagas_por_requisito(
+                self.db.query(Job).filter(Job.status == JobStatus.ABERTA),
+                habilidade
             ).all()
             
             # Recomendar usando método principal
@@ -284,7 +383,7 @@ class RecommendationService:
                 
                 score_habilidades, matches, faltando = self.calcular_compatibilidade_habilidades(
                     habilidades_candidato,
-                    vaga.requirements
+                    self.habilidades_vaga(vaga)
                 )
                 
                 score_final = score_habilidades * 0.7 + score_localizacao * 0.3
@@ -313,3 +412,50 @@ class RecommendationService:
         except Exception as e:
             logger.error(f"Erro ao recomendar vagas por habilidade: {str(e)}", exc_info=True)
             return []
+
+
+# ============================================================================
+# Invalidação do cache de recomendações
+# ============================================================================
+
+def _alterou(objeto, campos) -> bool:
+    estado = inspect(objeto)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_recomendacoes_invalidadas(session, flush_context):
+    """Guarda os candidatos afetados (ou None = todos) pelas alterações do flush"""
+    afetados = session.info.setdefault(CHAVE_RECOMENDACOES_INVALIDADAS, set())
+    for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objeto, Autoavaliacao) and objeto.candidate_id:
+            afetados.add(objeto.candidate_id)
+        elif isinstance(objeto, Candidate) and objeto.id and (
+            objeto in session.deleted or _alterou(objeto, CAMPOS_CANDIDATO_RECOMENDACAO)
+        ):
+            afetados.add(objeto.id)
+        elif isinstance(objeto, Job) and (
+            objeto in session.new or objeto in session.deleted or _alterou(objeto, CAMPOS_VAGA_RECOMENDACAO)
+        ):
+            afetados.add(None)
+    if not afetados:
+        session.info.pop(CHAVE_RECOMENDACOES_INVALIDADAS, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_recomendacoes(session):
+    """Após o commit, descarta as recomendações que deixaram de valer"""
+    afetados = session.info.pop(CHAVE_RECOMENDACOES_INVALIDADAS, None)
+    if not afetados:
+        return
+    if None in afetados:
+        cache_recomendacoes.limpar()
+        return
+    for candidate_id in afetados:
+        cache_recomendacoes.invalidar(candidate_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_recomendacoes_invalidadas(session, previous_transaction):
+    """Alterações desfeitas não invalidam o cache"""
+    session.info.pop(CHAVE_RECOMENDACOES_INVALIDADAS, None)
@@ -0,0 +1,131 @@
+"""
+Serviço de busca textual (candidatos e vagas)
+
+Apoiado em recursos do Postgres criados nas migrations 040 e 047:
+- Colunas tsvector geradas (busca_vetor) com configuração 'portuguese' e unaccent,
+  indexadas com GIN, para busca por palavras com ranking (ts_rank_cd)
+- Índice GIN de expressão com o tsvector só dos requisitos das vagas
+- Índices GIN pg_trgm para buscas por trecho (ILIKE '%termo%'), que deixam de
+  fazer sequential scan
+
+f_unaccent é um wrapper IMMUTABLE de unaccent(), necessário para indexar expressões.
+"""
+from sqlalchemy.orm import Query
+from sqlalchemy import func, or_, select, union, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.candidate import Candidate
+from app.models.candidato_habilidade import CandidatoHabilidade, normalizar_habilidade
+from app.models.job import Job
+from app.models.user import User
+
+
+# Configuração de dicionário usada nas colunas busca_vetor
+CONFIGURACAO_TEXTO = "portuguese"
+
+# Mesma expressão de ix_jobs_requirements_busca (o índice só é usado se ela coincidir)
+VETOR_REQUISITOS = func.to_tsvector(
+    literal_column(f"'{CONFIGURACAO_TEXTO}'"),
+    func.f_unaccent(func.coalesce(Job.requirements, literal_column("''")))
+)
+
+
+class SearchService:
+    """Filtros e ranking de busca textual reutilizados pelos endpoints"""
+
+    @staticmethod
+    def _padrao_trecho(termo: str) -> str:
+        """Padrão ILIKE '%termo%' com curingas do usuário escapados"""
+        escapado = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escapado}%"
+
+    @staticmethod
+    def _contem(coluna, termo: str) -> ColumnElement:
+        """coluna contém termo, sem acentos e sem diferenciar maiúsculas (índice trigram)"""
+        return func.f_unaccent(coluna).ilike(
+            func.f_unaccent(SearchService._padrao_trecho(termo)),
+            escape="\\"
+        )
+
+    @staticmethod
+    def consulta_texto(termo: str):
+        """tsquery em português a partir do texto digitado (aceita aspas, OR e -exclusão)"""
+        return func.websearch_to_tsquery(CONFIGURACAO_TEXTO, func.f_unaccent(termo))
+
+    @staticmethod
+    def filtrar_candidatos(query: Query, busca: str) -> Query:
+        """
+        Busca de candidatos por nome, habilidades, área ou email.
+        Ordena por relevância (ts_rank_cd), com correspondências só por trecho ao final.
+
+        Texto (tsvector e trigram do nome) e email são ramos separados de um UNION:
+        um OR com a subconsulta em users impediria o uso dos índices GIN.
+        """
+        termo = busca.strip()
+        if not termo:
+            return query
+
+        tsquery = SearchService.consulta_texto(termo)
+        por_texto = select(Candidate.id).where(
+            or_(
+                Candidate.busca_vetor.op("@@")(tsquery),
+                SearchService._contem(Candidate.full_name, termo)
+            )
+        )
+        por_email = select(Candidate.id).join(User, User.id == Candidate.user_id).where(
+            User.email.ilike(SearchService._padrao_trecho(termo), escape="\\")
+        )
+        encontrados = union(por_texto, por_email).subquery()
+        return query.filter(
+            Candidate.id.in_(select(encontrados.c.id))
+        ).order_by(
+            func.ts_rank_cd(Candidate.busca_vetor, tsquery).desc(),
+            Candidate.id
+        )
+
+    @staticmethod
+    def filtrar_candidatos_por_habilidade(query: Query, habilidade: str) -> Query:
+        """Candidatos com alguma habilidade cujo nome contém o termo (candidato_habilidades, índice trigram)"""
+        termo = normalizar_habilidade(habilidade)
+        if not termo:
+            return query
+
+        return query.filter(
+            Candidate.habilidades_rel.any(
+                CandidatoHabilidade.habilidade_normalizada.like(SearchService._padrao_trecho(termo), escape="\\")
+            )
+        )
+
+    @staticmethod
+    def filtrar_vagas(query: Query, busca: str) -> Query:
+        """
+        Busca de vagas por título, requisitos e descrição.
+        Ordena por relevância (ts_rank_cd); título pesa mais que requisitos e descrição.
+        """
+        termo = busca.strip()
+        if not termo:
+            return query
+
+        tsquery = SearchService.consulta_texto(termo)
+        return query.filter(
+            or_(
+                Job.busca_vetor.op("@@")(tsquery),
+                SearchService._contem(Job.title, termo)
+            )
+        ).order_by(
+            func.ts_rank_cd(Job.busca_vetor, tsquery).desc(),
+            Job.id
+        )
+
+    @staticmethod
+    def filtrar_vagas_por_requisito(query: Query, habilidade: str) -> Query:
+        """Vagas cujos requisitos mencionam a habilidade (palavra ou trecho)"""
+        termo = habilidade.strip()
+        if not termo:
+            return query
+
+        return query.filter(
+            or_(
+                VETOR_REQUISITOS.op("@@")(SearchService.consulta_texto(termo)),
+                SearchService._contem(Job.requirements, termo)
+            )
+        )
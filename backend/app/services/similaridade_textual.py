@@ -0,0 +1,332 @@
+"""
+Índice TF-IDF de similaridade textual entre vagas e perfis de candidatos
+
+Construído offline (CPU, sem serviços externos) sobre:
+- Vagas: title, description, requirements
+- Candidatos: bio, experiencia_profissional, habilidades
+
+Tokenização em português: minúsculas, sem acentos, stopwords removidas;
+"c#" e "c++" são preservados. Pesos TF sublinear (1 + log tf) x IDF suavizado,
+linhas normalizadas (L2), de modo que a similaridade de cosseno é um produto
+escalar. As matrizes ficam em formato CSR (data / indices / indptr) e a consulta
+é um produto matriz esparsa x vetor feito com numpy.
+
+Construção e gravação do índice (ex.: junto do cálculo em lote de recomendações):
+
+    python -m app.services.similaridade_textual
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Candidate, Job
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS_PT = frozenset("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre era essa esse esta
+este eu foi for ha isso isto ja la lhe mais mas me mesmo meu minha muito na nas nao nem no nos nossa nosso
+num numa o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus sua suas so
+tambem te tem ter um uma umas uns voce voces sobre apos cada onde todo toda todos todas outro outra
+vaga vagas requisito requisitos desejavel desejaveis conhecimento conhecimentos experiencia anos ano
+""".split())
+
+_PADRAO_TOKEN = re.compile(r"[a-z0-9][a-z0-9#+]*")
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Tokens normalizados (sem acentos, minúsculas, sem stopwords)"""
+    if not texto:
+        return []
+    sem_acentos = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    return [
+        token for token in _PADRAO_TOKEN.findall(sem_acentos)
+        if len(token) > 1 and token not in STOPWORDS_PT
+    ]
+
+
+def _texto_json(valor: Optional[str]) -> str:
+    """Campos JSON (experiências, habilidades) viram apenas os seus textos, sem as chaves"""
+    if not valor:
+        return ""
+    try:
+        dados = json.loads(valor)
+    except (TypeError, ValueError):
+        return valor
+
+    partes: List[str] = []
+
+    def _coletar(item):
+        if isinstance(item, str):
+            partes.append(item)
+        elif isinstance(item, dict):
+            for valor_item in item.values():
+                _coletar(valor_item)
+        elif isinstance(item, list):
+            for valor_item in item:
+                _coletar(valor_item)
+
+    _coletar(dados)
+    return " ".join(partes)
+
+
+def texto_vaga(vaga: Job) -> str:
+    return " ".join(filter(None, [vaga.title, vaga.description, vaga.requirements]))
+
+
+def _texto_perfil(bio: Optional[str], experiencia_profissional: Optional[str], habilidades: Optional[str]) -> str:
+    return " ".join(filter(None, [bio, _texto_json(experiencia_profissional), _texto_json(habilidades)]))
+
+
+def texto_candidato(candidate: Candidate) -> str:
+    return _texto_perfil(candidate.bio, candidate.experiencia_profissional, candidate.habilidades)
+
+
+class MatrizEsparsa:
+    """Matriz CSR com linhas identificadas por id (job_id ou candidate_id)"""
+
+    def __init__(self, ids: np.ndarray, data: np.ndarray, indices: np.ndarray, indptr: np.ndarray):
+        self.ids = ids
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.linha_por_id: Dict[int, int] = {int(id_): linha for linha, id_ in enumerate(ids.tolist())}
+
+    def produto(self, vetor: np.ndarray) -> np.ndarray:
+        """Matriz x vetor denso: similaridade de cosseno de cada linha com o vetor"""
+        resultado = np.zeros(len(self.ids), dtype=np.float32)
+        if not len(self.data):
+            return resultado
+        parciais = self.data * vetor[self.indices]
+        nao_vazias = np.flatnonzero(np.diff(self.indptr))
+        if len(nao_vazias):
+            resultado[nao_vazias] = np.add.reduceat(parciais, self.indptr[nao_vazias])
+        return resultado
+
+    def linha_densa(self, id_: int, dimensao: int) -> Optional[np.ndarray]:
+        linha = self.linha_por_id.get(id_)
+        if linha is None:
+            return None
+        vetor = np.zeros(dimensao, dtype=np.float32)
+        inicio, fim = self.indptr[linha], self.indptr[linha + 1]
+        vetor[self.indices[inicio:fim]] = self.data[inicio:fim]
+        return vetor
+
+
+class IndiceTfIdf:
+    """Vocabulário + IDF e as matrizes TF-IDF de vagas e candidatos"""
+
+    def __init__(self, vocabulario: Dict[str, int], idf: np.ndarray, vagas: MatrizEsparsa, candidatos: MatrizEsparsa):
+        self.vocabulario = vocabulario
+        self.idf = idf
+        self.vagas = vagas
+        self.candidatos = candidatos
+
+    @property
+    def dimensao(self) -> int:
+        return len(self.vocabulario)
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def construir(cls, documentos_vagas: Dict[int, str], documentos_candidatos: Dict[int, str]) -> "IndiceTfIdf":
+        tokens_vagas = {id_: tokenizar(texto) for id_, texto in documentos_vagas.items()}
+        tokens_candidatos = {id_: tokenizar(texto) for id_, texto in documentos_candidatos.items()}
+
+        # Frequência de documento sobre o corpus completo (vagas + candidatos)
+        frequencia_documento: Dict[str, int] = {}
+        for tokens in list(tokens_vagas.values()) + list(tokens_candidatos.values()):
+            for token in set(tokens):
+                frequencia_documento[token] = frequencia_documento.get(token, 0) + 1
+
+        vocabulario = {token: indice for indice, token in enumerate(sorted(frequencia_documento))}
+        total_documentos = len(tokens_vagas) + len(tokens_candidatos)
+        df = np.array([frequencia_documento[token] for token in sorted(frequencia_documento)], dtype=np.float32)
+        idf = (np.log((1 + total_documentos) / (1 + df)) + 1).astype(np.float32)
+
+        indice = cls(vocabulario, idf, None, None)
+        indice.vagas = indice._matriz(tokens_vagas)
+        indice.candidatos = indice._matriz(tokens_candidatos)
+        return indice
+
+    def _pesos(self, tokens: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(índices, pesos normalizados) de um documento; tokens fora do vocabulário são ignorados"""
+        contagem: Dict[int, int] = {}
+        for token in tokens:
+            coluna = self.vocabulario.get(token)
+            if coluna is not None:
+                contagem[coluna] = contagem.get(coluna, 0) + 1
+        if not contagem:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        colunas = np.fromiter(sorted(contagem), dtype=np.int32, count=len(contagem))
+        tf = np.array([contagem[coluna] for coluna in colunas.tolist()], dtype=np.float32)
+        pesos = (1 + np.log(tf)) * self.idf[colunas]
+        return colunas, (pesos / np.linalg.norm(pesos)).astype(np.float32)
+
+    def _matriz(self, documentos: Dict[int, List[str]]) -> MatrizEsparsa:
+        ids = np.array(list(documentos), dtype=np.int64)
+        dados, indices, indptr = [], [], [0]
+        for tokens in documentos.values():
+            colunas, pesos = self._pesos(tokens)
+            indices.append(colunas)
+            dados.append(pesos)
+            indptr.append(indptr[-1] + len(colunas))
+        return MatrizEsparsa(
+            ids,
+            np.concatenate(dados) if dados else np.zeros(0, dtype=np.float32),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.array(indptr, dtype=np.int64)
+        )
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def vetorizar(self, texto: str) -> np.ndarray:
+        """Vetor denso normalizado de um texto fora do índice"""
+        vetor = np.zeros(self.dimensao, dtype=np.float32)
+        colunas, pesos = self._pesos(tokenizar(texto))
+        vetor[colunas] = pesos
+        return vetor
+
+    @staticmethod
+    def _similaridades(
+        matriz: MatrizEsparsa,
+        consulta: np.ndarray,
+        documentos: Dict[int, str],
+        vetorizar
+    ) -> Dict[int, float]:
+        """Similaridade da consulta com cada documento (do índice; os novos são vetorizados na hora)"""
+        todas = matriz.produto(consulta)
+        resultado = {}
+        for id_, texto in documentos.items():
+            linha = matriz.linha_por_id.get(id_)
+            if linha is not None:
+                resultado[id_] = float(todas[linha])
+            else:
+                resultado[id_] = float(vetorizar(texto) @ consulta)
+        return resultado
+
+    def similaridades_candidato_vagas(self, candidate: Candidate, vagas: List[Job]) -> Dict[int, float]:
+        """job_id -> similaridade de cosseno (0-1) com o perfil do candidato"""
+        consulta = self.candidatos.linha_densa(candidate.id, self.dimensao)
+        if consulta is None:
+            consulta = self.vetorizar(texto_candidato(candidate))
+        return self._similaridades(
+            self.vagas, consulta, {vaga.id: texto_vaga(vaga) for vaga in vagas}, self.vetorizar
+        )
+
+    def similaridades_vaga_candidatos(self, db: Session, vaga: Job, candidate_ids: List[int]) -> Dict[int, float]:
+        """candidate_id -> similaridade de cosseno (0-1) com a vaga"""
+        consulta = self.vagas.linha_densa(vaga.id, self.dimensao)
+        if consulta is None:
+            consulta = self.vetorizar(texto_vaga(vaga))
+
+        todas = self.candidatos.produto(consulta)
+        resultado: Dict[int, float] = {}
+        fora_do_indice = []
+        for candidate_id in candidate_ids:
+            linha = self.candidatos.linha_por_id.get(candidate_id)
+            if linha is None:
+                fora_do_indice.append(candidate_id)
+            else:
+                resultado[candidate_id] = float(todas[linha])
+
+        if fora_do_indice:
+            for candidate in db.query(Candidate).filter(Candidate.id.in_(fora_do_indice)):
+                resultado[candidate.id] = float(self.vetorizar(texto_candidato(candidate)) @ consulta)
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def salvar(self, caminho: str) -> None:
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{caminho}.tmp.npz"
+        np.savez_compressed(
+            temporario,
+            vocabulario=np.array(sorted(self.vocabulario, key=self.vocabulario.get)),
+            idf=self.idf,
+            **{f"vagas_{campo}": getattr(self.vagas, campo) for campo in ("ids", "data", "indices", "indptr")},
+            **{f"candidatos_{campo}": getattr(self.candidatos, campo) for campo in ("ids", "data", "indices", "indptr")}
+        )
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "IndiceTfIdf":
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            vocabulario = {str(token): indice for indice, token in enumerate(arquivo["vocabulario"].tolist())}
+            return cls(
+                vocabulario,
+                arquivo["idf"],
+                MatrizEsparsa(*(arquivo[f"vagas_{campo}"] for campo in ("ids", "data", "indices", "indptr"))),
+                MatrizEsparsa(*(arquivo[f"candidatos_{campo}"] for campo in ("ids", "data", "indices", "indptr")))
+            )
+
+
+# Índice carregado do disco (recarregado quando o arquivo muda)
+_indice: Optional[IndiceTfIdf] = None
+_indice_mtime: Optional[float] = None
+_indice_lock = threading.Lock()
+
+
+def obter_indice() -> Optional[IndiceTfIdf]:
+    """Índice gravado em settings.INDICE_TFIDF_ARQUIVO, ou None se ainda não foi construído"""
+    global _indice, _indice_mtime
+    try:
+        mtime = os.path.getmtime(settings.INDICE_TFIDF_ARQUIVO)
+    except OSError:
+        return None
+
+    with _indice_lock:
+        if _indice is None or mtime != _indice_mtime:
+            try:
+                _indice = IndiceTfIdf.carregar(settings.INDICE_TFIDF_ARQUIVO)
+                _indice_mtime = mtime
+            except Exception as e:
+                logger.error(f"Erro ao carregar índice TF-IDF: {str(e)}", exc_info=True)
+                return None
+        return _indice
+
+
+def construir_indice(db: Session) -> IndiceTfIdf:
+    """Monta o índice com todas as vagas e candidatos ativos"""
+    vagas = db.query(Job.id, Job.title, Job.description, Job.requirements).all()
+    candidatos = db.query(
+        Candidate.id, Candidate.bio, Candidate.experiencia_profissional, Candidate.habilidades
+    ).filter(Candidate.is_active == True).all()
+
+    return IndiceTfIdf.construir(
+        {id_: " ".join(filter(None, [titulo, descricao, requisitos])) for id_, titulo, descricao, requisitos in vagas},
+        {id_: _texto_perfil(bio, experiencia, habilidades) for id_, bio, experiencia, habilidades in candidatos}
+    )
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        indice = construir_indice(db)
+    finally:
+        db.close()
+    indice.salvar(settings.INDICE_TFIDF_ARQUIVO)
+    logger.info(
+        f"Índice TF-IDF gravado em {settings.INDICE_TFIDF_ARQUIVO}: "
+        f"{len(indice.vagas.ids)} vagas, {len(indice.candidatos.ids)} candidatos, {indice.dimensao} termos"
+    )
@@ -0,0 +1,305 @@
+"""
+Índice MinHash/LSH de vagas semelhantes
+
+Cada vaga é representada pelos shingles (trigramas de palavras) de
+description + requirements, com a mesma tokenização do índice TF-IDF.
+A assinatura MinHash (NUM_PERMUTACOES mínimos de hashes multiply-shift) estima
+a similaridade de Jaccard entre os conjuntos de shingles; as assinaturas são
+gravadas em assinaturas_vagas quando a vaga é publicada ou editada.
+
+O índice LSH por bandas (BANDAS x LINHAS) fica em memória: a consulta visita
+apenas as vagas que colidem em alguma banda, sem comparar com todas as vagas
+abertas. Com 32 bandas de 4 linhas, pares com Jaccard >= ~0.42 colidem com alta
+probabilidade.
+
+O índice é só leitura de assinaturas_vagas: o processo que publica/edita a vaga
+atualiza o próprio índice após o commit (no executor compartilhado, com as vagas
+de commits seguidos unidas em um lote), e os demais workers recarregam após
+VAGAS_SIMILARES_TTL_SEGUNDOS. Vagas abertas publicadas antes das assinaturas
+são calculadas uma vez pela linha de comando:
+
+    python -m app.services.vagas_similares
+"""
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import logging
+import threading
+import time
+import zlib
+
+import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.segundo_plano import FilaIds
+from app.models import Job, AssinaturaVaga
+from app.models.job import JobStatus
+from app.services.similaridade_textual import tokenizar
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_SHINGLE = 3
+BANDAS = 32
+LINHAS = 4
+NUM_PERMUTACOES = BANDAS * LINHAS
+SEMENTE = 20261016
+
+CHAVE_VAGAS_SIMILARES_ALTERADAS = "vagas_similares_alteradas"
+
+# Família multiply-shift: h(x) = ((a * x + b) mod 2^64) >> 32, com "a" ímpar
+_rng = np.random.default_rng(SEMENTE)
+_A = _rng.integers(1, 2 ** 63, size=NUM_PERMUTACOES, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, size=NUM_PERMUTACOES, dtype=np.uint64)
+
+
+def shingles_vaga(description: Optional[str], requirements: Optional[str]) -> np.ndarray:
+    """Hashes (crc32, estáveis entre processos) dos trigramas de palavras da vaga"""
+    tokens = tokenizar(f"{description or ''} {requirements or ''}")
+    if len(tokens) < TAMANHO_SHINGLE:
+        shingles = set(tokens)
+    else:
+        shingles = {
+            " ".join(tokens[i:i + TAMANHO_SHINGLE])
+            for i in range(len(tokens) - TAMANHO_SHINGLE + 1)
+        }
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def calcular_assinatura(description: Optional[str], requirements: Optional[str]) -> Optional[np.ndarray]:
+    """Assinatura MinHash (uint32[NUM_PERMUTACOES]); None para vaga sem texto"""
+    shingles = shingles_vaga(description, requirements)
+    if not len(shingles):
+        return None
+    hashes = (np.multiply.outer(_A, shingles) + _B[:, np.newaxis]) >> np.uint64(32)
+    return hashes.min(axis=1).astype(np.uint32)
+
+
+class IndiceVagasSimilares:
+    """Assinaturas das vagas abertas + buckets LSH por banda"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._assinaturas: Dict[int, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(BANDAS)]
+        self.carregado = False
+        self.carregado_em = 0.0
+
+    def __len__(self) -> int:
+        return len(self._assinaturas)
+
+    @staticmethod
+    def _chaves_bandas(assinatura: np.ndarray) -> List[bytes]:
+        return [assinatura[banda * LINHAS:(banda + 1) * LINHAS].tobytes() for banda in range(BANDAS)]
+
+    def inserir(self, job_id: int, assinatura: np.ndarray) -> None:
+        with self._lock:
+            self.remover(job_id)
+            self._assinaturas[job_id] = assinatura
+            for banda, chave in enumerate(self._chaves_bandas(assinatura)):
+                self._buckets[banda].setdefault(chave, set()).add(job_id)
+
+    def remover(self, job_id: int) -> None:
+        with self._lock:
+            assinatura = self._assinaturas.pop(job_id, None)
+            if assinatura is None:
+                return
+            for banda, chave in enumerate(self._chaves_bandas(assinatura)):
+                bucket = self._buckets[banda].get(chave)
+                if bucket is not None:
+                    bucket.discard(job_id)
+                    if not bucket:
+                        del self._buckets[banda][chave]
+
+    def similares(self, job_id: int, k: int = 5) -> List[Tuple[int, float]]:
+        """As k vagas mais semelhantes (job_id, Jaccard estimado 0-1), da mais à menos semelhante"""
+        with self._lock:
+            assinatura = self._assinaturas.get(job_id)
+            if assinatura is None:
+                return []
+
+            candidatas: Set[int] = set()
+            for banda, chave in enumerate(self._chaves_bandas(assinatura)):
+                candidatas.update(self._buckets[banda].get(chave, ()))
+            candidatas.discard(job_id)
+
+            return heapq.nlargest(
+                k,
+                (
+                    (candidata, float(np.count_nonzero(self._assinaturas[candidata] == assinatura)) / NUM_PERMUTACOES)
+                    for candidata in candidatas
+                ),
+                key=lambda item: item[1]
+            )
+
+    @property
+    def expirado(self) -> bool:
+        return (
+            not self.carregado
+            or time.monotonic() - self.carregado_em > settings.VAGAS_SIMILARES_TTL_SEGUNDOS
+        )
+
+    def carregar(self, db: Session) -> None:
+        """(Re)carrega as assinaturas gravadas das vagas abertas; não escreve no banco"""
+        vagas = db.query(AssinaturaVaga.job_id, AssinaturaVaga.assinatura).join(
+            Job, Job.id == AssinaturaVaga.job_id
+        ).filter(Job.status == JobStatus.ABERTA).all()
+
+        assinaturas: Dict[int, np.ndarray] = {}
+        buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(BANDAS)]
+        for job_id, gravada in vagas:
+            assinatura = np.frombuffer(gravada, dtype=np.uint32)
+            assinaturas[job_id] = assinatura
+            for banda, chave in enumerate(self._chaves_bandas(assinatura)):
+                buckets[banda].setdefault(chave, set()).add(job_id)
+
+        with self._lock:
+            self._assinaturas = assinaturas
+            self._buckets = buckets
+            self.carregado = True
+            self.carregado_em = time.monotonic()
+        logger.info(f"Índice de vagas semelhantes carregado: {len(self)} vagas")
+
+
+# Índice do processo (carregado no primeiro uso e recarregado após o TTL)
+indice_vagas_similares = IndiceVagasSimilares()
+_carga_lock = threading.Lock()
+
+
+def obter_indice_vagas_similares(db: Session) -> IndiceVagasSimilares:
+    """Índice pronto para consulta (recarregado de assinaturas_vagas quando expira)"""
+    if indice_vagas_similares.expirado:
+        with _carga_lock:
+            if indice_vagas_similares.expirado:
+                indice_vagas_similares.carregar(db)
+    return indice_vagas_similares
+
+
+def calcular_assinaturas_faltantes() -> int:
+    """Grava a assinatura das vagas abertas que ainda não têm (linha de comando)"""
+    db = SessionLocal()
+    try:
+        vagas = db.query(Job.id, Job.description, Job.requirements).outerjoin(
+            AssinaturaVaga, AssinaturaVaga.job_id == Job.id
+        ).filter(Job.status == JobStatus.ABERTA, AssinaturaVaga.job_id.is_(None)).all()
+
+        faltantes = []
+        for job_id, description, requirements in vagas:
+            assinatura = calcular_assinatura(description, requirements)
+            if assinatura is not None:
+                faltantes.append({"job_id": job_id, "assinatura": assinatura.tobytes()})
+
+        if faltantes:
+            db.execute(insert(AssinaturaVaga).values(faltantes).on_conflict_do_nothing())
+            db.commit()
+        return len(faltantes)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def atualizar_vagas(job_ids: List[int]) -> None:
+    """
+    Recalcula e grava as assinaturas das vagas em sessão própria (executor, após o commit).
+    Vaga encerrada, excluída ou sem texto perde a linha em assinaturas_vagas.
+    """
+    db = SessionLocal()
+    try:
+        vagas = {
+            job_id: (status, description, requirements)
+            for job_id, status, description, requirements in db.query(
+                Job.id, Job.status, Job.description, Job.requirements
+            ).filter(Job.id.in_(job_ids))
+        }
+        assinaturas = {}
+        for job_id in job_ids:
+            status, description, requirements = vagas.get(job_id, (None, None, None))
+            assinatura = calcular_assinatura(description, requirements) if status == JobStatus.ABERTA else None
+            assinaturas[job_id] = assinatura
+            if assinatura is None:
+                continue
+
+            db.execute(
+                insert(AssinaturaVaga)
+                .values(job_id=job_id, assinatura=assinatura.tobytes())
+                .on_conflict_do_update(
+                    index_elements=[AssinaturaVaga.job_id],
+                    set_={"assinatura": assinatura.tobytes(), "calculado_em": func.now()}
+                )
+            )
+
+        sem_assinatura = [job_id for job_id, assinatura in assinaturas.items() if assinatura is None]
+        if sem_assinatura:
+            db.query(AssinaturaVaga).filter(
+                AssinaturaVaga.job_id.in_(sem_assinatura)
+            ).delete(synchronize_session=False)
+        db.commit()
+
+        # Índice deste processo atualizado só depois que as assinaturas estão gravadas
+        if indice_vagas_similares.carregado:
+            for job_id, assinatura in assinaturas.items():
+                if assinatura is None:
+                    indice_vagas_similares.remover(job_id)
+                else:
+                    indice_vagas_similares.inserir(job_id, assinatura)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro ao atualizar assinaturas de vagas semelhantes: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+
+_fila_assinaturas = FilaIds("assinaturas de vagas semelhantes", atualizar_vagas)
+
+
+# ============================================================================
+# Assinatura calculada na publicação / edição do texto; vaga encerrada sai do índice
+# ============================================================================
+
+@event.listens_for(Session, "after_flush")
+def _registrar_vagas_similares_alteradas(session, flush_context):
+    """Guarda as vagas publicadas, encerradas ou com texto alterado no flush"""
+    from sqlalchemy import inspect
+
+    alteradas = [vaga.id for vaga in session.deleted if isinstance(vaga, Job)]
+    for vaga in list(session.new) + list(session.dirty):
+        if not isinstance(vaga, Job):
+            continue
+        estado = inspect(vaga)
+        if vaga in session.new or any(
+            estado.attrs[campo].history.has_changes()
+            for campo in ("status", "description", "requirements")
+        ):
+            alteradas.append(vaga.id)
+
+    if alteradas:
+        session.info.setdefault(CHAVE_VAGAS_SIMILARES_ALTERADAS, set()).update(alteradas)
+
+
+@event.listens_for(Session, "after_commit")
+def _atualizar_vagas_similares(session):
+    """Após o commit, recalcula as assinaturas em segundo plano"""
+    job_ids = session.info.pop(CHAVE_VAGAS_SIMILARES_ALTERADAS, None)
+    if not job_ids:
+        return
+    _fila_assinaturas.agendar(job_ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_vagas_similares_alteradas(session, previous_transaction):
+    """Alterações desfeitas não recalculam assinaturas"""
+    session.info.pop(CHAVE_VAGAS_SIMILARES_ALTERADAS, None)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    total = calcular_assinaturas_faltantes()
+    logger.info(f"Assinaturas de vagas semelhantes calculadas: {total} vagas")
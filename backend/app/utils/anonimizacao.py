@@ -2,8 +2,16 @@
 Utilitários para anonimização de dados de candidatos
 """
 import hashlib
-from typing import Optional
+from typing import Optional, List
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, selectinload
 from app.models.candidate import Candidate
+from app.models.candidato_teste import CandidatoTeste
+from app.models.competencia import AutoavaliacaoCompetencia
+
+
+# Relacionamentos lidos por anonimizar_candidato
+RELACIONAMENTOS_ANONIMIZACAO = ("formacoes_academicas_rel", "candidato_testes", "autoavaliacoes_competencias")
 
 
 def gerar_id_anonimo(candidate_id: int, cpf: str) -> str:
@@ -26,6 +34,68 @@ def gerar_id_anonimo(candidate_id: int, cpf: str) -> str:
     return f"CAND-{hash_hex}"
 
 
+def buscar_candidato_por_id_anonimo(db: Session, id_anonimo: str) -> Optional[Candidate]:
+    """
+    Busca o candidato pelo ID anônimo usando a coluna indexada candidates.id_anonimo
+    
+    Args:
+        db: Session do banco
+        id_anonimo: ID fictício (ex: CAND-A1B2C3D4)
+    
+    Returns:
+        Candidate correspondente ou None
+    """
+    if not id_anonimo:
+        return None
+    
+    # O hash é truncado em 8 caracteres: em caso de colisão, vale o candidato mais antigo
+    return db.query(Candidate).filter(
+        Candidate.id_anonimo == id_anonimo.upper()
+    ).order_by(Candidate.id).first()
+
+
+def opcoes_carregamento_anonimizacao() -> tuple:
+    """
+    Loader options (selectinload) com tudo que anonimizar_candidato acessa.
+    Usar em queries que listam candidatos para anonimizar: o custo passa a ser
+    um número constante de queries, independente do tamanho da página.
+    
+    Exemplo:
+        db.query(Candidate).options(*opcoes_carregamento_anonimizacao())
+    """
+    return (
+        selectinload(Candidate.formacoes_academicas_rel),
+        selectinload(Candidate.candidato_testes).selectinload(CandidatoTeste.test),
+        selectinload(Candidate.autoavaliacoes_competencias).selectinload(AutoavaliacaoCompetencia.competencia),
+    )
+
+
+def anonimizar_candidatos(db: Session, candidates: List[Candidate]) -> List[dict]:
+    """
+    Anonimiza uma lista de candidatos, mantendo a ordem
+    
+    Se algum candidato ainda não tem os relacionamentos carregados, todos são
+    pré-carregados de uma vez (selectinload) antes de anonimizar.
+    
+    Args:
+        db: Session do banco
+        candidates: Candidatos a anonimizar
+    
+    Returns:
+        Lista de dicionários anônimos na mesma ordem de candidates
+    """
+    pendentes = [
+        c.id for c in candidates
+        if inspect(c).unloaded.intersection(RELACIONAMENTOS_ANONIMIZACAO)
+    ]
+    if pendentes:
+        db.query(Candidate).filter(
+            Candidate.id.in_(pendentes)
+        ).options(*opcoes_carregamento_anonimizacao()).populate_existing().all()
+    
+    return [anonimizar_candidato(c) for c in candidates]
+
+
 def anonimizar_candidato(candidate: Candidate, db=None) -> dict:
     """
     Converte um objeto Candidate em um dicionário anônimo completo
@@ -78,7 +148,7 @@ def anonimizar_candidato(candidate: Candidate, db=None) -> dict:
     
     return {
         # ID anônimo
-        "id_anonimo": gerar_id_anonimo(candidate.id, candidate.cpf),
+        "id_anonimo": candidate.id_anonimo or gerar_id_anonimo(candidate.id, candidate.cpf),
         
         # Dados pessoais (sem identificação)
         "birth_date": candidate.birth_date.isoformat() if candidate.birth_date else None,
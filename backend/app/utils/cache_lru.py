@@ -0,0 +1,92 @@
+"""
+Cache LRU em memória (por processo) com métricas de acerto
+
+Com ttl_segundos, cada item expira após esse tempo: invalidações feitas em outro
+processo (worker) passam a valer no máximo ttl_segundos depois.
+
+Thread-safe: os endpoints síncronos do FastAPI rodam em threads do pool e os
+recálculos de matching rodam em threads próprias.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class CacheLRU:
+    """Dicionário limitado a max_itens; o item usado há mais tempo é descartado primeiro"""
+
+    def __init__(self, max_itens: int, ttl_segundos: Optional[float] = None):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        # chave -> (valor, instante de gravação em time.monotonic())
+        self._itens: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: valores calculados antes dela não são gravados
+        self._geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.expirados = 0
+        self.invalidacoes = 0
+
+    @property
+    def geracao(self) -> int:
+        return self._geracao
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Valor em cache (ou None), marcando-o como usado recentemente"""
+        with self._lock:
+            if chave not in self._itens:
+                self.falhas += 1
+                return None
+            valor, gravado_em = self._itens[chave]
+            if self.ttl_segundos is not None and time.monotonic() - gravado_em > self.ttl_segundos:
+                del self._itens[chave]
+                self.expirados += 1
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def definir(self, chave: Hashable, valor: Any, geracao: Optional[int] = None) -> None:
+        """
+        Grava o valor descartando os itens menos usados além de max_itens.
+        Com geracao informada, não grava se houve invalidação durante o cálculo.
+        """
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._itens[chave] = (valor, time.monotonic())
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.descartes += 1
+
+    def invalidar(self, chave: Hashable) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else None,
+                "descartes": self.descartes,
+                "expirados": self.expirados,
+                "ttl_segundos": self.ttl_segundos,
+                "invalidacoes": self.invalidacoes,
+            }
@@ -0,0 +1,53 @@
+"""
+Extração das tecnologias citadas nos requisitos de uma vaga
+
+Um único regex pré-compilado (alternância das palavras-chave, mais longas primeiro)
+com fronteira de palavra: "ts", "js" e "api" não casam mais dentro de outras
+palavras ("requisitos", "jsonb", "rapidez").
+"""
+import re
+from typing import Dict, FrozenSet, List, Optional
+
+
+# Tecnologia canônica -> palavras-chave que a identificam nos requisitos
+TECNOLOGIAS_COMUNS: Dict[str, List[str]] = {
+    "python": ["python", "django", "flask", "fastapi"],
+    "javascript": ["javascript", "js", "node", "nodejs"],
+    "react": ["react", "reactjs"],
+    "typescript": ["typescript", "ts"],
+    "java": ["java"],
+    "c#": ["c#", "csharp", "dotnet"],
+    "sql": ["sql", "postgres", "postgresql", "mysql", "oracle"],
+    "nosql": ["nosql", "mongodb", "redis"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "aws": ["aws", "amazon"],
+    "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"],
+    "git": ["git", "github", "gitlab"],
+    "rest": ["rest", "api"],
+    "graphql": ["graphql"],
+}
+
+_TECNOLOGIA_POR_PALAVRA: Dict[str, str] = {
+    palavra: tecnologia
+    for tecnologia, palavras in TECNOLOGIAS_COMUNS.items()
+    for palavra in palavras
+}
+
+# Letras, dígitos, "_", "#" e "+" fazem parte do token (c#, c++); "." e "-" separam (node.js, ci-cd)
+_PADRAO_TECNOLOGIAS = re.compile(
+    r"(?<![\w#+])(" +
+    "|".join(re.escape(p) for p in sorted(_TECNOLOGIA_POR_PALAVRA, key=len, reverse=True)) +
+    r")(?![\w#+])"
+)
+
+
+def extrair_habilidades(requisitos: Optional[str]) -> FrozenSet[str]:
+    """Tecnologias canônicas (chaves de TECNOLOGIAS_COMUNS) mencionadas no texto"""
+    if not requisitos:
+        return frozenset()
+    return frozenset(
+        _TECNOLOGIA_POR_PALAVRA[palavra]
+        for palavra in _PADRAO_TECNOLOGIAS.findall(requisitos.lower())
+    )
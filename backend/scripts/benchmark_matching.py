@@ -0,0 +1,103 @@
+"""
+Benchmark: matching por candidato (laço Python) x MotorMatching (vetorizado)
+
+Gera em memória uma vaga e N candidatos sintéticos (scripts/matching_legado.gerar_cenario)
+e mede duas etapas:
+
+- carga: linhas do banco -> dicionários (legado) x linhas -> matrizes (MotorMatching.montar_niveis).
+  O legado recebe todas as autoavaliações dos candidatos (como a consulta anterior); o motor,
+  só as das competências da vaga, já filtradas pela consulta de MotorMatching.calcular.
+  O tempo do banco não entra em nenhum dos lados.
+- matching: laço por candidato x requisito (legado) x MotorMatching.calcular_scores
+
+O resultado principal é o ganho de ponta a ponta (carga + matching), comparado com
+--ganho-minimo (padrão 20x); sai com código 1 se ficar abaixo dele. A carga continua
+O(linhas) em Python nos dois casos e domina o tempo do motor: o ganho de 20x é
+atingido na etapa de matching, não de ponta a ponta.
+
+    python -m scripts.benchmark_matching --candidatos 100000 --requisitos 8
+"""
+from typing import Callable, List
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from app.services.matching_engine import MotorMatching, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO
+from scripts.matching_legado import calcular_legado, gerar_cenario, indexar_legado
+
+logger = logging.getLogger(__name__)
+
+
+def _medir(funcao: Callable[[], object], repeticoes: int) -> List[float]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def executar(total_candidatos: int, total_requisitos: int, repeticoes: int, semente: int) -> float:
+    """Retorna o ganho de ponta a ponta (carga + matching, medianas legado / motor)"""
+    candidate_ids, requisitos, linhas_auto, linhas_mapa = gerar_cenario(
+        random.Random(semente), total_candidatos, total_requisitos
+    )
+    ids = np.array(candidate_ids, dtype=np.int64)
+    motor = MotorMatching(requisitos)
+    # Filtro feito no banco pela consulta do motor (competencia_id IN competências da vaga)
+    linhas_auto_vaga = [linha for linha in linhas_auto if linha[1] in motor.colunas_por_competencia]
+
+    mapa_por_candidato, autoavaliacao_map = indexar_legado(linhas_auto, linhas_mapa)
+    niveis_certificados, niveis_autoavaliacao = motor.montar_niveis(ids, linhas_auto_vaga, linhas_mapa)
+
+    carga_legado = statistics.median(_medir(lambda: indexar_legado(linhas_auto, linhas_mapa), repeticoes))
+    carga_motor = statistics.median(_medir(lambda: motor.montar_niveis(ids, linhas_auto_vaga, linhas_mapa), repeticoes))
+    matching_legado = statistics.median(_medir(
+        lambda: calcular_legado(
+            candidate_ids, requisitos, mapa_por_candidato, autoavaliacao_map, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO
+        ),
+        repeticoes
+    ))
+    matching_motor = statistics.median(_medir(
+        lambda: MotorMatching.calcular_scores(
+            niveis_certificados, niveis_autoavaliacao, motor.niveis_requeridos, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO
+        ),
+        repeticoes
+    ))
+    ganho = (carga_legado + matching_legado) / (carga_motor + matching_motor)
+
+    logger.info(
+        f"{total_candidatos} candidatos, {total_requisitos} requisitos, "
+        f"{len(linhas_auto)} autoavaliações ({len(linhas_auto_vaga)} das competências da vaga), "
+        f"{len(linhas_mapa)} linhas do mapa"
+    )
+    logger.info(f"{'':<10} {'legado':>12} {'motor':>12} {'ganho':>8}")
+    for nome, legado, vetorizado in (
+        ("carga", carga_legado, carga_motor),
+        ("matching", matching_legado, matching_motor),
+        ("total", carga_legado + matching_legado, carga_motor + matching_motor)
+    ):
+        logger.info(f"{nome:<10} {legado:9.1f} ms {vetorizado:9.1f} ms {legado / vetorizado:7.1f}x")
+    logger.info(f"ganho de ponta a ponta: {ganho:.1f}x")
+    return ganho
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidatos", type=int, default=100000)
+    parser.add_argument("--requisitos", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--ganho-minimo", type=float, default=20.0)
+    argumentos = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ganho = executar(argumentos.candidatos, argumentos.requisitos, argumentos.repeticoes, argumentos.semente)
+    if ganho < argumentos.ganho_minimo:
+        logger.info(f"meta de {argumentos.ganho_minimo:.0f}x de ponta a ponta não atingida")
+        sys.exit(1)
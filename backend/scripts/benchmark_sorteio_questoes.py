@@ -0,0 +1,112 @@
+"""
+Benchmark: sorteio de questões por ORDER BY random() x banco de questões em memória
+
+Cria uma habilidade sintética com N questões (4 alternativas cada) dentro de uma
+transação que é desfeita ao final, e mede o início de nível da certificação:
+
+- consulta: a consulta anterior de _obter_questoes_nivel
+  (join tests, ilike, NOT IN questoes_usadas, ORDER BY random() LIMIT 5)
+  + carregamento das alternativas das 5 questões
+- banco: banco_questoes.sortear (sem reposição, exclusões por set)
+
+    python -m scripts.benchmark_sorteio_questoes --questoes 10000 --repeticoes 200
+"""
+from typing import Callable, List
+import argparse
+import logging
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import func, insert
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.test import Test, Question, Alternative, TestLevel
+from app.services.banco_questoes import banco_questoes
+
+logger = logging.getLogger(__name__)
+
+QUESTOES_POR_NIVEL = 5
+QUESTOES_USADAS = 10  # básico + intermediário já respondidos
+
+
+def _medir(funcao: Callable[[], object], repeticoes: int) -> List[float]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def _resumo(nome: str, tempos: List[float]) -> str:
+    p95 = statistics.quantiles(tempos, n=20)[-1] if len(tempos) > 1 else tempos[0]
+    return f"{nome:<10} mediana {statistics.median(tempos):8.3f} ms | p95 {p95:8.3f} ms"
+
+
+def executar(total_questoes: int, repeticoes: int, semente: int) -> None:
+    db = SessionLocal()
+    try:
+        usuario = db.query(User.id).first()
+        if not usuario:
+            logger.error("Benchmark requer ao menos um usuário (tests.created_by)")
+            return
+
+        habilidade = f"benchmark-{uuid.uuid4().hex[:8]}"
+        teste = Test(nome=habilidade, habilidade=habilidade, nivel=TestLevel.basico, created_by=usuario.id)
+        db.add(teste)
+        db.flush()
+
+        db.execute(insert(Question), [
+            {"test_id": teste.id, "texto_questao": f"Questão {i}", "ordem": i}
+            for i in range(1, total_questoes + 1)
+        ])
+        ids = [question_id for question_id, in db.query(Question.id).filter(Question.test_id == teste.id)]
+        db.execute(insert(Alternative), [
+            {"question_id": question_id, "texto": f"Alternativa {ordem}", "is_correct": ordem == 1, "ordem": ordem}
+            for question_id in ids
+            for ordem in range(1, 5)
+        ])
+        db.flush()
+
+        rng = random.Random(semente)
+        usadas = rng.sample(ids, QUESTOES_USADAS)
+
+        def consulta():
+            questoes = db.query(Question).join(Test).filter(
+                Test.habilidade.ilike(f"%{habilidade}%"),
+                Test.nivel == TestLevel.basico
+            ).filter(~Question.id.in_(usadas)).order_by(func.random()).limit(QUESTOES_POR_NIVEL).all()
+            return [[alt.id for alt in questao.alternatives] for questao in questoes]
+
+        def banco():
+            questoes = banco_questoes.sortear(
+                db, habilidade, TestLevel.basico, QUESTOES_POR_NIVEL, excluir=set(usadas), rng=rng
+            )
+            return [[alt.id for alt in questao.alternatives] for questao in questoes]
+
+        banco_questoes.invalidar()
+        carga = _medir(banco, 1)
+
+        logger.info(f"{total_questoes} questões na habilidade, {repeticoes} repetições, {QUESTOES_USADAS} excluídas")
+        logger.info(_resumo("consulta", _medir(consulta, repeticoes)))
+        logger.info(_resumo("banco", _medir(banco, repeticoes)))
+        logger.info(f"banco: carga inicial (todas as questões) {carga[0]:.1f} ms")
+    finally:
+        # Nada do benchmark é gravado; o banco em memória volta a refletir o banco de dados
+        db.rollback()
+        db.close()
+        banco_questoes.invalidar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questoes", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    argumentos = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    executar(argumentos.questoes, argumentos.repeticoes, argumentos.semente)
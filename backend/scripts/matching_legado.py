@@ -0,0 +1,151 @@
+"""
+Matching prioritizado por candidato (implementação anterior ao MotorMatching)
+
+Referência do benchmark (scripts/benchmark_matching.py) e oráculo dos testes de
+paridade (tests/test_matching_engine.py): mesma lógica do laço de
+EmpresaService.obter_candidatos_para_vaga_v2 antes da vetorização, sobre linhas
+com as mesmas colunas que o MotorMatching recebe do banco.
+"""
+import random
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+
+def matching_legado(
+    candidate_ids: List[int],
+    requisitos: list,
+    linhas_auto: List[Tuple[int, int, object]],
+    linhas_mapa: List[Tuple[int, str, Optional[int], Optional[int]]],
+    peso_certificacao: int,
+    peso_autoavaliacao: int
+) -> Dict[int, dict]:
+    """candidate_id -> atende_minimo, scores e competências atendidas (certificadas/autoavaliadas)"""
+    mapa_por_candidato, autoavaliacao_map = indexar_legado(linhas_auto, linhas_mapa)
+    return calcular_legado(
+        candidate_ids, requisitos, mapa_por_candidato, autoavaliacao_map, peso_certificacao, peso_autoavaliacao
+    )
+
+
+def indexar_legado(
+    linhas_auto: List[Tuple[int, int, object]],
+    linhas_mapa: List[Tuple[int, str, Optional[int], Optional[int]]]
+) -> Tuple[Dict[int, Dict[str, dict]], Dict[Tuple[int, int], int]]:
+    """Dicionários do matching anterior: mapa por (candidato, nome) e autoavaliação por (candidato, competência)"""
+    mapa_por_candidato: Dict[int, Dict[str, dict]] = {}
+    for candidate_id, competencia_nome, nivel_certificado, nivel_auto in linhas_mapa:
+        mapa_por_candidato.setdefault(candidate_id, {})[competencia_nome.lower()] = {
+            'certificado': nivel_certificado,
+            'autoavaliacao': nivel_auto
+        }
+
+    autoavaliacao_map = {
+        (candidate_id, competencia_id): int(nivel)
+        for candidate_id, competencia_id, nivel in linhas_auto
+    }
+    return mapa_por_candidato, autoavaliacao_map
+
+
+def calcular_legado(
+    candidate_ids: List[int],
+    requisitos: list,
+    mapa_por_candidato: Dict[int, Dict[str, dict]],
+    autoavaliacao_map: Dict[Tuple[int, int], int],
+    peso_certificacao: int,
+    peso_autoavaliacao: int
+) -> Dict[int, dict]:
+    """Laço por candidato x requisito sobre os dicionários de indexar_legado"""
+    resultado = {}
+    for candidate_id in candidate_ids:
+        score_certificacao = 0
+        score_autoavaliacao = 0
+        competencias_atendidas_cert = 0
+        competencias_atendidas_auto = 0
+        atende_minimo = True
+
+        mapa_candidato = mapa_por_candidato.get(candidate_id, {})
+
+        for requisito in requisitos:
+            nivel_requerido = int(requisito.nivel_minimo) if requisito.nivel_minimo else 0
+            competencia_nome = requisito.competencia.nome.lower() if requisito.competencia else ""
+
+            dados_mapa = mapa_candidato.get(competencia_nome, {})
+            nivel_certificado = dados_mapa.get('certificado')
+            nivel_auto = dados_mapa.get('autoavaliacao')
+
+            if nivel_auto is None and requisito.competencia_id:
+                nivel_auto = autoavaliacao_map.get((candidate_id, requisito.competencia_id))
+
+            if nivel_certificado is not None:
+                if nivel_certificado >= nivel_requerido:
+                    score_certificacao += nivel_certificado * peso_certificacao
+                    competencias_atendidas_cert += 1
+                else:
+                    atende_minimo = False
+            elif nivel_auto is not None:
+                if nivel_auto >= nivel_requerido:
+                    score_autoavaliacao += nivel_auto * peso_autoavaliacao
+                    competencias_atendidas_auto += 1
+                else:
+                    atende_minimo = False
+            else:
+                atende_minimo = False
+
+        resultado[candidate_id] = {
+            'atende_minimo': atende_minimo,
+            'score_certificacao': score_certificacao,
+            'score_autoavaliacao': score_autoavaliacao,
+            'competencias_certificadas': competencias_atendidas_cert,
+            'competencias_autoavaliadas': competencias_atendidas_auto
+        }
+
+    return resultado
+
+
+def gerar_cenario(
+    rng: random.Random,
+    total_candidatos: int,
+    total_requisitos: int,
+    total_competencias: int = 12
+) -> Tuple[List[int], list, list, list]:
+    """
+    Vaga e candidatos sintéticos: (candidate_ids, requisitos, linhas_auto, linhas_mapa).
+
+    Inclui os casos de borda do matching: requisito sem nível mínimo, competência
+    repetida na vaga, nomes com caixa diferente no MapaCompetencias, linhas repetidas
+    do mapa (a última prevalece) e níveis ausentes (None).
+    """
+    competencias = [
+        SimpleNamespace(id=competencia_id, nome=f"Competência {competencia_id}")
+        for competencia_id in range(1, total_competencias + 1)
+    ]
+
+    requisitos = []
+    for _ in range(total_requisitos):
+        competencia = rng.choice(competencias)
+        requisitos.append(SimpleNamespace(
+            competencia=competencia,
+            competencia_id=competencia.id,
+            nivel_minimo=rng.choice([None, "0", "1", "2", "3", "4"])
+        ))
+
+    candidate_ids = rng.sample(range(1, total_candidatos * 10 + 1), total_candidatos)
+
+    linhas_auto = []
+    linhas_mapa = []
+    for candidate_id in candidate_ids:
+        for competencia in rng.sample(competencias, rng.randint(0, total_competencias)):
+            linhas_auto.append((candidate_id, competencia.id, rng.randint(0, 4)))
+
+        for competencia in rng.sample(competencias, rng.randint(0, total_competencias // 2)):
+            nome = competencia.nome.upper() if rng.random() < 0.3 else competencia.nome
+            for _ in range(rng.choice([1, 1, 1, 2])):
+                linhas_mapa.append((
+                    candidate_id,
+                    nome,
+                    rng.choice([None, None, 0, 1, 2, 3, 4]),
+                    rng.choice([None, 0, 1, 2, 3, 4])
+                ))
+
+    rng.shuffle(linhas_auto)
+    rng.shuffle(linhas_mapa)
+    return candidate_ids, requisitos, linhas_auto, linhas_mapa
@@ -0,0 +1,80 @@
+"""
+BancoQuestoes: sorteio reprodutível com rng semeado, sem repetição e respeitando exclusões;
+memo de buscas por trecho limitado
+"""
+import random
+
+import pytest
+
+from app.models.test import TestLevel
+from app.services import banco_questoes as banco_questoes_modulo
+from app.services.banco_questoes import BancoQuestoes, QuestaoBanco
+
+
+def _banco(total: int) -> BancoQuestoes:
+    """Banco com `total` questões de 'python' básico, sem banco de dados"""
+    questoes = tuple(
+        QuestaoBanco(
+            id=question_id,
+            test_id=1,
+            texto_questao=f"Questão {question_id}",
+            ordem=question_id,
+            habilidade="Python",
+            nivel=TestLevel.basico,
+            alternatives=()
+        )
+        for question_id in range(1, total + 1)
+    )
+    banco = BancoQuestoes()
+
+    def carregar(db):
+        banco._por_grupo = {("python", TestLevel.basico): questoes}
+        banco._por_id = {questao.id: questao for questao in questoes}
+        banco._buscas = {}
+
+    banco._carregar = carregar
+    return banco
+
+
+def _ids(banco: BancoQuestoes, semente: int, excluir=()):
+    questoes = banco.sortear(None, "python", TestLevel.basico, 5, excluir=excluir, rng=random.Random(semente))
+    return [questao.id for questao in questoes]
+
+
+@pytest.mark.parametrize("total", [8, 1000])  # grupo pequeno (filtra e sorteia) e grande (índices aleatórios)
+def test_mesma_semente_mesmo_sorteio(total):
+    banco = _banco(total)
+
+    assert _ids(banco, 42) == _ids(banco, 42)
+    assert _ids(banco, 42, excluir={1, 2}) == _ids(banco, 42, excluir={1, 2})
+
+
+@pytest.mark.parametrize("total", [8, 1000])
+def test_sorteio_sem_repeticao_e_sem_excluidas(total):
+    banco = _banco(total)
+    excluir = {1, 2, 3}
+
+    for semente in range(50):
+        ids = _ids(banco, semente, excluir=excluir)
+        assert len(ids) == 5
+        assert len(set(ids)) == 5
+        assert not excluir & set(ids)
+
+
+def test_grupo_menor_que_a_quantidade_devolve_o_que_sobra():
+    banco = _banco(6)
+
+    assert sorted(_ids(banco, 7, excluir={1, 2, 3})) == [4, 5, 6]
+
+
+def test_buscas_por_trechos_arbitrarios_sao_limitadas(monkeypatch):
+    monkeypatch.setattr(banco_questoes_modulo, "MAX_BUSCAS_MEMORIZADAS", 3)
+    banco = _banco(8)
+
+    for indice in range(10):
+        banco.questoes(None, f"habilidade inexistente {indice}", TestLevel.basico)
+    assert len(banco._buscas) == 3
+
+    # Grupo cadastrado continua memorizado mesmo com o limite atingido
+    assert len(banco.questoes(None, "Python", TestLevel.basico)) == 8
+    assert ("python", TestLevel.basico) in banco._buscas
@@ -0,0 +1,40 @@
+"""
+CacheLRU: descarte do menos usado, geração e expiração por TTL
+"""
+from app.utils import cache_lru
+from app.utils.cache_lru import CacheLRU
+
+
+def test_descarta_o_menos_usado():
+    cache = CacheLRU(2)
+    cache.definir("a", 1)
+    cache.definir("b", 2)
+    cache.obter("a")
+    cache.definir("c", 3)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1
+    assert cache.estatisticas()["descartes"] == 1
+
+
+def test_valor_calculado_antes_da_invalidacao_nao_e_gravado():
+    cache = CacheLRU(10)
+    geracao = cache.geracao
+    cache.invalidar("a")
+    cache.definir("a", 1, geracao=geracao)
+
+    assert cache.obter("a") is None
+
+
+def test_item_expira_apos_ttl(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(cache_lru.time, "monotonic", lambda: agora[0])
+    cache = CacheLRU(10, ttl_segundos=60)
+    cache.definir("a", 1)
+
+    agora[0] += 60
+    assert cache.obter("a") == 1
+
+    agora[0] += 1
+    assert cache.obter("a") is None
+    assert cache.estatisticas()["expirados"] == 1
@@ -0,0 +1,171 @@
+"""
+Índice LSH de candidatos semelhantes: bookkeeping das inserções/remoções
+(a última linha ocupa a linha removida) e resultados contra o cosseno exato
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.services.candidatos_similares import IndiceCandidatosSimilares
+
+
+def _niveis_aleatorios(rng, total_candidatos, total_competencias=30, primeiro_id=1):
+    return {
+        candidate_id: {
+            competencia_id: rng.randint(1, 4)
+            for competencia_id in rng.sample(range(total_competencias), rng.randint(1, 8))
+        }
+        for candidate_id in range(primeiro_id, primeiro_id + total_candidatos)
+    }
+
+
+def _vetor(niveis, colunas):
+    vetor = np.zeros(colunas, dtype=np.float64)
+    for competencia_id, nivel in niveis.items():
+        vetor[competencia_id] = nivel
+    return vetor
+
+
+def _cosseno(a, b):
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def _verificar_consistencia(indice, esperado):
+    """Linhas, ids, vetores e buckets refletem exatamente os candidatos esperados"""
+    assert len(indice) == len(esperado)
+    assert set(indice._linha_por_id) == set(esperado)
+    for candidate_id, linha in indice._linha_por_id.items():
+        assert linha < len(indice)
+        assert indice._ids[linha] == candidate_id
+        assert indice._niveis[linha].tolist() == indice._vetor(esperado[candidate_id]).tolist()
+        assert indice._normas[linha] == pytest.approx(np.linalg.norm(indice._vetor(esperado[candidate_id]).astype(np.float32)))
+
+    for tabela, buckets in enumerate(indice._buckets):
+        ids_nos_buckets = [candidate_id for bucket in buckets.values() for candidate_id in bucket]
+        assert sorted(ids_nos_buckets) == sorted(esperado)
+        for chave, bucket in buckets.items():
+            assert bucket
+            for candidate_id in bucket:
+                assert indice._hashes[indice._linha_por_id[candidate_id], tabela] == chave
+
+
+def test_remover_linha_do_meio_move_a_ultima():
+    niveis = _niveis_aleatorios(random.Random(1), 5)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(niveis)
+    ultimo = int(indice._ids[len(indice) - 1])
+    linha_removida = indice._linha_por_id[2]
+
+    indice.remover(2)
+    del niveis[2]
+
+    assert indice._linha_por_id[ultimo] == linha_removida
+    _verificar_consistencia(indice, niveis)
+
+
+def test_remover_ultima_linha_e_candidato_ausente():
+    niveis = _niveis_aleatorios(random.Random(2), 4)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(niveis)
+
+    ultimo = int(indice._ids[len(indice) - 1])
+    indice.remover(ultimo)
+    del niveis[ultimo]
+    indice.remover(999)
+
+    _verificar_consistencia(indice, niveis)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_sequencia_de_insercoes_e_remocoes(semente):
+    rng = random.Random(semente)
+    esperado = _niveis_aleatorios(rng, 50)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(esperado)
+
+    for _ in range(300):
+        candidate_id = rng.randint(1, 80)
+        operacao = rng.random()
+        if operacao < 0.4:
+            indice.remover(candidate_id)
+            esperado.pop(candidate_id, None)
+        elif operacao < 0.9:
+            # Inserção ou atualização, às vezes com competências ainda não vistas pelo índice
+            niveis = _niveis_aleatorios(rng, 1, total_competencias=40, primeiro_id=candidate_id)[candidate_id]
+            indice.inserir(candidate_id, niveis)
+            esperado[candidate_id] = niveis
+        else:
+            # Sem nenhum nível: o candidato sai do índice
+            indice.inserir(candidate_id, {})
+            esperado.pop(candidate_id, None)
+
+    _verificar_consistencia(indice, esperado)
+
+
+def test_candidato_fora_do_indice():
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir({1: {0: 3}, 2: {}})
+
+    assert indice.similares(2) is None
+    assert indice.similares(3) is None
+    assert indice.similares(1) == []
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_similares_usa_cosseno_exato(semente):
+    rng = random.Random(semente)
+    niveis = _niveis_aleatorios(rng, 400)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(niveis)
+    vetores = {candidate_id: _vetor(valores, 30) for candidate_id, valores in niveis.items()}
+
+    for candidate_id in rng.sample(sorted(niveis), 20):
+        resultado = indice.similares(candidate_id, k=10)
+
+        assert len(resultado) == 10
+        assert candidate_id not in [similar_id for similar_id, _ in resultado]
+        similaridades = [similaridade for _, similaridade in resultado]
+        assert similaridades == sorted(similaridades, reverse=True)
+        for similar_id, similaridade in resultado:
+            assert similaridade == pytest.approx(_cosseno(vetores[candidate_id], vetores[similar_id]), abs=1e-5)
+
+
+def test_similares_com_poucos_vizinhos_e_exato():
+    # Menos candidatos que k: busca exata em todo o índice, igual ao ranking por força bruta
+    rng = random.Random(9)
+    niveis = _niveis_aleatorios(rng, 8)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(niveis)
+    vetores = {candidate_id: _vetor(valores, 30) for candidate_id, valores in niveis.items()}
+
+    resultado = indice.similares(1, k=20)
+
+    exato = sorted(
+        ((outro, _cosseno(vetores[1], vetores[outro])) for outro in vetores if outro != 1),
+        key=lambda par: -par[1]
+    )
+    assert [similaridade for _, similaridade in resultado] == pytest.approx([s for _, s in exato], abs=1e-5)
+    assert {similar_id for similar_id, _ in resultado} == set(vetores) - {1}
+
+
+def test_similares_recupera_a_maior_parte_do_top_k_exato():
+    # Vetores uniformemente aleatórios são o pior caso do LSH (revocação medida: ~0,7)
+    rng = random.Random(42)
+    niveis = _niveis_aleatorios(rng, 1000)
+    indice = IndiceCandidatosSimilares()
+    indice.reconstruir(niveis)
+    ids = sorted(niveis)
+    matriz = np.stack([_vetor(niveis[candidate_id], 30) for candidate_id in ids])
+    matriz /= np.linalg.norm(matriz, axis=1, keepdims=True)
+
+    revocacoes = []
+    for linha in rng.sample(range(len(ids)), 50):
+        cossenos = matriz @ matriz[linha]
+        cossenos[linha] = -1
+        # Décimo maior cosseno exato: empates nesse limite contam como acerto
+        limite = np.sort(cossenos)[-10]
+        resultado = indice.similares(ids[linha], k=10)
+        revocacoes.append(sum(similaridade >= limite - 1e-5 for _, similaridade in resultado) / 10)
+
+    assert np.mean(revocacoes) >= 0.6
@@ -0,0 +1,101 @@
+"""
+Modo folha do teste adaptativo: submeter a folha inteira corrige o nível e avança
+para o próximo com um novo sorteio (sessão sem autoflush, como em app.core.database)
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints.candidate_tests import responder_folha_nivel_adaptativo
+from app.models.test import AdaptiveTestSession, TestLevel
+from app.schemas.test import AnswerQuestionRequest, AnswerSheetSubmit
+from app.services.adaptive_test_service import AdaptiveTestService
+from app.services.banco_questoes import AlternativaBanco, QuestaoBanco, banco_questoes
+
+CANDIDATO_ID = 7
+
+
+def _questoes(nivel: TestLevel, primeiro_id: int):
+    questoes = []
+    for question_id in range(primeiro_id, primeiro_id + 5):
+        alternativas = tuple(
+            AlternativaBanco(question_id * 10 + ordem, question_id, f"Alternativa {ordem}", ordem, ordem == 1)
+            for ordem in range(1, 5)
+        )
+        questoes.append(QuestaoBanco(question_id, 1, f"Questão {question_id}", question_id, "Python", nivel, alternativas))
+    return tuple(questoes)
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    """Banco de questões do processo com 5 questões intermediárias e 5 avançadas, sem banco de dados"""
+    grupos = {
+        ("python", TestLevel.intermediario): _questoes(TestLevel.intermediario, 1),
+        ("python", TestLevel.avancado): _questoes(TestLevel.avancado, 101),
+    }
+
+    def carregar(db):
+        banco_questoes._por_grupo = grupos
+        banco_questoes._por_id = {q.id: q for questoes in grupos.values() for q in questoes}
+        banco_questoes._alternativas = {
+            alt.id: alt for q in banco_questoes._por_id.values() for alt in q.alternatives
+        }
+        banco_questoes._gabarito = {q.id: q.alternatives[0] for q in banco_questoes._por_id.values()}
+        banco_questoes._buscas = {}
+
+    monkeypatch.setattr(banco_questoes, "_carregar", carregar)
+    monkeypatch.setattr(banco_questoes, "sincronizar", lambda db: None)
+    banco_questoes.invalidar()
+    yield banco_questoes
+    banco_questoes.invalidar()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    AdaptiveTestSession.__table__.create(engine)
+    sessao = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield sessao
+    sessao.close()
+    engine.dispose()
+
+
+def test_folha_com_4_ou_5_acertos_no_intermediario_avanca_para_o_avancado(db, banco):
+    sessao = AdaptiveTestSession(
+        candidate_id=CANDIDATO_ID,
+        habilidade="Python",
+        nivel_atual="intermediario",
+        questao_atual_index=0,
+        total_basico=0, total_intermediario=0, total_avancado=0,
+        acertos_basico=0, acertos_intermediario=0, acertos_avancado=0,
+        historico_respostas=[]
+    )
+    db.add(sessao)
+    db.commit()
+
+    questoes, token = AdaptiveTestService(db).emitir_folha_nivel(sessao)
+    assert [q.id for q in questoes] and all(q.nivel == TestLevel.intermediario for q in questoes)
+
+    submissao = AnswerSheetSubmit(token=token, respostas=[
+        AnswerQuestionRequest(question_id=q.id, alternative_id=q.alternatives[0].id) for q in questoes
+    ])
+    resultado = asyncio.run(responder_folha_nivel_adaptativo(
+        sessao.id, submissao, candidate=SimpleNamespace(id=CANDIDATO_ID), db=db
+    ))
+
+    assert not resultado.is_completed
+    assert resultado.acertos == 5
+    assert resultado.proxima_folha.nivel_atual == "avancado"
+    assert {q.id for q in resultado.proxima_folha.questoes} <= {101, 102, 103, 104, 105}
+
+    db.expire_all()
+    gravada = db.get(AdaptiveTestSession, sessao.id)
+    assert gravada.nivel_atual == "avancado"
+    assert gravada.questao_atual_index == 0
+    assert (gravada.acertos_intermediario, gravada.total_intermediario) == (5, 5)
+    assert len(gravada.historico_respostas) == 5
+    assert set(gravada.questoes_sorteadas) == {"intermediario", "avancado"}
@@ -0,0 +1,85 @@
+"""
+Paridade do MotorMatching (vetorizado) com o matching por candidato anterior
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.services.matching_engine import MotorMatching, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO
+from scripts.matching_legado import matching_legado, gerar_cenario
+
+
+def _calcular_vetorizado(candidate_ids, requisitos, linhas_auto, linhas_mapa, peso_certificacao, peso_autoavaliacao):
+    motor = MotorMatching(requisitos)
+    ids = np.array(candidate_ids, dtype=np.int64)
+    niveis_certificados, niveis_autoavaliacao = motor.montar_niveis(ids, linhas_auto, linhas_mapa)
+    colunas = MotorMatching.calcular_scores(
+        niveis_certificados, niveis_autoavaliacao, motor.niveis_requeridos, peso_certificacao, peso_autoavaliacao
+    )
+    nomes = (
+        'atende_minimo', 'score_certificacao', 'score_autoavaliacao',
+        'competencias_certificadas', 'competencias_autoavaliadas'
+    )
+    return {
+        int(candidate_id): {nome: coluna[indice].item() for nome, coluna in zip(nomes, colunas)}
+        for indice, candidate_id in enumerate(ids)
+    }
+
+
+@pytest.mark.parametrize("semente", range(25))
+def test_paridade_com_matching_por_candidato(semente):
+    rng = random.Random(semente)
+    cenario = gerar_cenario(rng, total_candidatos=rng.randint(1, 300), total_requisitos=rng.randint(1, 8))
+
+    esperado = matching_legado(*cenario, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+    obtido = _calcular_vetorizado(*cenario, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+
+    assert obtido == esperado
+
+
+@pytest.mark.parametrize("pesos", [(1, 1), (5, 2), (0, 3)])
+def test_paridade_com_outros_pesos(pesos):
+    cenario = gerar_cenario(random.Random(sum(pesos)), total_candidatos=200, total_requisitos=5)
+
+    assert _calcular_vetorizado(*cenario, *pesos) == matching_legado(*cenario, *pesos)
+
+
+def test_vaga_sem_requisitos_atende_todos():
+    candidate_ids, _, linhas_auto, linhas_mapa = gerar_cenario(random.Random(7), 50, 1)
+
+    obtido = _calcular_vetorizado(candidate_ids, [], linhas_auto, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+    esperado = matching_legado(candidate_ids, [], linhas_auto, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+
+    assert obtido == esperado
+    assert all(scores['atende_minimo'] for scores in obtido.values())
+
+
+def test_certificacao_tem_prioridade_sobre_autoavaliacao():
+    _, requisitos, _, _ = gerar_cenario(random.Random(3), 1, 1)
+    requisito = requisitos[0]
+    requisito.nivel_minimo = "3"
+    nome = requisito.competencia.nome
+
+    # Certificado abaixo do mínimo reprova mesmo com autoavaliação suficiente
+    linhas_mapa = [(1, nome, 2, 4), (2, nome, 4, 1), (3, nome, None, 3)]
+    linhas_auto = [(1, requisito.competencia_id, 4), (4, requisito.competencia_id, 3)]
+
+    obtido = _calcular_vetorizado([1, 2, 3, 4], [requisito], linhas_auto, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+
+    assert [obtido[candidate_id]['atende_minimo'] for candidate_id in (1, 2, 3, 4)] == [False, True, True, True]
+    assert obtido[2]['score_certificacao'] == 4 * PESO_CERTIFICACAO
+    assert obtido[3]['score_autoavaliacao'] == 3 * PESO_AUTOAVALIACAO
+    assert obtido == matching_legado([1, 2, 3, 4], [requisito], linhas_auto, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+
+
+def test_autoavaliacoes_filtradas_pelas_competencias_da_vaga():
+    # MotorMatching.calcular só busca as autoavaliações das competências da vaga; o legado buscava todas
+    candidate_ids, requisitos, linhas_auto, linhas_mapa = gerar_cenario(random.Random(11), 200, 4)
+    competencias_vaga = {requisito.competencia_id for requisito in requisitos}
+    filtradas = [linha for linha in linhas_auto if linha[1] in competencias_vaga]
+
+    obtido = _calcular_vetorizado(candidate_ids, requisitos, filtradas, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+    esperado = matching_legado(candidate_ids, requisitos, linhas_auto, linhas_mapa, PESO_CERTIFICACAO, PESO_AUTOAVALIACAO)
+
+    assert obtido == esperado
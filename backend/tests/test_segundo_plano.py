@@ -0,0 +1,57 @@
+"""
+FilaIds: agendamentos feitos antes da execução viram uma única chamada com a união dos ids
+"""
+from app.core import segundo_plano
+from app.core.segundo_plano import FilaIds
+
+
+class _ExecutorManual:
+    """Guarda as tarefas submetidas para executá-las quando o teste mandar"""
+
+    def __init__(self):
+        self.tarefas = []
+
+    def submit(self, funcao, *args):
+        self.tarefas.append((funcao, args))
+
+    def executar(self):
+        tarefas, self.tarefas = self.tarefas, []
+        for funcao, args in tarefas:
+            funcao(*args)
+
+
+def test_commits_seguidos_sao_unidos(monkeypatch):
+    executor = _ExecutorManual()
+    monkeypatch.setattr(segundo_plano, "executor", executor)
+    chamadas = []
+    fila = FilaIds("teste", chamadas.append)
+
+    fila.agendar({3, 1})
+    fila.agendar([2, 3])
+    fila.agendar(set())
+    assert len(executor.tarefas) == 1
+
+    executor.executar()
+    assert chamadas == [[1, 2, 3]]
+
+    # Depois da execução, um novo commit agenda outra
+    fila.agendar([4])
+    executor.executar()
+    assert chamadas == [[1, 2, 3], [4]]
+
+
+def test_sem_ids_nao_agenda_e_falha_nao_propaga(monkeypatch):
+    executor = _ExecutorManual()
+    monkeypatch.setattr(segundo_plano, "executor", executor)
+
+    def falhar(ids):
+        raise RuntimeError("banco indisponível")
+
+    fila = FilaIds("teste", falhar)
+    fila.agendar([])
+    assert executor.tarefas == []
+
+    fila.agendar([1])
+    executor.executar()
+    fila.agendar([2])
+    assert len(executor.tarefas) == 1
@@ -0,0 +1,123 @@
+"""
+MinHash das vagas (calcular_assinatura) e índice LSH por bandas
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.services.vagas_similares import (
+    BANDAS, LINHAS, NUM_PERMUTACOES, IndiceVagasSimilares, calcular_assinatura, shingles_vaga
+)
+
+PALAVRAS = [
+    "python", "django", "fastapi", "postgres", "docker", "kubernetes", "react", "typescript", "java",
+    "spring", "kafka", "redis", "aws", "azure", "linux", "git", "scrum", "testes", "api", "sql",
+    "desenvolvimento", "backend", "frontend", "dados", "analise", "seguranca", "redes", "suporte",
+    "infraestrutura", "nuvem", "microsservicos", "mensageria", "observabilidade", "automacao",
+]
+
+
+def _texto(rng, palavras=60):
+    return " ".join(rng.choice(PALAVRAS) for _ in range(palavras))
+
+
+def _jaccard(a, b):
+    a, b = set(shingles_vaga(*a).tolist()), set(shingles_vaga(*b).tolist())
+    return len(a & b) / len(a | b)
+
+
+def _estimado(a, b):
+    return np.count_nonzero(calcular_assinatura(*a) == calcular_assinatura(*b)) / NUM_PERMUTACOES
+
+
+def test_vaga_sem_texto_nao_tem_assinatura():
+    assert calcular_assinatura(None, None) is None
+    assert calcular_assinatura("", "  ") is None
+    assert calcular_assinatura("!!!", None) is None
+
+
+def test_assinatura_estavel():
+    assinatura = calcular_assinatura("Desenvolvedor Python", "FastAPI e PostgreSQL")
+
+    assert assinatura.dtype == np.uint32
+    assert assinatura.shape == (NUM_PERMUTACOES,)
+    # Gravada em bytes e relida por outro processo: depende só do texto
+    assert np.array_equal(assinatura, calcular_assinatura("Desenvolvedor Python", "FastAPI e PostgreSQL"))
+    assert np.array_equal(np.frombuffer(assinatura.tobytes(), dtype=np.uint32), assinatura)
+
+
+def test_texto_curto_usa_tokens():
+    assinatura = calcular_assinatura("Python", None)
+
+    assert assinatura is not None
+    assert len(shingles_vaga("Python", None)) == 1
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_minhash_estima_jaccard(semente):
+    rng = random.Random(semente)
+    base = _texto(rng, 80).split()
+    # Variação da mesma vaga: parte das palavras trocada
+    variacao = [rng.choice(PALAVRAS) if rng.random() < 0.15 else palavra for palavra in base]
+    a, b = (" ".join(base), None), (" ".join(variacao), None)
+
+    # Erro padrão do estimador com 128 permutações: sqrt(J(1-J)/128) <= 0.045
+    assert _estimado(a, b) == pytest.approx(_jaccard(a, b), abs=0.15)
+
+
+def test_indice_encontra_vagas_parecidas_e_ignora_diferentes():
+    rng = random.Random(1)
+    indice = IndiceVagasSimilares()
+    base = _texto(rng, 100)
+    quase_igual = base + " " + _texto(rng, 5)
+    textos = {1: base, 2: quase_igual}
+    textos.update({job_id: _texto(rng, 100) for job_id in range(3, 40)})
+    for job_id, texto in textos.items():
+        indice.inserir(job_id, calcular_assinatura(texto, None))
+
+    resultado = indice.similares(1, k=5)
+
+    assert resultado[0][0] == 2
+    assert resultado[0][1] == pytest.approx(_jaccard((base, None), (quase_igual, None)), abs=0.15)
+    assert all(job_id != 1 for job_id, _ in resultado)
+    similaridades = [similaridade for _, similaridade in resultado]
+    assert similaridades == sorted(similaridades, reverse=True)
+
+
+def test_bandas_colidem_quando_uma_banda_e_igual():
+    indice = IndiceVagasSimilares()
+    assinatura = np.arange(NUM_PERMUTACOES, dtype=np.uint32)
+    # Só a última banda coincide: ainda é candidata, com Jaccard estimado LINHAS / NUM_PERMUTACOES
+    uma_banda = assinatura + 1000
+    uma_banda[-LINHAS:] = assinatura[-LINHAS:]
+    # Linhas iguais espalhadas, sem nenhuma banda inteira: não é visitada
+    espalhada = assinatura + 1000
+    espalhada[::LINHAS] = assinatura[::LINHAS]
+    indice.inserir(1, assinatura)
+    indice.inserir(2, uma_banda)
+    indice.inserir(3, espalhada)
+
+    assert indice.similares(1) == [(2, LINHAS / NUM_PERMUTACOES)]
+
+
+def test_remover_e_reinserir_atualiza_buckets():
+    rng = random.Random(2)
+    indice = IndiceVagasSimilares()
+    texto = _texto(rng)
+    indice.inserir(1, calcular_assinatura(texto, None))
+    indice.inserir(2, calcular_assinatura(texto, None))
+    assert indice.similares(1) == [(2, 1.0)]
+
+    # Texto editado: a nova assinatura substitui a anterior em todas as bandas
+    indice.inserir(2, calcular_assinatura(_texto(rng), None))
+    assert all(job_id != 2 or similaridade < 1.0 for job_id, similaridade in indice.similares(1))
+
+    indice.remover(2)
+    indice.remover(99)
+    assert len(indice) == 1
+    assert indice.similares(1) == []
+    assert indice.similares(2) == []
+    for buckets in indice._buckets:
+        assert [job_id for bucket in buckets.values() for job_id in bucket] == [1]
+    assert sum(len(buckets) for buckets in indice._buckets) == BANDAS